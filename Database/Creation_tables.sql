@@ -188,4 +188,19 @@ CREATE TABLE slots_teachers(
     FOREIGN KEY (teacher_id) REFERENCES teachers(id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+CREATE TABLE edt_slot_staging(
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    run_id VARCHAR(32) NOT NULL,
+    week_id INT NOT NULL,
+    FOREIGN KEY (week_id) REFERENCES weeks(id),
+    solution_number INT NOT NULL,
+    objective DOUBLE NOT NULL,
+    course_id VARCHAR(255) NOT NULL,
+    start_slot INT NOT NULL,
+    room_id INT NOT NULL,
+    teacher VARCHAR(255) NOT NULL,
+    duration INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_edt_slot_staging_run (run_id)
+);
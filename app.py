@@ -24,7 +24,10 @@ if getattr(sys, 'frozen', False):
 # Assurez-vous que ces modules sont accessibles et fonctionnels
 import argparse
 import itertools
+import multiprocessing
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from ortools.sat.python import cp_model
@@ -32,7 +35,21 @@ from ortools.sat.python import cp_model
 import diagnose
 from data_provider_id import DataProviderID
 from solution_visualizer import SolutionVisualizer
-from time_table_model import TimetableModel
+from time_table_model import TimetableModel, MODES_MODELE, MODE_BOOLEEN, POIDS_TROUS, BLOCS_DIAGNOSTIC
+from group_tree import ArbreGroupes
+from model_cache import ModelCache
+from snapshot_cache import SnapshotCache, SnapshotDataProvider
+from warm_start import ReferenceWeekMatcher
+from repair import RepairPlanner
+from solution_parser import SolutionParser
+from decomposition import DecomposedSolver
+from solver_profiles import PROFILS, charger_profil, nombre_coeurs_utilisables
+from solution_streaming import JsonlSink, StagingTableSink
+from greedy_scheduler import GreedyScheduler
+from infeasibility_core import diagnostic_par_noyau
+from schedule_builder import ScheduleBuilder
+from console_printer import ConsolePrinter
+from time_formatter import TimeFormatter
 from logger_config import get_logger
 
 # Configuration du logger pour ce module
@@ -47,8 +64,21 @@ if ortools_path.exists():
         logger.info(f"PATH ajusté pour OR-Tools: {path_to_add}")
 
 
-def test_combination(model_class, data, disabled_blocks, timeout=60):
-    """Teste si en désactivant une liste de blocs, le problème devient faisable"""
+def _arreter_sur_signal(solver, arret, termine, periode=0.1):
+    """Interrompt la recherche (StopSearch) dès que l'évènement partagé `arret` est levé."""
+    while not termine.is_set():
+        if arret.wait(periode):
+            solver.StopSearch()
+            return
+
+
+def test_combination(model_class, data, disabled_blocks, timeout=60, profil=None, arret=None):
+    """
+    Teste si en désactivant une liste de blocs, le problème devient faisable.
+    `arret` (évènement partagé entre processus) interrompt le test dès qu'il est levé.
+    """
+    if arret is not None and arret.is_set():
+        return False
     logger.info("="*70)
     if len(disabled_blocks) == 1:
         logger.info(f"TEST UNIQUE → Désactivation : {disabled_blocks[0]}")
@@ -60,11 +90,20 @@ def test_combination(model_class, data, disabled_blocks, timeout=60):
     scheduler.build_model(disable_blocks=disabled_blocks)
 
     solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = timeout
-    solver.parameters.num_search_workers = 8
+    (profil or charger_profil()).avec(max_time_seconds=timeout).appliquer(solver)
     solver.parameters.log_search_progress = False
 
-    status = solver.Solve(scheduler.model)
+    if arret is None:
+        status = solver.Solve(scheduler.model)
+    else:
+        termine = threading.Event()
+        surveillance = threading.Thread(target=_arreter_sur_signal, args=(solver, arret, termine), daemon=True)
+        surveillance.start()
+        try:
+            status = solver.Solve(scheduler.model)
+        finally:
+            termine.set()
+            surveillance.join()
 
     elapsed = time.perf_counter() - start
 
@@ -77,51 +116,128 @@ def test_combination(model_class, data, disabled_blocks, timeout=60):
         return False
 
 
-def diagnostic_automatique(model_class, data, timeout_per_test=60):
-    blocks = [
-        "profs",
-        "salles",
-        "etudiant",
-        "hierarchies",
-        "ordre_cm_td_tp",
-        "prof disponibles",
-        "salles dispo"
-    ]
+# Contexte d'un processus du pool de diagnostic (données transmises une seule fois par processus)
+_CONTEXTE_DIAGNOSTIC = {}
+
+# Niveaux de la recherche : (nombre de blocs désactivés, message d'échec)
+NIVEAUX_DIAGNOSTIC = (
+    (1, "\n⚠️ Aucun bloc seul ne résout le problème."),
+    (2, "\n⚠️ Aucune paire ne suffit."),
+    (3, None),
+)
+
+
+def _initialiser_diagnostic(model_class, data, timeout, profil, arret=None):
+    """Initialiseur du pool : conserve les données et l'évènement d'arrêt pour toutes les tâches du processus."""
+    _CONTEXTE_DIAGNOSTIC.update(model_class=model_class, data=data, timeout=timeout, profil=profil, arret=arret)
+
+
+def _tester_combinaison_worker(blocs):
+    """Tâche du pool : (blocs, faisable, durée)."""
+    ctx = _CONTEXTE_DIAGNOSTIC
+    debut = time.perf_counter()
+    faisable = test_combination(ctx['model_class'], ctx['data'], list(blocs), ctx['timeout'], ctx['profil'],
+                                ctx.get('arret'))
+    return blocs, faisable, time.perf_counter() - debut
+
+
+def _journaliser_resultat(blocs, faisable, duree):
+    """Ligne du tableau des relaxations, écrite dès que le test est terminé."""
+    logger.info(f"   {' + '.join(blocs):<50} | {'FAISABLE' if faisable else 'infaisable':<10} | {duree:>7.1f}s")
+
+
+def _tester_niveau_sequentiel(model_class, data, combinaisons, timeout):
+    for blocs in combinaisons:
+        debut = time.perf_counter()
+        faisable = test_combination(model_class, data, blocs, timeout)
+        _journaliser_resultat(blocs, faisable, time.perf_counter() - debut)
+        if faisable:
+            return blocs
+    return None
+
+
+def _tester_niveau_parallele(pool, combinaisons):
+    """
+    Soumet tout le niveau ; dès qu'une relaxation est faisable, les tâches non démarrées
+    sont annulées (les résolutions en cours sont interrompues par diagnostic_automatique).
+    """
+    futures = [pool.submit(_tester_combinaison_worker, tuple(blocs)) for blocs in combinaisons]
+    try:
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            blocs, faisable, duree = future.result()
+            _journaliser_resultat(blocs, faisable, duree)
+            if faisable:
+                return list(blocs)
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def diagnostic_automatique(model_class, data, timeout_per_test=60, nb_processus=1):
+    """
+    Désactive les blocs un par un, puis par paires, puis par triplets, jusqu'à obtenir
+    un problème faisable. Avec nb_processus > 1 (None : un par cœur utilisable), chaque
+    niveau est réparti sur un pool de processus ; les cœurs sont partagés entre les
+    résolutions simultanées. Un évènement partagé interrompt (StopSearch) les résolutions
+    encore en cours dès que la recherche se termine.
+
+    Returns:
+        La liste des blocs dont la désactivation rend le problème faisable, ou None.
+    """
+    blocks = list(BLOCS_DIAGNOSTIC)
 
     logger.info("🔍 DIAGNOSTIC AUTOMATIQUE DE L'INFAISABILITÉ")
     logger.info("="*70)
 
-    # === ÉTAPE 1 : Test un par un ===
-    logger.info("\n1. Test des blocs un par un...")
-    for block in blocks:
-        if test_combination(model_class, data, [block], timeout_per_test):
-            logger.info(f"\n✅ UN SEUL BLOC SUFFIT → '{block}' est la source du problème.")
-            return
-
-    logger.info("\n⚠️ Aucun bloc seul ne résout le problème.")
-
-    # === ÉTAPE 2 : Test des paires ===
-    logger.info("\n2. Test des combinaisons de 2 blocs...")
-    for combo in itertools.combinations(blocks, 2):
-        if test_combination(model_class, data, list(combo), timeout_per_test):
-            logger.info(f"\n✅ COMBINAISON GAGNANTE → Il fallait désactiver : {combo[0]} + {combo[1]}")
-            return
-
-    logger.info("\n⚠️ Aucune paire ne suffit.")
-
-    # === ÉTAPE 3 : Test des triplets ===
-    logger.info("\n3. Test des combinaisons de 3 blocs...")
-    for combo in itertools.combinations(blocks, 3):
-        if test_combination(model_class, data, list(combo), timeout_per_test):
-            logger.info(f"\n✅ COMBINAISON GAGNANTE → Il fallait désactiver : {', '.join(combo)}")
-            return
+    nb_processus = nb_processus or nombre_coeurs_utilisables()
+    pool = None
+    arret = None
+    if nb_processus > 1:
+        profil = charger_profil().avec(nb_workers=max(1, nombre_coeurs_utilisables() // nb_processus))
+        arret = multiprocessing.Event()
+        pool = ProcessPoolExecutor(max_workers=nb_processus, initializer=_initialiser_diagnostic,
+                                   initargs=(model_class, data, timeout_per_test, profil, arret))
+        logger.info(f"   -> {nb_processus} processus, {profil.workers()} workers CP-SAT par test.")
+    try:
+        for taille, message_echec in NIVEAUX_DIAGNOSTIC:
+            logger.info(f"\n{taille}. Test des combinaisons de {taille} bloc(s)...")
+            combinaisons = [list(combo) for combo in itertools.combinations(blocks, taille)]
+            if pool is None:
+                gagnante = _tester_niveau_sequentiel(model_class, data, combinaisons, timeout_per_test)
+            else:
+                gagnante = _tester_niveau_parallele(pool, combinaisons)
+            if gagnante:
+                if len(gagnante) == 1:
+                    logger.info(f"\n✅ UN SEUL BLOC SUFFIT → '{gagnante[0]}' est la source du problème.")
+                else:
+                    logger.info(f"\n✅ COMBINAISON GAGNANTE → Il fallait désactiver : {' + '.join(gagnante)}")
+                return gagnante
+            if message_echec:
+                logger.info(message_echec)
+    finally:
+        if pool is not None:
+            # Les tâches en attente sont annulées ; celles en cours s'arrêtent sur l'évènement partagé
+            arret.set()
+            pool.shutdown(wait=True, cancel_futures=True)
 
     logger.warning("\n❌ Même en désactivant 3 blocs, toujours infaisable.")
     logger.warning("Possibles causes restantes :")
     logger.warning("   • Données incohérentes (ex: cours sans prof possible, salle trop petite obligatoire)")
     logger.warning("   • Problème dans les variables de décision ou les contraintes de base")
     logger.warning("   • Besoin de désactiver plus de 3 blocs (rare) ou assouplir les contraintes souples")
-    logger.info("\n💡 Prochaine étape recommandée : utiliser le module 'diagnose.py' avec explain_infeasibility()")
+    logger.info("\n💡 Prochaine étape recommandée : infeasibility_core.diagnostic_par_noyau() "
+                "(blocs et entités en conflit en une seule résolution)")
+    return None
+
+
+def arreter_si_infaisable(problemes, fail_fast):
+    """Avec fail_fast, quitte avant la résolution si le diagnostic statique a détecté un problème."""
+    if fail_fast and any(problemes.values()):
+        logger.error("Infaisabilité détectée par le diagnostic statique : résolution annulée.")
+        sys.exit(1)
 
 
 # ==============================================================================
@@ -132,25 +248,125 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Exemple d'entrée en ligne de commande")
     parser.add_argument("--id_semaine", type=int, required=True, help="Un entier en entrée correspondant à la semaine à générer")
+    parser.add_argument("--mode", choices=MODES_MODELE, default=MODE_BOOLEEN,
+                        help="Formulation des conflits salles/profs/groupes (booléens ou intervalles NoOverlap)")
+    parser.add_argument("--symetries", action="store_true",
+                        help="Ordonne les séances et salles interchangeables (cassage de symétries)")
+    parser.add_argument("--profiler_construction", action="store_true",
+                        help="Mesure chaque bloc de construction du modèle (rapport JSON dans logs/)")
+    parser.add_argument("--semaine_reference", type=int, default=None,
+                        help="Semaine déjà générée dont les affectations servent d'indications de départ")
+    parser.add_argument("--reparer", action="store_true",
+                        help="Répare l'emploi du temps déjà enregistré de la semaine en déplaçant le moins de séances possible")
+    parser.add_argument("--decomposer", action="store_true",
+                        help="Résout chaque promotion en parallèle puis fusionne (indications de départ)")
+    parser.add_argument("--profil", choices=list(PROFILS), default=None,
+                        help="Profil solveur (par défaut : variable SOLVER_PROFILE ou 'balanced')")
+    parser.add_argument("--sans_cache", action="store_true",
+                        help="Reconstruit le modèle sans utiliser ni alimenter le cache disque")
+    parser.add_argument("--sans_instantane", action="store_true",
+                        help="Recharge les données depuis la base sans utiliser ni alimenter l'instantané local")
+    parser.add_argument("--offline", action="store_true",
+                        help="Résout depuis le dernier instantané local de la semaine, sans connexion à la base")
+    parser.add_argument("--flux_jsonl", type=Path, default=None,
+                        help="Fichier JSONL recevant chaque solution améliorante pendant la résolution")
+    parser.add_argument("--flux_staging", action="store_true",
+                        help="Maintient la meilleure solution connue dans la table edt_slot_staging")
+    parser.add_argument("--glouton", action="store_true",
+                        help="Utilise un placement glouton comme indications de départ du solveur")
+    parser.add_argument("--trous", action="store_true",
+                        help="Pénalise les trous dans les journées des professeurs et des groupes")
+    parser.add_argument("--poids_trous", type=int, default=POIDS_TROUS,
+                        help="Coût d'un créneau de trou dans l'objectif (avec --trous)")
+    parser.add_argument("--lexicographique", action="store_true",
+                        help="Optimise les objectifs un par un par priorité au lieu d'une somme pondérée")
+    parser.add_argument("--priorites", type=lambda s: [n.strip() for n in s.split(',') if n.strip()], default=None,
+                        help="Ordre des objectifs en mode lexicographique (ex. capacite,fin_tardive)")
+    parser.add_argument("--processus_diagnostic", type=int, default=None,
+                        help="Processus de la recherche combinatoire de diagnostic (1 : séquentiel ; par défaut : cœurs)")
+    parser.add_argument("--recherche_combinatoire", action="store_true",
+                        help="En cas d'échec, lance aussi la recherche combinatoire des blocs à désactiver "
+                             "(jusqu'à 63 résolutions) si le diagnostic par noyau ne conclut pas")
+    parser.add_argument("--fail_fast", action="store_true",
+                        help="Arrête au premier problème du diagnostic statique sans lancer la résolution")
     argvs = parser.parse_args()
+    if argvs.offline and (argvs.flux_staging or argvs.reparer or argvs.semaine_reference is not None):
+        parser.error("--offline est incompatible avec --flux_staging, --reparer et --semaine_reference")
+    if argvs.decomposer:
+        ignorees = [option for option, active in (
+            ("--lexicographique", argvs.lexicographique), ("--priorites", argvs.priorites is not None),
+            ("--reparer", argvs.reparer), ("--glouton", argvs.glouton),
+            ("--semaine_reference", argvs.semaine_reference is not None),
+            ("--profiler_construction", argvs.profiler_construction), ("--sans_cache", argvs.sans_cache)) if active]
+        if ignorees:
+            parser.error(f"--decomposer est incompatible avec {', '.join(ignorees)}")
 
     print("Vous avez fourni :", argvs.id_semaine)
     logger.info(f"Vous avez fourni : {argvs.id_semaine}")
 
-    # Utilise la configuration depuis .env via db_utils
-    DataProviderInsert = DataProviderID()
-    model_data = DataProviderInsert.load_and_prepare_data(argvs.id_semaine)
-    scheduler = TimetableModel(model_data)
-    scheduler.build_model()
-
-    # Exemple d'appel:
-    probs = diagnose.diagnose_feasibility(model_data)
-    solution = scheduler.solve(max_time_seconds=300)
+    profil_solveur = charger_profil(argvs.profil)
+    if argvs.offline:
+        instantane = SnapshotCache().hors_ligne(argvs.id_semaine)
+        if instantane is None:
+            logger.error(f"Aucun instantané local pour la semaine {argvs.id_semaine} : "
+                         f"lancer une première exécution connectée à la base.")
+            sys.exit(1)
+        DataProviderInsert = SnapshotDataProvider(instantane['liste_salles'])
+        model_data = instantane['donnees']
+    else:
+        # Utilise la configuration depuis .env via db_utils
+        DataProviderInsert = DataProviderID()
+        if argvs.sans_instantane:
+            model_data = DataProviderInsert.load_and_prepare_data(argvs.id_semaine)
+        else:
+            model_data = SnapshotCache().charger(DataProviderInsert, argvs.id_semaine)
+    # Diagnostic statique (quelques millisecondes) avant toute construction de modèle
+    probs = diagnose.diagnose_feasibility(model_data, fail_fast=argvs.fail_fast)
+    arreter_si_infaisable(probs, argvs.fail_fast)
+    planificateur_reparation = None
+    sinks = []
+    if argvs.flux_jsonl is not None:
+        sinks.append(JsonlSink(argvs.flux_jsonl))
+    if argvs.flux_staging:
+        sinks.append(StagingTableSink(DataProviderInsert.engine, argvs.id_semaine))
+    if argvs.decomposer:
+        solution = DecomposedSolver(model_data, mode=argvs.mode, profil=profil_solveur).resoudre(
+            sinks=sinks, casser_symetries=argvs.symetries, trous=argvs.trous, poids_trous=argvs.poids_trous)
+    else:
+        scheduler = TimetableModel(model_data, mode=argvs.mode)
+        if argvs.reparer:
+            affectations = ReferenceWeekMatcher(model_data).associer_par_slot(
+                DataProviderInsert.load_reference_assignments(argvs.id_semaine))
+            planificateur_reparation = RepairPlanner(model_data, affectations, scheduler.arbre_groupes.parents)
+            _, figes = planificateur_reparation.planifier()
+            scheduler.preparer_reparation(affectations, figes)
+        scheduler.build_model(casser_symetries=argvs.symetries, profiler=argvs.profiler_construction,
+                              cache=None if argvs.sans_cache else ModelCache(),
+                              trous=argvs.trous, poids_trous=argvs.poids_trous)
+        if argvs.glouton:
+            scheduler.appliquer_indications(GreedyScheduler(model_data, scheduler.arbre_groupes.parents).planifier().affectations)
+        if argvs.semaine_reference is not None:
+            references = DataProviderInsert.load_reference_assignments(argvs.semaine_reference)
+            scheduler.appliquer_indications(ReferenceWeekMatcher(model_data).associer(references))
+
+        if argvs.lexicographique:
+            solution = scheduler.solve_lexicographique(profil=profil_solveur, ordre=argvs.priorites,
+                                                       sinks=sinks)
+            for etape in solution['etapes']:
+                logger.info(f" - {etape['nom']} : {etape['statut']}, valeur {etape['valeur']}, {etape['duree']:.1f}s")
+        else:
+            solution = scheduler.solve(profil=profil_solveur, sinks=sinks)
     #print("solution",solution)
 
     if solution and solution['vars']:
+        if planificateur_reparation is not None:
+            differences = planificateur_reparation.differences(
+                SolutionParser(solution, model_data).parse_assignments())
+            logger.info(f"Réparation : {len(differences)} séance(s) déplacée(s).")
+            for cid, ancienne, nouvelle in differences:
+                logger.info(f" - {cid} : créneau/salle {ancienne[:2]} -> {nouvelle[:2]}")
         visualizer = SolutionVisualizer(solution, model_data)
-        visualizer.display(DataProviderInsert,argvs.id_semaine)
+        visualizer.display(DataProviderInsert, argvs.id_semaine, remplacer_semaine=argvs.reparer)
         end_time = time.perf_counter()
         execution_time = end_time - start_time
         logger.info(f"Programme exécuté en : {execution_time: .5f} secondes")
@@ -158,7 +374,28 @@ if __name__ == "__main__":
         logger.warning("\nÉchec de la résolution. Le modèle reste infaisable même avec des contraintes assouplies.")
         logger.warning(
             "Causes possibles : Surcharge totale des ressources (pas assez de salles/profs pour le nombre de cours) ou une autre contrainte dure est trop restrictive (ex: pause midi).")
-        #diagnostic_automatique(TimetableModelId, model_data, timeout_per_test=90)
+        # Planning de secours : placement glouton, séances non placées listées
+        glouton = GreedyScheduler(model_data, ArbreGroupes.depuis_donnees(model_data).parents)
+        repli = glouton.planifier()
+        logger.warning(f"Planning de secours (glouton) : {len(repli.affectations)} séances placées, "
+                       f"{len(repli.non_places)} non placées.")
+        formateur = TimeFormatter()
+        affectations_repli = glouton.parse_assignments()
+        ConsolePrinter(model_data, formateur).print_schedule(
+            ScheduleBuilder(model_data, formateur).build_planning(affectations_repli),
+            {a.course_id: a.start_slot for a in affectations_repli})
+        if solution is not None and solution.get('status') == cp_model.UNKNOWN:
+            # Temps écoulé sans conclusion : rien ne prouve l'infaisabilité, pas de diagnostic
+            logger.warning("Résolution interrompue par la limite de temps : diagnostic d'infaisabilité non lancé.")
+        else:
+            # Une seule résolution par hypothèses ; recherche combinatoire seulement sur demande
+            noyau = diagnostic_par_noyau(model_data, timeout=90) if argvs.mode == MODE_BOOLEEN else None
+            if noyau is None or not noyau.infaisable:
+                if argvs.recherche_combinatoire:
+                    diagnostic_automatique(TimetableModel, model_data, timeout_per_test=90,
+                                           nb_processus=argvs.processus_diagnostic)
+                else:
+                    logger.info("Relancer avec --recherche_combinatoire pour tester les blocs à désactiver.")
 
         total_time = time.perf_counter() - start_time
         logger.info(f"\nDiagnostic terminé en {total_time:.1f} secondes.")
@@ -0,0 +1,157 @@
+"""
+Génération de plusieurs semaines en un seul lancement.
+Respecte le principe Single Responsibility (SOLID).
+
+Les données communes (salles, professeurs, salles compatibles...) sont lues
+une seule fois ; chaque semaine est ensuite chargée puis résolue dans un
+processus du pool, avec un nombre de workers CP-SAT configurable par
+résolution. Les séances de toutes les semaines résolues sont insérées en une
+seule fois dans edt_slot, et un tableau récapitulatif (statut, objectif,
+durée) est journalisé.
+
+Exemple :
+    python batch_generation.py --semaines 10-24 --workers_par_semaine 2
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from logger_config import get_logger
+from schedule_builder import ScheduleBuilder
+from solution_parser import SolutionParser
+from solver_profiles import PROFILS, SolverProfile, charger_profil, nombre_coeurs_utilisables
+from time_formatter import TimeFormatter
+from time_table_model import TimetableModel, MODES_MODELE, MODE_BOOLEEN
+
+logger = get_logger(__name__)
+
+
+def parser_semaines(specification: str) -> List[int]:
+    """
+    Convertit une spécification de semaines en liste triée sans doublon.
+    Accepte des identifiants et des plages séparés par des virgules : "3,5,10-14".
+    """
+    semaines = set()
+    for morceau in specification.split(','):
+        morceau = morceau.strip()
+        if not morceau:
+            continue
+        if '-' in morceau:
+            debut, fin = (int(x) for x in morceau.split('-', 1))
+            if debut > fin:
+                raise ValueError(f"Plage de semaines invalide : {morceau}")
+            semaines.update(range(debut, fin + 1))
+        else:
+            semaines.add(int(morceau))
+    if not semaines:
+        raise ValueError("Aucune semaine demandée")
+    return sorted(semaines)
+
+
+@dataclass
+class ResultatSemaine:
+    """Résultat de la génération d'une semaine (renvoyé par le processus de résolution)."""
+    week_id: int
+    statut: str
+    objectif: Optional[float]
+    duree: float
+    cours: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def resolue(self) -> bool:
+        return self.statut in ("OPTIMAL", "FEASIBLE")
+
+
+def _resoudre_semaine(args: Tuple[int, Dict[str, Any], str, SolverProfile]) -> ResultatSemaine:
+    """Construit et résout une semaine (exécuté dans un processus du pool)."""
+    week_id, data, mode, profil = args
+    debut = time.perf_counter()
+    model = TimetableModel(data, mode=mode)
+    model.build_model()
+    resultat = model.solve(profil=profil)
+    solver = resultat['solver']
+    statut = solver.StatusName(resultat['status'])
+    if resultat['vars'] is None:
+        return ResultatSemaine(week_id, statut, None, time.perf_counter() - debut)
+    assignments = SolutionParser(resultat, data).parse_assignments()
+    cours = [info.to_dict() for info in
+             ScheduleBuilder(data, TimeFormatter()).build_course_schedule_info(assignments)]
+    return ResultatSemaine(week_id, statut, solver.ObjectiveValue(), time.perf_counter() - debut, cours)
+
+
+class BatchGenerator:
+    """Génère une liste de semaines en parallèle et enregistre les résultats en bloc."""
+
+    def __init__(self, data_provider, mode: str = MODE_BOOLEEN, profil: Optional[SolverProfile] = None,
+                 workers_par_semaine: int = 1, nb_processus: Optional[int] = None):
+        self.data_provider = data_provider
+        self.mode = mode
+        self.profil = (profil or charger_profil()).avec(nb_workers=workers_par_semaine)
+        self.nb_processus = nb_processus or max(1, nombre_coeurs_utilisables() // self.profil.workers())
+
+    def charger(self, semaines: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Charge les données de chaque semaine en ne lisant qu'une fois les données communes."""
+        partagees = self.data_provider.load_shared_data()
+        return {week_id: self.data_provider.load_and_prepare_data(week_id, shared=partagees)
+                for week_id in semaines}
+
+    def resoudre(self, donnees: Dict[int, Dict[str, Any]]) -> List[ResultatSemaine]:
+        """Résout les semaines dans un pool de processus (résultats dans l'ordre des semaines)."""
+        nb_processus = min(len(donnees), self.nb_processus)
+        logger.info(f"   -> Lot : {len(donnees)} semaines, {nb_processus} processus, "
+                    f"{self.profil.workers()} workers CP-SAT par semaine.")
+        taches = [(week_id, data, self.mode, self.profil) for week_id, data in donnees.items()]
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            return list(pool.map(_resoudre_semaine, taches))
+
+    def enregistrer(self, resultats: List[ResultatSemaine]) -> int:
+        """Insère en une seule requête les séances de toutes les semaines résolues."""
+        lignes = [ligne for r in resultats if r.resolue
+                  for ligne in self.data_provider.courses_dict_to_rows(r.cours)]
+        if lignes:
+            self.data_provider.insert_edt_rows(lignes)
+        return len(lignes)
+
+    def generer(self, semaines: Iterable[int]) -> List[ResultatSemaine]:
+        """Charge, résout, enregistre puis journalise le récapitulatif."""
+        resultats = self.resoudre(self.charger(semaines))
+        nb_lignes = self.enregistrer(resultats)
+        logger.info(f"   -> {nb_lignes} séances enregistrées.")
+        journaliser_recapitulatif(resultats)
+        return resultats
+
+
+def journaliser_recapitulatif(resultats: List[ResultatSemaine]) -> None:
+    """Journalise un tableau statut / objectif / durée / nombre de séances par semaine."""
+    logger.info(f"{'Semaine':>8} | {'Statut':<10} | {'Objectif':>12} | {'Durée (s)':>9} | {'Séances':>7}")
+    logger.info("-" * 58)
+    for r in resultats:
+        objectif = f"{r.objectif:g}" if r.objectif is not None else "-"
+        logger.info(f"{r.week_id:>8} | {r.statut:<10} | {objectif:>12} | {r.duree:>9.1f} | {len(r.cours):>7}")
+    nb_resolues = sum(r.resolue for r in resultats)
+    logger.info(f"{nb_resolues}/{len(resultats)} semaines résolues.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération de plusieurs semaines en parallèle")
+    parser.add_argument("--semaines", required=True,
+                        help="Semaines à générer : identifiants et plages séparés par des virgules (ex. 10-24,30)")
+    parser.add_argument("--workers_par_semaine", type=int, default=1,
+                        help="Nombre de workers CP-SAT par résolution")
+    parser.add_argument("--processus", type=int, default=None,
+                        help="Nombre de semaines résolues simultanément (par défaut : cœurs / workers)")
+    parser.add_argument("--mode", choices=MODES_MODELE, default=MODE_BOOLEEN,
+                        help="Formulation des conflits salles/profs/groupes")
+    parser.add_argument("--profil", choices=list(PROFILS), default=None,
+                        help="Profil solveur (par défaut : variable SOLVER_PROFILE ou 'balanced')")
+    argvs = parser.parse_args()
+
+    from data_provider_id import DataProviderID
+
+    debut = time.perf_counter()
+    generateur = BatchGenerator(DataProviderID(), mode=argvs.mode, profil=charger_profil(argvs.profil),
+                                workers_par_semaine=argvs.workers_par_semaine, nb_processus=argvs.processus)
+    generateur.generer(parser_semaines(argvs.semaines))
+    logger.info(f"Lot exécuté en : {time.perf_counter() - debut:.1f} secondes")
@@ -0,0 +1,153 @@
+"""
+Profilage de la construction du modèle d'optimisation.
+Respecte le principe Single Responsibility (SOLID).
+
+Pour chaque bloc de `TimetableModel.build_model` (liaisons, salles,
+professeurs, disponibilités, ordre, pénalités, objectif...), on mesure le temps
+écoulé, le nombre de variables et de contraintes ajoutées au modèle CP-SAT et
+deux mesures mémoire : le pic des allocations Python (tracemalloc) et la
+variation de la mémoire résidente du processus. Les variables et contraintes
+CP-SAT sont allouées en C++ : seule la seconde mesure les voit.
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ortools.sat.python import cp_model
+
+from logger_config import get_logger, LOGS_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger(__name__)
+
+
+def memoire_residente_ko() -> float:
+    """
+    Mémoire résidente du processus en Ko (/proc/self/statm sous Linux). Ailleurs, repli
+    sur le pic résident de getrusage (la variation mesure alors la croissance du pic),
+    ou 0 si aucune mesure n'est disponible.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pic / 1024 if sys.platform == "darwin" else float(pic)  # octets sous macOS
+    return 0.0
+
+
+@dataclass
+class BlockProfile:
+    """Mesures d'un bloc de construction."""
+    nom: str
+    duree_s: float
+    memoire_pic_ko: float
+    memoire_rss_ko: float
+    variables: int
+    contraintes: int
+
+
+@dataclass
+class BuildProfile:
+    """Rapport complet de construction du modèle."""
+    mode: str
+    blocs: List[BlockProfile] = field(default_factory=list)
+
+    @property
+    def duree_totale_s(self) -> float:
+        return sum(b.duree_s for b in self.blocs)
+
+    @property
+    def variables_totales(self) -> int:
+        return sum(b.variables for b in self.blocs)
+
+    @property
+    def contraintes_totales(self) -> int:
+        return sum(b.contraintes for b in self.blocs)
+
+    @property
+    def memoire_rss_totale_ko(self) -> float:
+        return sum(b.memoire_rss_ko for b in self.blocs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "duree_totale_s": self.duree_totale_s,
+            "variables_totales": self.variables_totales,
+            "contraintes_totales": self.contraintes_totales,
+            "memoire_rss_totale_ko": self.memoire_rss_totale_ko,
+            "blocs": [asdict(b) for b in self.blocs],
+        }
+
+    def ecrire_json(self, chemin: Optional[Path] = None) -> Path:
+        """Écrit le rapport en JSON (par défaut dans le dossier des logs) et retourne le chemin."""
+        if chemin is None:
+            chemin = LOGS_DIR / f"build_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        chemin = Path(chemin)
+        chemin.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return chemin
+
+
+class BuildProfiler:
+    """Enregistre un BlockProfile par bloc exécuté dans `bloc(nom)`."""
+
+    def __init__(self, model: cp_model.CpModel, mode: str = ""):
+        self.model = model
+        self.profil = BuildProfile(mode=mode)
+
+    def _taille_modele(self) -> tuple:
+        proto = self.model.Proto()
+        return len(proto.variables), len(proto.constraints)
+
+    @contextmanager
+    def bloc(self, nom: str) -> Iterator[None]:
+        """Mesure le bloc exécuté dans le contexte."""
+        demarre_ici = not tracemalloc.is_tracing()
+        if demarre_ici:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memoire_avant, _ = tracemalloc.get_traced_memory()
+        variables_avant, contraintes_avant = self._taille_modele()
+        rss_avant = memoire_residente_ko()
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = time.perf_counter() - debut
+            _, pic = tracemalloc.get_traced_memory()
+            rss_apres = memoire_residente_ko()
+            if demarre_ici:
+                tracemalloc.stop()
+            variables_apres, contraintes_apres = self._taille_modele()
+            self.profil.blocs.append(BlockProfile(
+                nom=nom,
+                duree_s=round(duree, 6),
+                memoire_pic_ko=round(max(pic - memoire_avant, 0) / 1024, 1),
+                memoire_rss_ko=round(rss_apres - rss_avant, 1),
+                variables=variables_apres - variables_avant,
+                contraintes=contraintes_apres - contraintes_avant,
+            ))
+
+    def journaliser(self) -> None:
+        """Affiche le rapport trié par durée décroissante."""
+        logger.info("=== Profil de construction du modèle ===")
+        for b in sorted(self.profil.blocs, key=lambda b: b.duree_s, reverse=True):
+            logger.info(f" - {b.nom:<32} {b.duree_s:8.3f} s  RSS {b.memoire_rss_ko:+10.1f} Ko  "
+                        f"Python {b.memoire_pic_ko:10.1f} Ko  "
+                        f"+{b.variables} variables  +{b.contraintes} contraintes")
+        logger.info(f"Total : {self.profil.duree_totale_s:.3f} s, {self.profil.variables_totales} variables, "
+                    f"{self.profil.contraintes_totales} contraintes, "
+                    f"RSS {self.profil.memoire_rss_totale_ko:+.1f} Ko")
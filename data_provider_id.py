@@ -1,9 +1,15 @@
+import hashlib
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Tuple, Optional
 
 import pandas as pd
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
 from db_utils import create_db_engine, get_db_config
+from group_tree import ArbreGroupes
 from function import get_availabilityProf_From_Unavailable, get_availabilityRoom_From_Unavailable, \
     get_availabilityGroup_From_Unavailable, convert_days_int_to_string, get_availabilitySlot_From_Unavailable
 from logger_config import get_logger
@@ -11,6 +17,16 @@ from logger_config import get_logger
 # Configuration du logger pour ce module
 logger = get_logger(__name__)
 
+# (SQL, arguments nommés de pd.read_sql)
+Requete = Tuple[str, Dict[str, Any]]
+
+# Tables lues par load_and_prepare_data, avec une colonne updated_at
+TABLES_HORODATEES = ("rooms", "teachers", "users", "promotions", "`groups`", "subgroups", "teachings",
+                     "teachings_rooms", "slots", "slots_teachers")
+# Tables de contraintes (sans updated_at) et leur colonne d'entité
+TABLES_CONTRAINTES = {"teacher_constraints": "teacher_id", "room_constraints": "room_id",
+                      "group_constraints": "group_id", "slot_constraints": "slot_id"}
+
 
 # ==============================================================================
 # CLASSE 1: GESTION DES DONNÉES (DataProvider)
@@ -25,44 +41,99 @@ class DataProviderID:
         self.db_config = db_config if db_config else get_db_config()
         self.engine: Engine = create_db_engine(self.db_config)
 
-    def load_and_prepare_data(self,week_id:int) -> Dict[str, Any]:
+    # ------------------------------------------------------------------
+    # Requêtes de chargement (exécutées en parallèle)
+    # ------------------------------------------------------------------
+    def _lire(self, nom: str, requete: Requete) -> pd.DataFrame:
         """
-        Charge toutes les données depuis la BDD avec Pandas et les prépare
-        dans un format utilisable par le modèle.
+        Exécute une requête et journalise sa durée. pd.read_sql emprunte sa propre
+        connexion au pool de l'engine : les requêtes d'un même chargement s'exécutent
+        donc sur des connexions distinctes.
         """
-        list_amphi_c=[{0: [(11, 23)]},{1: [(0, 7)]},{2: [(0, 7)]},{3: []},{4: [(11, 23)]}] #
-        #Il faudrait que l'application puisse gérer le fait d'importer une liste des jours d'amphi, pour le
-        #moment on met les infos en dur afin de faire les tests
-        logger.info("1. Chargement des données depuis la base de données...")
-        jours = 5
-        creneaux_par_jour = 23
-        slots = [(d, s) for d in range(jours) for s in range(creneaux_par_jour)]
-        fenetre_midi = list(range(8, 11))
+        sql, options = requete
+        debut = time.perf_counter()
+        df = pd.read_sql(sql, self.engine, **options)
+        logger.info(f"   -> Requête {nom} : {len(df)} lignes en {(time.perf_counter() - debut) * 1000:.0f} ms")
+        return df
+
+    def _lancer_requetes(self, pool: ThreadPoolExecutor, requetes: Dict[str, Requete]) -> Dict[str, Future]:
+        """Soumet toutes les requêtes au pool ; chaque résultat est attendu seulement lorsqu'il sert."""
+        return {nom: pool.submit(self._lire, nom, requete) for nom, requete in requetes.items()}
+
+    @staticmethod
+    def _requetes_partagees() -> Dict[str, Requete]:
+        """Requêtes des données de référence communes à toutes les semaines."""
+        query_profs = """
+            SELECT t.id                                   AS teacher_id,
+                   CONCAT(u.first_name, ' ', u.last_name) AS prof_name
+            FROM teachers t
+                     JOIN users u ON t.user_id = u.id
+        """
+        query_prof_slot = """
+            SELECT s.id AS slot_id, CONCAT(u.first_name, ' ', u.last_name) AS prof_name
+            FROM slots_teachers st
+            JOIN slots s ON st.slot_id = s.id
+            JOIN teachers t ON st.teacher_id = t.id
+            JOIN users u ON t.user_id = u.id
+        """
+        # Arbre promotion → groupe → sous-groupe (sous-groupes rattachés via les séances qui les planifient)
+        query_arbre = """
+            SELECT p.name AS promotion_name, g.name AS group_name, sg.name AS subgroup_name
+            FROM `groups` g
+            JOIN promotions p ON g.promotion_id = p.id
+            LEFT JOIN (SELECT DISTINCT group_id, subgroup_id FROM slots WHERE subgroup_id IS NOT NULL) gs
+                   ON gs.group_id = g.id
+            LEFT JOIN subgroups sg ON gs.subgroup_id = sg.id
+        """
+        return {
+            "salles": ("SELECT id as name, seat_capacity FROM rooms WHERE id NOT IN (17, 18)", {}),
+            "profs": (query_profs, {}),
+            "profs_par_slot": (query_prof_slot, {}),
+            # Salles compatibles par (enseignement, type de séance)
+            "salles_compatibles": ("SELECT teaching_id, type_id, room_id FROM teachings_rooms", {}),
+            "arbre_groupes": (query_arbre, {}),
+        }
 
-        df_salles = pd.read_sql("SELECT id as name, seat_capacity FROM rooms WHERE id NOT IN (17, 18)", self.engine)
-        #df_profs = pd.read_sql(
-        #    "SELECT CONCAT(u.first_name, ' ', u.last_name) AS prof_name FROM teachers t JOIN users u ON t.user_id = u.id",
-        #    self.engine)
-        df_profs_with_id = pd.read_sql(
-            """SELECT t.id                                   AS teacher_id,
-                      CONCAT(u.first_name, ' ', u.last_name) AS prof_name
-               FROM teachers t
-                        JOIN users u ON t.user_id = u.id""",
-            self.engine
-        )
-        prof_to_teacher_id = dict(zip(df_profs_with_id['prof_name'], df_profs_with_id['teacher_id']))
-        profs = df_profs_with_id['prof_name'].tolist()  # Cette liste est maintenant cohérente
+    @staticmethod
+    def _requete_contraintes(table: str, alias: str, colonne: str, week_id: int) -> Requete:
+        """
+        Indisponibilités actives d'une table de contraintes : celles de la semaine, sinon
+        les contraintes permanentes (week_id NULL) du même jour et de la même entité.
+        """
+        sql = f"""
+               SELECT {alias}.{colonne}, {alias}.day_of_week, {alias}.start_time, {alias}.end_time,
+                      {alias}.priority, {alias}.week_id
+               FROM {table} {alias}
+               WHERE {alias}.active = 1
+                 AND ({alias}.week_id = %(week_id)s OR {alias}.week_id IS NULL)
+                 AND (
+                   {alias}.week_id = %(week_id)s
+                       OR ({alias}.week_id IS NULL
+                       AND NOT EXISTS (SELECT 1
+                                       FROM {table} {alias}2
+                                       WHERE {alias}2.{colonne} = {alias}.{colonne}
+                                         AND {alias}2.day_of_week = {alias}.day_of_week
+                                         AND {alias}2.week_id = %(week_id)s
+                                         AND {alias}2.active = 1)
+                       )
+                   )
+               """
+        return sql, {"params": {"week_id": week_id}}
+
+    def _requetes_semaine(self, week_id: int) -> Dict[str, Requete]:
+        """Requêtes propres à une semaine : séances à planifier et indisponibilités."""
         query_slots = """
-                      SELECT s.id, \
-                             s.duration, \
-                             t.title              AS teaching_title, \
-                             p.name               AS promotion_name, \
-                             g.name               AS group_name, \
+                      SELECT s.id,
+                             s.duration,
+                             t.title              AS teaching_title,
+                             p.name               AS promotion_name,
+                             g.name               AS group_name,
                              sg.name              AS subgroup_name,
-                             promo.student_amount AS promo_size, \
-                             gr.student_amount    AS group_size, \
-                             sub.student_amount   AS subgroup_size, \
-                             s.type_id, \
+                             promo.student_amount AS promo_size,
+                             gr.student_amount    AS group_size,
+                             sub.student_amount   AS subgroup_size,
+                             s.type_id,
+                             s.teaching_id,
                              s.promotion_id
                       FROM slots s
                                LEFT JOIN teachings t ON s.teaching_id = t.id
@@ -71,107 +142,101 @@ class DataProviderID:
                                LEFT JOIN subgroups sg ON s.subgroup_id = sg.id
                                LEFT JOIN promotions promo ON s.promotion_id = promo.id
                                LEFT JOIN `groups` gr ON s.group_id = gr.id
-                               LEFT JOIN subgroups sub ON s.subgroup_id = sub.id  
+                               LEFT JOIN subgroups sub ON s.subgroup_id = sub.id
                       WHERE week_id= %s
                       """
-        df_planning = pd.read_sql(query_slots, self.engine, params=(week_id,), index_col='id')
-        query_prof_slot = """
-            SELECT s.id AS slot_id, CONCAT(u.first_name, ' ', u.last_name) AS prof_name
-            FROM slots_teachers st
-            JOIN slots s ON st.slot_id = s.id
-            JOIN teachers t ON st.teacher_id = t.id
-            JOIN users u ON t.user_id = u.id
-        """
-        # AJOUTE CECI (corrigé et fonctionnel)
-        query_dispos = """
-                       SELECT tc.teacher_id, tc.day_of_week, tc.start_time, tc.end_time, tc.priority, tc.week_id
-                       FROM teacher_constraints tc
-                       WHERE tc.active = 1
-                         AND (tc.week_id = %(week_id)s OR tc.week_id IS NULL)
-                         AND (
-                           tc.week_id = %(week_id)s
-                               OR (tc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM teacher_constraints tc2 \
-                                               WHERE tc2.teacher_id = tc.teacher_id \
-                                                 AND tc2.day_of_week = tc.day_of_week \
-                                                 AND tc2.week_id = %(week_id)s \
-                                                 AND tc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
-        disponibilites_profs=get_availabilityProf_From_Unavailable(df_dispos,creneaux_par_jour)
-        query_dispos = """
-                       SELECT rc.room_id, rc.day_of_week, rc.start_time, rc.end_time, rc.priority, rc.week_id
-                       FROM room_constraints rc
-                       WHERE rc.active = 1
-                         AND (rc.week_id = %(week_id)s OR rc.week_id IS NULL)
-                         AND (
-                           rc.week_id = %(week_id)s
-                               OR (rc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM room_constraints rc2 \
-                                               WHERE rc2.room_id = rc.room_id \
-                                                 AND rc2.day_of_week = rc.day_of_week \
-                                                 AND rc2.week_id = %(week_id)s \
-                                                 AND rc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos_salles = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
-        disponibilites_salles=get_availabilityRoom_From_Unavailable(df_dispos_salles,creneaux_par_jour)
-
-        query_dispos = """
-                       SELECT gc.group_id, gc.day_of_week, gc.start_time, gc.end_time, gc.priority, gc.week_id
-                       FROM group_constraints gc
-                       WHERE gc.active = 1
-                         AND (gc.week_id = %(week_id)s OR gc.week_id IS NULL)
-                         AND (
-                           gc.week_id = %(week_id)s
-                               OR (gc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM group_constraints gc2 \
-                                               WHERE gc2.group_id = gc.group_id \
-                                                 AND gc2.day_of_week = gc.day_of_week \
-                                                 AND gc2.week_id = %(week_id)s \
-                                                 AND gc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos_groupes = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
-        disponibilites_groupes=get_availabilityGroup_From_Unavailable(df_dispos_groupes,20)
-
-        query_dispos = """
-                       SELECT sc.slot_id, sc.day_of_week, sc.start_time, sc.end_time, sc.priority, sc.week_id
-                       FROM slot_constraints sc
-                       WHERE sc.active = 1
-                         AND (sc.week_id = %(week_id)s OR sc.week_id IS NULL)
-                         AND (
-                           sc.week_id = %(week_id)s
-                               OR (sc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM slot_constraints sc2 \
-                                               WHERE sc2.slot_id = sc.slot_id \
-                                                 AND sc2.day_of_week = sc.day_of_week \
-                                                 AND sc2.week_id = %(week_id)s \
-                                                 AND sc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos_slots = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
-        disponibilites_slots=get_availabilitySlot_From_Unavailable(df_dispos_slots,20)
-        # DEBUG
-        df_prof_slot = pd.read_sql(query_prof_slot, self.engine)
-        profs_par_slot = df_prof_slot.groupby('slot_id')['prof_name'].apply(list).to_dict()
+        return {
+            "planning": (query_slots, {"params": (week_id,), "index_col": 'id'}),
+            "dispos_profs": self._requete_contraintes("teacher_constraints", "tc", "teacher_id", week_id),
+            "dispos_salles": self._requete_contraintes("room_constraints", "rc", "room_id", week_id),
+            "dispos_groupes": self._requete_contraintes("group_constraints", "gc", "group_id", week_id),
+            "dispos_slots": self._requete_contraintes("slot_constraints", "sc", "slot_id", week_id),
+        }
+
+    @staticmethod
+    def _assembler_partagees(resultats: Dict[str, Future]) -> Dict[str, Any]:
+        """Construit les données communes à partir des résultats des requêtes partagées."""
+        df_salles = resultats["salles"].result()
+        df_profs_with_id = resultats["profs"].result()
+        profs_par_slot = resultats["profs_par_slot"].result().groupby('slot_id')['prof_name'].apply(list).to_dict()
         logger.debug(f"profs par slot : {profs_par_slot}")
+        salles_compatibles = {
+            (int(teaching_id), int(type_id)): [int(r) for r in rooms]
+            for (teaching_id, type_id), rooms in
+            resultats["salles_compatibles"].result().groupby(['teaching_id', 'type_id'])['room_id']
+        }
+        arbre = ArbreGroupes.depuis_lignes(resultats["arbre_groupes"].result().to_dict('records'))
+        return {
+            "salles": df_salles.set_index('name')['seat_capacity'].to_dict(),
+            "profs": df_profs_with_id['prof_name'].tolist(),
+            "prof_to_teacher_id": dict(zip(df_profs_with_id['prof_name'], df_profs_with_id['teacher_id'])),
+            "profs_par_slot": profs_par_slot,
+            "salles_compatibles": salles_compatibles,
+            "hierarchie_groupes": arbre.to_dict(),
+        }
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+    def load_shared_data(self) -> Dict[str, Any]:
+        """
+        Charge les données de référence communes à toutes les semaines (salles,
+        professeurs, professeurs par séance, salles compatibles, arbre des groupes).
+        Utile pour générer plusieurs semaines sans relire ces tables à chaque fois.
+        Les requêtes sont exécutées en parallèle.
+        """
+        requetes = self._requetes_partagees()
+        with ThreadPoolExecutor(max_workers=len(requetes)) as pool:
+            return self._assembler_partagees(self._lancer_requetes(pool, requetes))
+
+    def load_and_prepare_data(self, week_id: int, shared: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Charge toutes les données depuis la BDD avec Pandas et les prépare
+        dans un format utilisable par le modèle.
+        `shared` (résultat de load_shared_data) évite de relire les données communes.
+        Les requêtes indépendantes (données communes, séances, indisponibilités) sont
+        lancées ensemble sur un pool de threads ; chaque étape de préparation n'attend
+        que les résultats dont elle a besoin.
+        """
+        list_amphi_c=[{0: [(11, 23)]},{1: [(0, 7)]},{2: [(0, 7)]},{3: []},{4: [(11, 23)]}] #
+        #Il faudrait que l'application puisse gérer le fait d'importer une liste des jours d'amphi, pour le
+        #moment on met les infos en dur afin de faire les tests
+        logger.info("1. Chargement des données depuis la base de données...")
+        jours = 5
+        creneaux_par_jour = 23
+        slots = [(d, s) for d in range(jours) for s in range(creneaux_par_jour)]
+        fenetre_midi = list(range(8, 11))
+
+        debut = time.perf_counter()
+        requetes = self._requetes_semaine(week_id)
+        if shared is None:
+            requetes.update(self._requetes_partagees())
+        with ThreadPoolExecutor(max_workers=len(requetes)) as pool:
+            resultats = self._lancer_requetes(pool, requetes)
+            if shared is None:
+                shared = self._assembler_partagees(resultats)
+            prof_to_teacher_id = dict(shared['prof_to_teacher_id'])
+            # Copie : _build_course_structures ajoute des professeurs fictifs propres à la semaine
+            profs = list(shared['profs'])
+            profs_par_slot = shared['profs_par_slot']
+            salles_compatibles = shared['salles_compatibles']
+            df_planning = resultats["planning"].result()
+            disponibilites_profs = get_availabilityProf_From_Unavailable(
+                resultats["dispos_profs"].result(), creneaux_par_jour)
+            disponibilites_salles = get_availabilityRoom_From_Unavailable(
+                resultats["dispos_salles"].result(), creneaux_par_jour)
+            disponibilites_groupes = get_availabilityGroup_From_Unavailable(resultats["dispos_groupes"].result(), 20)
+            disponibilites_slots = get_availabilitySlot_From_Unavailable(resultats["dispos_slots"].result(), 20)
+        logger.info(f"   -> {len(requetes)} requêtes chargées en parallèle en "
+                    f"{(time.perf_counter() - debut) * 1000:.0f} ms.")
+
         #profs = df_profs['prof_name'].tolist()
 
         #cours, duree_cours, taille_groupes, map_groupe_cours = self._build_course_structures(df_planning,profs_par_slot, profs)
         cours, duree_cours, taille_groupes, map_groupe_cours = self._build_course_structures(
             df_planning, profs_par_slot, profs
         )
-        salles = df_salles.set_index('name')['seat_capacity'].to_dict()
+        salles = dict(shared['salles'])
 
         logger.info(f"   -> {len(cours)} cours à planifier.")
         logger.info(f"   -> {len(salles)} salles et {len(profs)} professeurs disponibles.")
@@ -207,10 +272,93 @@ class DataProviderID:
             "disponibilites_groupes": disponibilites_groupes,
             "obligations_slots": disponibilites_slots,
             "prof_to_teacher_id": prof_to_teacher_id,
+            "salles_compatibles": salles_compatibles,
+            "hierarchie_groupes": dict(shared.get('hierarchie_groupes', {})),
             "liste_amphi_c": list_amphi_c,
             "group_to_dispo_key": group_to_dispo_key  # 🚨 Utilisation du mapping complet        }
         }
 
+    def jeton_modifications(self) -> str:
+        """
+        Jeton de changement des tables lues par load_and_prepare_data : nombre de lignes et
+        dernier updated_at des tables de référence, somme de contrôle (CRC32 combinés par XOR)
+        des tables de contraintes. Une seule requête de quelques lignes ; toute insertion,
+        suppression ou modification change le jeton.
+        """
+        parties = [f"SELECT '{table.strip('`')}' AS nom, COUNT(*) AS lignes, "
+                   f"CAST(MAX(updated_at) AS CHAR) AS marque FROM {table}" for table in TABLES_HORODATEES]
+        parties += [f"SELECT '{table}', COUNT(*), CAST(BIT_XOR(CRC32(CONCAT_WS('|', {colonne}, day_of_week, "
+                    f"start_time, end_time, priority, week_id, active))) AS CHAR) FROM {table}"
+                    for table, colonne in TABLES_CONTRAINTES.items()]
+        df_jeton = pd.read_sql(" UNION ALL ".join(parties), self.engine)
+        contenu = json.dumps(df_jeton.astype(str).values.tolist())
+        return hashlib.sha256(contenu.encode()).hexdigest()
+
+    def load_reference_assignments(self, reference_week_id: int) -> list:
+        """
+        Charge les affectations déjà enregistrées (edt_slot) d'une semaine de référence,
+        avec de quoi les associer aux cours d'une autre semaine (enseignement, type, groupe).
+
+        Returns:
+            Liste de dicts {teaching_id, type_id, groupe, duree, jour, decalage, room_id, profs}
+        """
+        query_edt = """
+                    SELECT es.slot_id, es.day_of_week, es.start_hour, es.room_id, \
+                           s.teaching_id, s.type_id, s.duration, \
+                           p.name  AS promotion_name, \
+                           g.name  AS group_name, \
+                           sg.name AS subgroup_name
+                    FROM edt_slot es
+                             JOIN slots s ON es.slot_id = s.id
+                             LEFT JOIN promotions p ON s.promotion_id = p.id
+                             LEFT JOIN `groups` g ON s.group_id = g.id
+                             LEFT JOIN subgroups sg ON s.subgroup_id = sg.id
+                    WHERE s.week_id = %s
+                    """
+        query_profs = """
+                      SELECT st.slot_id, CONCAT(u.first_name, ' ', u.last_name) AS prof_name
+                      FROM slots_teachers st
+                               JOIN slots s ON st.slot_id = s.id
+                               JOIN teachers t ON st.teacher_id = t.id
+                               JOIN users u ON t.user_id = u.id
+                      WHERE s.week_id = %s
+                      """
+        df_edt = pd.read_sql(query_edt, self.engine, params=(reference_week_id,))
+        df_profs = pd.read_sql(query_profs, self.engine, params=(reference_week_id,))
+        profs_par_slot = df_profs.groupby('slot_id')['prof_name'].apply(list).to_dict()
+
+        references = []
+        for _, row in df_edt.iterrows():
+            groupe = self._reference_group_label(row)
+            if groupe is None:
+                continue
+            references.append({
+                "slot_id": int(row['slot_id']),
+                "teaching_id": int(row['teaching_id']),
+                "type_id": int(row['type_id']),
+                "groupe": groupe,
+                "duree": int(row['duration'] * 2),
+                "jour": self.convert_daystring_to_int(row['day_of_week']),
+                "decalage": self._time_to_slot(row['start_hour']),
+                "room_id": int(row['room_id']) if pd.notna(row['room_id']) else None,
+                "profs": profs_par_slot.get(row['slot_id'], []),
+            })
+        logger.info(f"   -> {len(references)} affectations de référence chargées (semaine {reference_week_id}).")
+        return references
+
+    @staticmethod
+    def _reference_group_label(row) -> Optional[str]:
+        """Groupe principal d'un slot, nommé comme dans `_build_course_structures`."""
+        if row['type_id'] == 1:
+            return row['promotion_name']
+        if row['type_id'] == 2:
+            return row['group_name']
+        if row['type_id'] == 3:
+            return f"{row['group_name']}{row['subgroup_name']}"
+        if row['type_id'] == 4:
+            return row['group_name'] if pd.notna(row['group_name']) else row['promotion_name']
+        return None
+
     def get_list_room(self):
         list_room=[]
         query_dispos = """SELECT name FROM rooms """
@@ -318,6 +466,9 @@ class DataProviderID:
             cours.append({
                 "id": cid,
                 "groups": affected_groups,
+                "promotion": row['promotion_name'],
+                "teaching_id": int(row['teaching_id']) if pd.notna(row.get('teaching_id')) else None,
+                "type_id": int(row['type_id']),
                 "allowed_prof_indices": indices_profs
             })
             duree_cours[cid] = duration_slots
@@ -329,7 +480,9 @@ class DataProviderID:
                 map_groupe_cours[g].append(cid)
         return cours, duree_cours, taille_groupes, map_groupe_cours
 
-    def convert_courses_dict_to_list_insert(self,courses_dict_list):
+    @staticmethod
+    def courses_dict_to_rows(courses_dict_list) -> list:
+        """Convertit les cours planifiés en lignes (start_hour, slot_id, room_id, day_of_week) de edt_slot."""
         cours_input = []
 
         for c in courses_dict_list:
@@ -342,10 +495,32 @@ class DataProviderID:
                 day_name,
             )
             cours_input.append(tuple_cours)
-        df_insert = pd.DataFrame(cours_input, columns=['start_hour', 'slot_id', 'room_id','day_of_week'])
+        return cours_input
+
+    def convert_courses_dict_to_list_insert(self,courses_dict_list):
+        cours_input = self.courses_dict_to_rows(courses_dict_list)
+        self.insert_edt_rows(cours_input)
+        return cours_input
+
+    def insert_edt_rows(self, rows) -> None:
+        """Insère en une seule fois des lignes (start_hour, slot_id, room_id, day_of_week) dans edt_slot."""
+        df_insert = pd.DataFrame(rows, columns=['start_hour', 'slot_id', 'room_id','day_of_week'])
         table="edt_slot"
         self.insert_data_with_pandas(df_insert, table)
-        return cours_input
+
+    def replace_week_rows(self, week_id: int, rows) -> None:
+        """
+        Remplace, dans une même transaction, les lignes edt_slot des séances de la semaine
+        par `rows` (start_hour, slot_id, room_id, day_of_week). Utilisé après une réparation :
+        les anciennes affectations de la semaine ne doivent pas subsister.
+        """
+        df_insert = pd.DataFrame(rows, columns=['start_hour', 'slot_id', 'room_id', 'day_of_week'])
+        with self.engine.begin() as connexion:
+            connexion.execute(text("DELETE FROM edt_slot "
+                                   "WHERE slot_id IN (SELECT id FROM slots WHERE week_id = :week_id)"),
+                              {"week_id": week_id})
+            df_insert.to_sql(name='edt_slot', con=connexion, if_exists='append', index=False)
+        logger.info(f"   -> {len(df_insert)} lignes edt_slot remplacées pour la semaine {week_id}.")
 
     def insert_data_with_pandas(self, df_to_insert, table_name):
         try:
@@ -0,0 +1,118 @@
+"""
+Résolution décomposée par promotion.
+Respecte le principe Single Responsibility (SOLID).
+
+Les promotions (BUT1, BUT2, BUT3...) ne partagent que les professeurs et les
+salles. Chaque promotion est d'abord résolue séparément dans un processus
+dédié ; un modèle de fusion sur l'ensemble des données est ensuite résolu avec
+les sous-solutions comme indications de départ (AddHint), ce qui règle les
+conflits de professeurs et de salles entre promotions.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from ortools.sat.python import cp_model
+
+from interfaces import ISolutionSink
+from logger_config import get_logger
+from solution_parser import SolutionParser
+from solver_profiles import SolverProfile, charger_profil, nombre_coeurs_utilisables
+from time_table_model import TimetableModel, MODE_BOOLEEN
+
+logger = get_logger(__name__)
+
+PROMOTION_INCONNUE = "SANS_PROMOTION"
+# Part du temps total consacrée aux sous-problèmes (le reste va au modèle de fusion)
+PART_SOUS_PROBLEMES = 0.5
+
+
+def decouper_par_promotion(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Découpe les données préparées en un jeu de données par promotion.
+    Salles, professeurs et disponibilités restent partagés ; seuls les cours
+    (et les structures indexées par cours ou groupe) sont filtrés.
+    """
+    cours_par_promotion: Dict[str, list] = {}
+    for c in data['cours']:
+        cours_par_promotion.setdefault(c.get('promotion') or PROMOTION_INCONNUE, []).append(c)
+
+    sous_donnees = {}
+    for promotion, cours in cours_par_promotion.items():
+        ids = {c['id'] for c in cours}
+        map_groupe_cours = {g: [cid for cid in liste if cid in ids]
+                            for g, liste in data.get('map_groupe_cours', {}).items()}
+        map_groupe_cours = {g: liste for g, liste in map_groupe_cours.items() if liste}
+        sous = dict(data)
+        sous.update({
+            'cours': cours,
+            'duree_cours': {cid: duree for cid, duree in data['duree_cours'].items() if cid in ids},
+            'map_groupe_cours': map_groupe_cours,
+            'all_groups': list(map_groupe_cours.keys()),
+        })
+        sous_donnees[promotion] = sous
+    return sous_donnees
+
+
+def _resoudre_sous_probleme(args: Tuple[str, Dict[str, Any], str, SolverProfile]) -> Tuple[str, int, Dict[str, tuple]]:
+    """Résout une promotion (exécuté dans un processus du pool) et retourne ses affectations."""
+    promotion, data, mode, profil = args
+    model = TimetableModel(data, mode=mode)
+    model.build_model()
+    resultat = model.solve(profil=profil)
+    if resultat['vars'] is None:
+        return promotion, resultat['status'], {}
+    affectations = {a.course_id: (a.start_slot, a.room_id, a.teacher_id)
+                    for a in SolutionParser(resultat, data).parse_assignments()}
+    return promotion, resultat['status'], affectations
+
+
+class DecomposedSolver:
+    """Résout les promotions en parallèle puis fusionne dans un modèle global."""
+
+    def __init__(self, data: Dict[str, Any], mode: str = MODE_BOOLEEN, nb_coeurs: Optional[int] = None,
+                 profil: Optional[SolverProfile] = None):
+        self.data = data
+        self.mode = mode
+        self.profil = profil or charger_profil()
+        self.nb_coeurs = nb_coeurs or self.profil.nb_workers or nombre_coeurs_utilisables()
+        self.statuts: Dict[str, int] = {}
+        self.modele_fusion: Optional[TimetableModel] = None
+
+    def resoudre_sous_problemes(self, max_time_seconds: float) -> Dict[str, tuple]:
+        """Résout chaque promotion dans un processus ; les cœurs sont répartis entre promotions."""
+        sous_donnees = decouper_par_promotion(self.data)
+        nb_processus = min(len(sous_donnees), self.nb_coeurs)
+        workers_par_promotion = max(1, self.nb_coeurs // max(1, len(sous_donnees)))
+        logger.info(f"   -> Décomposition : {len(sous_donnees)} promotions, {nb_processus} processus, "
+                    f"{workers_par_promotion} workers CP-SAT chacun.")
+        profil = self.profil.avec(max_time_seconds=max_time_seconds, nb_workers=workers_par_promotion)
+        taches = [(promotion, sous, self.mode, profil) for promotion, sous in sous_donnees.items()]
+
+        affectations: Dict[str, tuple] = {}
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            for promotion, statut, resultat in pool.map(_resoudre_sous_probleme, taches):
+                self.statuts[promotion] = statut
+                affectations.update(resultat)
+                logger.info(f"      → {promotion} : {cp_model.CpSolver().StatusName(statut)} "
+                            f"({len(resultat)} cours placés)")
+        return affectations
+
+    def resoudre(self, max_time_seconds: Optional[float] = None, sinks: Optional[Sequence[ISolutionSink]] = None,
+                 **options_construction) -> Dict[str, Any]:
+        """
+        Résout les sous-problèmes puis le modèle de fusion avec leurs solutions en indications.
+        Les solutions intermédiaires du modèle de fusion sont publiées vers `sinks`.
+
+        Returns:
+            Le résultat de `TimetableModel.solve` du modèle de fusion, complété par
+            'statuts_promotions'.
+        """
+        max_time_seconds = max_time_seconds or self.profil.max_time_seconds
+        affectations = self.resoudre_sous_problemes(max_time_seconds * PART_SOUS_PROBLEMES)
+        self.modele_fusion = TimetableModel(self.data, mode=self.mode)
+        self.modele_fusion.build_model(**options_construction)
+        self.modele_fusion.appliquer_indications(affectations)
+        resultat = self.modele_fusion.solve(max_time_seconds=max_time_seconds * (1 - PART_SOUS_PROBLEMES),
+                                            nb_workers=self.nb_coeurs, profil=self.profil, sinks=sinks)
+        resultat['statuts_promotions'] = dict(self.statuts)
+        return resultat
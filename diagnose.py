@@ -1,6 +1,11 @@
+import time
 from logger_config import get_logger
-from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Set, Any
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Tuple, Set, Any, Optional
+import numpy as np
+from start_domains import StartDomainEngine
+from room_candidates import RoomCandidateSelector
+from group_tree import ArbreGroupes
 
 # Configuration du logger pour ce module
 logger = get_logger(__name__)
@@ -12,26 +17,109 @@ class ProblemesFaisabilite:
     cours_sans_creneau_valide: List[Tuple[str, int]] = field(default_factory=list)
     cours_sans_salle_adequate: List[Tuple[str, str, int]] = field(default_factory=list)
     groupes_surcharges: List[Tuple[str, int, int]] = field(default_factory=list)
+    # (professeur, créneaux exigés par ses cours à professeur unique, créneaux disponibles)
+    professeurs_surcharges: List[Tuple[str, int, int]] = field(default_factory=list)
+    # (salles de la classe, créneaux exigés par les cours limités à ces salles, créneaux disponibles)
+    classes_salles_surchargees: List[Tuple[str, int, int]] = field(default_factory=list)
+    # (groupe, durée minimale, séances d'au moins cette durée, places entre les pauses midi)
+    empilements_journees: List[Tuple[str, int, int, int]] = field(default_factory=list)
+    # (sous-groupe+parent, créneaux exigés ensemble, créneaux utilisables)
+    hierarchies_surchargees: List[Tuple[str, int, int]] = field(default_factory=list)
+    # (cours deux à deux en conflit, somme des durées, créneaux qu'ils peuvent occuper)
+    cliques_surchargees: List[Tuple[Tuple[str, ...], int, int]] = field(default_factory=list)
+
+    @property
+    def a_des_problemes(self) -> bool:
+        return any(getattr(self, f.name) for f in fields(self))
 
     def to_dict(self) -> Dict[str, List]:
         """Conversion en dictionnaire pour rétrocompatibilité."""
         return {
             'no_valid_start': self.cours_sans_creneau_valide,
             'no_room': self.cours_sans_salle_adequate,
-            'group_overbooked': self.groupes_surcharges
+            'group_overbooked': self.groupes_surcharges,
+            'teacher_overloaded': self.professeurs_surcharges,
+            'room_class_overloaded': self.classes_salles_surchargees,
+            'day_packing': self.empilements_journees,
+            'hierarchy_overbooked': self.hierarchies_surchargees,
+            'clique_overloaded': self.cliques_surchargees,
         }
 
 
+class GrapheConflits:
+    """
+    Graphe des cours qui ne peuvent pas se chevaucher : même groupe, groupe parent
+    (hiérarchie) ou même professeur imposé (un seul professeur autorisé).
+    Matrice d'adjacence booléenne NumPy (cours × cours).
+    """
+
+    def __init__(self, donnees_planning: Dict[str, Any], hierarchie: Dict[str, str]):
+        self.ids = [c['id'] for c in donnees_planning['cours']]
+        self._indice = {cid: k for k, cid in enumerate(self.ids)}
+        self.adjacence = np.zeros((len(self.ids), len(self.ids)), dtype=bool)
+        self.graines: List[List[int]] = []
+
+        cours_par_groupe = donnees_planning['map_groupe_cours']
+        for groupe, liste_id_cours in cours_par_groupe.items():
+            # Un groupe est en conflit avec lui-même et avec tous ses ancêtres
+            membres = set(liste_id_cours)
+            parent = hierarchie.get(groupe)
+            while parent is not None:
+                membres |= set(cours_par_groupe.get(parent, []))
+                parent = hierarchie.get(parent)
+            self._ajouter_clique(membres)
+
+        par_prof: Dict[int, List[str]] = {}
+        for c in donnees_planning['cours']:
+            autorises = c.get('allowed_prof_indices', [])
+            if len(autorises) == 1:
+                par_prof.setdefault(autorises[0], []).append(c['id'])
+        for membres in par_prof.values():
+            self._ajouter_clique(membres)
+        np.fill_diagonal(self.adjacence, False)
+
+    def _ajouter_clique(self, membres) -> None:
+        indices = sorted(self._indice[cid] for cid in membres if cid in self._indice)
+        if len(indices) > 1:
+            self.adjacence[np.ix_(indices, indices)] = True
+            self.graines.append(indices)
+
+    def cliques(self) -> List[List[int]]:
+        """
+        Cliques maximales obtenues en étendant gloutonnement chaque clique naturelle
+        (groupe + ancêtres, professeur imposé) par les cours adjacents à tous ses membres,
+        du plus haut degré au plus bas. Les doublons sont éliminés.
+        """
+        ordre = np.argsort(-self.adjacence.sum(axis=1), kind='stable')
+        vues: Set[frozenset] = set()
+        resultat = []
+        for graine in self.graines:
+            membres = list(graine)
+            communs = self.adjacence[membres].all(axis=0)
+            for v in ordre:
+                if communs[v]:
+                    membres.append(int(v))
+                    communs &= self.adjacence[v]
+            cle = frozenset(membres)
+            if cle not in vues:
+                vues.add(cle)
+                resultat.append(sorted(membres))
+        return resultat
+
+
 class DiagnosticEmploiDuTemps:
     """Classe pour diagnostiquer la faisabilité d'un emploi du temps."""
 
-    def __init__(self, donnees_planning: Dict[str, Any]):
+    def __init__(self, donnees_planning: Dict[str, Any], hierarchie: Optional[Dict[str, str]] = None):
         """
         Initialise le diagnostic avec les données du planning.
         
         Args:
             donnees_planning: Dictionnaire contenant toutes les données du planning
+            hierarchie: Relation enfant → parent des groupes (arbre des données par défaut)
         """
+        self.donnees = donnees_planning
+        self.hierarchie = ArbreGroupes.depuis_donnees(donnees_planning).parents if hierarchie is None else hierarchie
         self.nombre_jours = donnees_planning['jours']
         self.creneaux_par_jour = donnees_planning['creneaux_par_jour']
         self.liste_creneaux = donnees_planning['slots']  # Liste de (jour, decalage_horaire)
@@ -42,6 +130,7 @@ class DiagnosticEmploiDuTemps:
         self.duree_par_cours = donnees_planning['duree_cours']
         self.taille_par_groupe = donnees_planning['taille_groupes']
         self.cours_par_groupe = donnees_planning['map_groupe_cours']
+        self.domaines = StartDomainEngine(donnees_planning)
 
         # Calcul des créneaux utilisables (hors pause midi)
         self.decalages_utilisables = [
@@ -50,31 +139,34 @@ class DiagnosticEmploiDuTemps:
         ]
         self.creneaux_utilisables_par_jour = len(self.decalages_utilisables)
         self.total_creneaux_utilisables = self.creneaux_utilisables_par_jour * self.nombre_jours
+        # Masque global des créneaux hors pause midi
+        self.masque_utiles = np.zeros(self.nombre_total_creneaux, dtype=bool)
+        self.masque_utiles[self.domaines.temps_utiles()] = True
+
+    def _segments_journee(self) -> np.ndarray:
+        """Longueurs des plages continues d'une journée séparées par la pause midi."""
+        segments, courant = [], 0
+        for decalage in range(self.creneaux_par_jour):
+            if decalage in self.pause_midi:
+                if courant:
+                    segments.append(courant)
+                courant = 0
+            else:
+                courant += 1
+        if courant:
+            segments.append(courant)
+        return np.array(segments, dtype=int)
 
     def _verifier_creneaux_depart_valides(self, problemes: ProblemesFaisabilite) -> None:
-        """Vérifie que chaque cours a au moins un créneau de départ valide."""
+        """
+        Vérifie que chaque cours a au moins un créneau de départ valide
+        (durée, pause midi, disponibilités et horaires obligatoires), via les
+        mêmes domaines précalculés que le modèle.
+        """
         for cours in self.liste_cours:
-            id_cours = cours['id']
-            duree_cours = self.duree_par_cours[id_cours]
-            creneaux_depart_valides = []
-
-            for index_creneau, (jour, decalage_horaire) in enumerate(self.liste_creneaux):
-                # Le cours doit tenir dans la journée (pas de débordement)
-                if decalage_horaire + duree_cours > self.creneaux_par_jour:
-                    continue
-
-                # Le cours ne doit pas chevaucher la pause midi
-                chevauche_pause_midi = any(
-                    (decalage_horaire + increment) in self.pause_midi
-                    for increment in range(duree_cours)
-                )
-                if chevauche_pause_midi:
-                    continue
-
-                creneaux_depart_valides.append((index_creneau, jour, decalage_horaire))
-
-            if not creneaux_depart_valides:
-                problemes.cours_sans_creneau_valide.append((id_cours, duree_cours))
+            if not self.domaines.departs_autorises(cours):
+                id_cours = cours['id']
+                problemes.cours_sans_creneau_valide.append((id_cours, self.duree_par_cours[id_cours]))
 
     def _verifier_capacite_salles(self, problemes: ProblemesFaisabilite) -> None:
         """Vérifie que chaque cours dispose d'au moins une salle avec capacité suffisante."""
@@ -104,6 +196,104 @@ class DiagnosticEmploiDuTemps:
                     (nom_groupe, creneaux_requis, self.total_creneaux_utilisables)
                 )
 
+    def _verifier_charge_professeurs(self, problemes: ProblemesFaisabilite) -> None:
+        """
+        Charge des cours à professeur unique comparée aux créneaux utilisables où ce
+        professeur est disponible (disponibilites_profs).
+        """
+        profs = self.donnees.get('profs', [])
+        uniques = [(c['allowed_prof_indices'][0], self.duree_par_cours[c['id']]) for c in self.liste_cours
+                   if len(c.get('allowed_prof_indices', [])) == 1]
+        if not profs or not uniques:
+            return
+        indices, durees = np.array(uniques).T
+        charges = np.bincount(indices, weights=durees, minlength=len(profs)).astype(int)
+        for p in np.flatnonzero(charges):
+            disponibles = int((self.domaines.masque_prof(int(p), 1) & self.masque_utiles).sum())
+            if charges[p] > disponibles:
+                problemes.professeurs_surcharges.append((profs[p], int(charges[p]), disponibles))
+
+    def _verifier_classes_salles(self, problemes: ProblemesFaisabilite) -> None:
+        """
+        Pour chaque classe de salles (ensemble des salles candidates d'un cours : compatibles,
+        assez grandes et disponibles), les cours limités à cette classe ne doivent pas exiger
+        plus de créneaux que ses salles n'en offrent.
+        """
+        salle_ids = list(self.donnees['salles'])
+        if not salle_ids or not self.liste_cours:
+            return
+        candidates = RoomCandidateSelector(self.donnees, self.domaines).calculer()
+        appartenance = np.zeros((len(self.liste_cours), len(salle_ids)), dtype=bool)
+        for k, cours in enumerate(self.liste_cours):
+            appartenance[k, candidates[cours['id']][0]] = True
+        durees = np.array([self.duree_par_cours[c['id']] for c in self.liste_cours])
+        offre = np.array([(self.domaines.masque_salle(r, 1) & self.masque_utiles).sum()
+                          for r in range(len(salle_ids))])
+        classes = np.unique(appartenance, axis=0)
+        # Cours dont toutes les salles candidates appartiennent à la classe (cours × classe)
+        inclus = ~(appartenance[:, None, :] & ~classes[None, :, :]).any(axis=2)
+        besoins = durees @ inclus
+        disponibles = classes @ offre
+        for c in np.flatnonzero(besoins > disponibles):
+            noms = ",".join(str(salle_ids[r]) for r in np.flatnonzero(classes[c]))
+            problemes.classes_salles_surchargees.append((noms, int(besoins[c]), int(disponibles[c])))
+
+    def _verifier_empilement_journees(self, problemes: ProblemesFaisabilite) -> None:
+        """
+        Un cours ne traverse pas la pause midi : une plage de longueur L accueille au plus
+        L // d séances de durée >= d. Le nombre de séances d'un groupe d'au moins d créneaux
+        est comparé à ces places sur la semaine.
+        """
+        segments = self._segments_journee()
+        for nom_groupe, liste_id_cours in self.cours_par_groupe.items():
+            durees = np.array([self.duree_par_cours[cid] for cid in liste_id_cours], dtype=int)
+            if durees.size == 0:
+                continue
+            seuils = np.unique(durees)
+            nb_seances = (durees[None, :] >= seuils[:, None]).sum(axis=1)
+            places = self.nombre_jours * (segments[None, :] // seuils[:, None]).sum(axis=1)
+            for k in np.flatnonzero(nb_seances > places):
+                problemes.empilements_journees.append(
+                    (nom_groupe, int(seuils[k]), int(nb_seances[k]), int(places[k])))
+
+    def _verifier_charge_hierarchies(self, problemes: ProblemesFaisabilite) -> None:
+        """Un sous-groupe suit ses cours et ceux de son groupe parent : leur union doit tenir dans la semaine."""
+        for sous_groupe, parent in self.hierarchie.items():
+            if sous_groupe not in self.cours_par_groupe or parent not in self.cours_par_groupe:
+                continue
+            cours = set(self.cours_par_groupe[sous_groupe]) | set(self.cours_par_groupe[parent])
+            besoin = sum(self.duree_par_cours[cid] for cid in cours)
+            if besoin > self.total_creneaux_utilisables:
+                problemes.hierarchies_surchargees.append(
+                    (f"{sous_groupe}+{parent}", besoin, self.total_creneaux_utilisables))
+
+    def _couvertures(self) -> np.ndarray:
+        """Créneaux que chaque cours peut occuper (départs autorisés étendus sur sa durée), cours × créneau."""
+        couvertures = np.zeros((len(self.liste_cours), self.nombre_total_creneaux), dtype=bool)
+        for k, cours in enumerate(self.liste_cours):
+            departs = self.domaines.masque_departs(cours)
+            couvertures[k] = departs
+            for decalage in range(1, self.duree_par_cours[cours['id']]):
+                couvertures[k, decalage:] |= departs[:-decalage]
+        return couvertures
+
+    def _verifier_cliques_conflits(self, problemes: ProblemesFaisabilite) -> None:
+        """
+        Les cours d'une clique du graphe de conflits se suivent sans chevauchement : la somme
+        de leurs durées ne peut dépasser le nombre de créneaux qu'au moins l'un d'eux peut occuper.
+        """
+        graphe = GrapheConflits(self.donnees, self.hierarchie)
+        if not graphe.graines:
+            return
+        couvertures = self._couvertures()
+        durees = np.array([self.duree_par_cours[cid] for cid in graphe.ids])
+        for clique in graphe.cliques():
+            besoin = int(durees[clique].sum())
+            disponible = int(couvertures[clique].any(axis=0).sum())
+            if besoin > disponible:
+                problemes.cliques_surchargees.append(
+                    (tuple(graphe.ids[k] for k in clique), besoin, disponible))
+
     def _afficher_rapport(self, problemes: ProblemesFaisabilite) -> None:
         """Affiche le rapport de diagnostic dans les logs."""
         logger.info("=== Diagnostic faisabilité (statique) ===")
@@ -118,7 +308,7 @@ class DiagnosticEmploiDuTemps:
         )
 
         if problemes.cours_sans_creneau_valide:
-            logger.info("Cours sans aucun start valide (durée incompatible ou traversée midi):")
+            logger.info("Cours sans aucun start valide (durée, traversée midi, disponibilités ou horaires obligatoires):")
             for id_cours, duree in problemes.cours_sans_creneau_valide:
                 logger.info(f" - {id_cours}: durée {duree} slots")
         else:
@@ -141,6 +331,22 @@ class DiagnosticEmploiDuTemps:
                 "(check global nécessaire mais non suffisant)."
             )
 
+        for titre, entrees in (
+                ("Professeurs à professeur unique surchargés (besoin, créneaux disponibles)",
+                 problemes.professeurs_surcharges),
+                ("Classes de salles surchargées (besoin, créneaux disponibles)",
+                 problemes.classes_salles_surchargees),
+                ("Séances trop longues pour les plages entre pauses (groupe, durée min, séances, places)",
+                 problemes.empilements_journees),
+                ("Sous-groupes + parent surchargés (besoin, créneaux utilisables)",
+                 problemes.hierarchies_surchargees),
+                ("Cours mutuellement en conflit qui ne tiennent pas dans leurs créneaux (cours, besoin, disponibles)",
+                 problemes.cliques_surchargees)):
+            if entrees:
+                logger.info(f"\n{titre}:")
+                for entree in entrees:
+                    logger.info(f" - {entree}")
+
         logger.info("\nSi tout est OK ci-dessus mais INFEASIBLE persiste, vérifier :")
         logger.info("- contrainte de salles disponibles simultanément (nombre de grandes salles pour BUT3)")
         logger.info("- contraintes de profs (s'il y a des restrictions implicites)")
@@ -149,32 +355,50 @@ class DiagnosticEmploiDuTemps:
             "assure-toi qu'elles correspondent exactement aux indices de slots"
         )
 
-    def executer_diagnostic(self) -> Dict[str, List]:
+    def executer_diagnostic(self, fail_fast: bool = False) -> Dict[str, List]:
         """
         Exécute le diagnostic complet de faisabilité.
+
+        Args:
+            fail_fast: Arrête les vérifications à la première qui détecte un problème
         
         Returns:
             Dictionnaire des problèmes détectés (pour rétrocompatibilité)
         """
         problemes = ProblemesFaisabilite()
+        verifications = (
+            self._verifier_creneaux_depart_valides,
+            self._verifier_capacite_salles,
+            self._verifier_charge_groupes,
+            self._verifier_charge_professeurs,
+            self._verifier_classes_salles,
+            self._verifier_empilement_journees,
+            self._verifier_charge_hierarchies,
+            self._verifier_cliques_conflits,
+        )
 
-        self._verifier_creneaux_depart_valides(problemes)
-        self._verifier_capacite_salles(problemes)
-        self._verifier_charge_groupes(problemes)
+        debut = time.perf_counter()
+        for verification in verifications:
+            verification(problemes)
+            if fail_fast and problemes.a_des_problemes:
+                logger.info(f"Arrêt du diagnostic après {verification.__name__} (fail_fast).")
+                break
+        logger.info(f"Vérifications statiques en {(time.perf_counter() - debut) * 1000:.1f} ms.")
         self._afficher_rapport(problemes)
 
         return problemes.to_dict()
 
 
-def diagnose_feasibility(donnees_planning: Dict[str, Any]) -> Dict[str, List]:
+def diagnose_feasibility(donnees_planning: Dict[str, Any], fail_fast: bool = False) -> Dict[str, List]:
     """
     Point d'entrée pour le diagnostic de faisabilité (rétrocompatibilité).
     
     Args:
         donnees_planning: Dictionnaire contenant toutes les données du planning
+        fail_fast: Arrête les vérifications au premier problème détecté
         
     Returns:
         Dictionnaire des problèmes détectés
     """
     diagnostic = DiagnosticEmploiDuTemps(donnees_planning)
-    return diagnostic.executer_diagnostic()
\ No newline at end of file
+    return diagnostic.executer_diagnostic(fail_fast=fail_fast)
\ No newline at end of file
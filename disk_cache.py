@@ -0,0 +1,83 @@
+"""
+Cache disque générique avec éviction LRU.
+Respecte le principe Single Responsibility (SOLID).
+
+Chaque entrée est un fichier pickle nommé d'après sa clé. La date de
+modification sert de date de dernier accès : une lecture la met à jour, et
+l'écriture supprime les entrées les plus anciennes tant que le nombre
+d'entrées ou la taille totale dépassent les limites.
+"""
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+EXTENSION = ".pkl"
+
+
+class DiskLRUCache:
+    """Stocke des objets picklables sur disque, bornés en nombre et en taille."""
+
+    def __init__(self, dossier: Path, max_entrees: int = 10, max_octets: Optional[int] = None):
+        self.dossier = Path(dossier)
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        self.max_entrees = max_entrees
+        self.max_octets = max_octets
+
+    def _chemin(self, cle: str) -> Path:
+        return self.dossier / f"{cle}{EXTENSION}"
+
+    def entrees(self) -> List[Path]:
+        """Entrées du cache, de la moins récemment utilisée à la plus récente."""
+        return sorted(self.dossier.glob(f"*{EXTENSION}"), key=lambda p: p.stat().st_mtime)
+
+    def contient(self, cle: str) -> bool:
+        return self._chemin(cle).exists()
+
+    def lire(self, cle: str) -> Optional[Any]:
+        """Retourne l'objet associé à la clé (None si absent ou illisible) et le marque comme utilisé."""
+        chemin = self._chemin(cle)
+        if not chemin.exists():
+            return None
+        try:
+            with open(chemin, "rb") as f:
+                objet = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Entrée de cache illisible {chemin.name} : {e}. Supprimée.")
+            chemin.unlink(missing_ok=True)
+            return None
+        os.utime(chemin)
+        return objet
+
+    def ecrire(self, cle: str, objet: Any) -> Path:
+        """Écrit l'entrée de manière atomique puis applique l'éviction LRU."""
+        chemin = self._chemin(cle)
+        fd, temporaire = tempfile.mkstemp(dir=self.dossier, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(objet, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, chemin)
+        self._evincer(conserver=chemin)
+        return chemin
+
+    def supprimer(self, cle: str) -> None:
+        self._chemin(cle).unlink(missing_ok=True)
+
+    def _evincer(self, conserver: Path) -> None:
+        entrees = self.entrees()
+        taille = sum(p.stat().st_size for p in entrees)
+        for chemin in entrees:
+            trop_d_entrees = len(entrees) > self.max_entrees
+            trop_gros = self.max_octets is not None and taille > self.max_octets
+            if not (trop_d_entrees or trop_gros):
+                break
+            if chemin == conserver:
+                continue
+            taille -= chemin.stat().st_size
+            chemin.unlink(missing_ok=True)
+            entrees = [p for p in entrees if p != chemin]
+            logger.info(f"Cache : éviction de {chemin.name}")
@@ -0,0 +1,181 @@
+"""
+Ordonnancement glouton constructif (sans solveur).
+Respecte le principe Single Responsibility (SOLID).
+
+Les cours les plus contraints sont placés en premier (CM, peu de professeurs
+autorisés, peu de départs possibles, longue durée), au premier départ où le
+groupe, un professeur autorisé et une salle candidate sont libres. Les
+occupations sont des matrices booléennes NumPy (groupe, professeur, salle ×
+créneau). Un cours bloque ses groupes ; il est refusé si un groupe ancêtre ou
+descendant est déjà occupé. L'ordre CM → TD → TP d'une même matière est
+respecté.
+
+Le résultat sert d'indications de départ (AddHint) pour CP-SAT, et de
+planning de secours listant les séances non placées lorsque le modèle exact
+échoue.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from course_data_models import CourseAssignment
+from function import recup_cours
+from logger_config import get_logger
+from room_candidates import RoomCandidateSelector
+from start_domains import StartDomainEngine
+from warm_start import Indication
+
+logger = get_logger(__name__)
+
+RANG_TYPE = {"CM": 0, "TD": 1, "TP": 2}
+
+
+def departs_libres(occupation: np.ndarray, duree: int) -> np.ndarray:
+    """
+    Départs s tels que [s, s + duree) est entièrement libre, pour chaque ligne
+    d'une matrice d'occupation (ou pour un vecteur).
+    """
+    nb_slots = occupation.shape[-1]
+    cumul = np.concatenate([np.zeros(occupation.shape[:-1] + (1,), dtype=np.int32),
+                            np.cumsum(occupation, axis=-1, dtype=np.int32)], axis=-1)
+    fins = np.minimum(np.arange(nb_slots) + duree, nb_slots)
+    return (cumul[..., fins] - cumul[..., :nb_slots]) == 0
+
+
+@dataclass
+class ResultatGlouton:
+    """Affectations trouvées {cid: (créneau, salle, professeur)} et cours non placés."""
+    affectations: Dict[str, Indication] = field(default_factory=dict)
+    non_places: List[str] = field(default_factory=list)
+    duree: float = 0.0
+
+    @property
+    def complet(self) -> bool:
+        return not self.non_places
+
+
+class GreedyScheduler:
+    """Place les cours un par un sur des matrices d'occupation."""
+
+    def __init__(self, data: Dict[str, Any], hierarchie: Optional[Dict[str, str]] = None):
+        self.data = data
+        self.hierarchie = hierarchie or {}
+        self.domaines = StartDomainEngine(data)
+        self.salles_candidates = RoomCandidateSelector(data, self.domaines).calculer()
+        self.capacites = list(data.get('capacites', list(data['salles'].values())))
+        groupes = set(data.get('map_groupe_cours', {})) | set(self.hierarchie) | set(self.hierarchie.values())
+        for c in data['cours']:
+            groupes.update(c['groups'])
+        self._indice_groupe = {g: k for k, g in enumerate(sorted(groupes))}
+        nb_slots = data['nb_slots']
+        self.occ_groupes = np.zeros((len(self._indice_groupe), nb_slots), dtype=bool)
+        self.occ_profs = np.zeros((len(data['profs']), nb_slots), dtype=bool)
+        self.occ_salles = np.zeros((len(data['salles']), nb_slots), dtype=bool)
+        self.resultat = ResultatGlouton()
+
+    # ------------------------------------------------------------------
+    # Préparation
+    # ------------------------------------------------------------------
+    def _parents(self, groupe: str) -> Set[str]:
+        parents = set()
+        while groupe in self.hierarchie:
+            groupe = self.hierarchie[groupe]
+            parents.add(groupe)
+        return parents
+
+    def _groupes_bloquants(self, cours: Dict[str, Any]) -> List[int]:
+        """Indices des groupes du cours, de leurs ancêtres et de leurs descendants."""
+        propres = set(cours['groups'])
+        lies = set(propres)
+        for g in propres:
+            lies |= self._parents(g)
+        lies |= {g for g in self._indice_groupe if self._parents(g) & propres}
+        return sorted(self._indice_groupe[g] for g in lies)
+
+    def _profs_autorises(self, cours: Dict[str, Any]) -> List[int]:
+        return cours.get('allowed_prof_indices', list(range(len(self.data['profs']))))
+
+    def _precedences(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """(prédécesseurs, successeurs) de chaque cours pour l'ordre CM → TD → TP par matière et promotion."""
+        chaines: Dict[Tuple, Dict[str, List[str]]] = {}
+        for c in self.data['cours']:
+            typ, matiere = recup_cours(c['id'])
+            if typ in RANG_TYPE:
+                chaines.setdefault((matiere, c.get('promotion')), {t: [] for t in RANG_TYPE})[typ].append(c['id'])
+        avant: Dict[str, List[str]] = {}
+        apres: Dict[str, List[str]] = {}
+        for chaine in chaines.values():
+            for typ_avant, typ_apres in (("CM", "TD"), ("CM", "TP"), ("TD", "TP")):
+                for a in chaine[typ_avant]:
+                    for b in chaine[typ_apres]:
+                        avant.setdefault(b, []).append(a)
+                        apres.setdefault(a, []).append(b)
+        return avant, apres
+
+    def _priorite(self, cours: Dict[str, Any]) -> Tuple:
+        """Les cours les plus contraints d'abord."""
+        typ, _ = recup_cours(cours['id'])
+        return (RANG_TYPE.get(typ, 1),
+                len(self._profs_autorises(cours)),
+                int(self.domaines.masque_departs(cours).sum()),
+                -self.data['duree_cours'][cours['id']])
+
+    # ------------------------------------------------------------------
+    # Placement
+    # ------------------------------------------------------------------
+    def planifier(self) -> ResultatGlouton:
+        """Place tous les cours possibles et retourne le résultat."""
+        debut = time.perf_counter()
+        avant, apres = self._precedences()
+        for cours in sorted(self.data['cours'], key=self._priorite):
+            cid = cours['id']
+            duree = self.data['duree_cours'][cid]
+            masque = self.domaines.masque_departs(cours).copy()
+            masque &= departs_libres(self.occ_groupes[self._groupes_bloquants(cours)].any(axis=0), duree)
+            # Ordre CM → TD → TP avec les cours déjà placés
+            creneaux = np.arange(self.data['nb_slots'])
+            for autre in avant.get(cid, []):
+                if autre in self.resultat.affectations:
+                    masque &= creneaux > self.resultat.affectations[autre][0]
+            for autre in apres.get(cid, []):
+                if autre in self.resultat.affectations:
+                    masque &= creneaux < self.resultat.affectations[autre][0]
+
+            profs = self._profs_autorises(cours)
+            salles = self.salles_candidates[cid][0]
+            departs = np.empty(0, dtype=int)
+            if profs and salles:
+                libres_profs = departs_libres(self.occ_profs[profs], duree) & np.array(
+                    [self.domaines.masque_prof(p, duree) for p in profs])
+                libres_salles = departs_libres(self.occ_salles[salles], duree) & np.array(
+                    [self.domaines.masque_salle(r, duree) for r in salles])
+                departs = np.flatnonzero(masque & libres_profs.any(axis=0) & libres_salles.any(axis=0))
+            if departs.size == 0:
+                self.resultat.non_places.append(cid)
+                continue
+            s = int(departs[0])
+            # Professeur le moins chargé ; plus petite salle suffisante (la plus grande en débordement)
+            sens = -1 if self.salles_candidates[cid][1] else 1
+            p = min((p for k, p in enumerate(profs) if libres_profs[k, s]), key=lambda p: self.occ_profs[p].sum())
+            r = min((r for k, r in enumerate(salles) if libres_salles[k, s]), key=lambda r: sens * self.capacites[r])
+            self.occ_groupes[[self._indice_groupe[g] for g in cours['groups']], s:s + duree] = True
+            self.occ_profs[p, s:s + duree] = True
+            self.occ_salles[r, s:s + duree] = True
+            self.resultat.affectations[cid] = (s, r, p)
+
+        self.resultat.duree = time.perf_counter() - debut
+        logger.info(f"   -> Glouton : {len(self.resultat.affectations)}/{len(self.data['cours'])} cours placés "
+                    f"en {self.resultat.duree * 1000:.0f} ms.")
+        for cid in self.resultat.non_places:
+            logger.warning(f"      Non placé : {cid}")
+        return self.resultat
+
+    def parse_assignments(self) -> List[CourseAssignment]:
+        """Affectations au format CourseAssignment (compatible ISolutionParser)."""
+        salle_ids = list(self.data['salles'].keys())
+        return [CourseAssignment(course_id=cid, start_slot=s, room_id=r, teacher_id=p,
+                                 room_name=salle_ids[r], teacher_name=self.data['profs'][p],
+                                 duration=self.data['duree_cours'][cid])
+                for cid, (s, r, p) in self.resultat.affectations.items()]
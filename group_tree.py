@@ -0,0 +1,102 @@
+"""
+Arbre des publics étudiants : promotion → groupe → sous-groupe.
+Respecte le principe Single Responsibility (SOLID).
+
+L'arbre est construit une seule fois à partir des tables promotions, groups
+et subgroups (relation enfant → parent). Un public feuille suit ses propres
+cours et ceux de tous ses ancêtres : une seule contrainte « au plus un cours
+à la fois » par feuille et par créneau couvre alors à la fois les conflits
+d'un même groupe et ceux de la hiérarchie, sans contrainte redondante pour
+les groupes intermédiaires.
+"""
+from typing import Any, Dict, Iterable, List, Mapping
+
+# Relation sous-groupe → groupe parent utilisée lorsque les données ne fournissent pas l'arbre
+HIERARCHIE_GROUPES = {
+    "G1A": "G1",
+    "G1B": "G1",
+    "G2A": "G2",
+    "G2B": "G2",
+    "G3A": "G3",
+    "G3B": "G3",
+    "G4A": "G4",
+    "G4B": "G4",
+    "G5A": "G5",
+    "G5B": "G5",
+    "G7A": "G7",
+    "G7B": "G7",
+    "G8A": "G8",
+}
+
+
+class ArbreGroupes:
+    """Relation enfant → parent des publics et fermeture par ancêtres."""
+
+    def __init__(self, parents: Mapping[str, str]):
+        self.parents: Dict[str, str] = dict(parents)
+
+    @classmethod
+    def depuis_lignes(cls, lignes: Iterable[Mapping[str, Any]]) -> 'ArbreGroupes':
+        """
+        Construit l'arbre depuis des lignes (promotion_name, group_name, subgroup_name).
+        Un sous-groupe est nommé comme dans les cours : nom du groupe + nom du sous-groupe (G1 + A → G1A).
+        """
+        parents = {}
+        for ligne in lignes:
+            promotion, groupe, sous_groupe = (ligne.get('promotion_name'), ligne.get('group_name'),
+                                              ligne.get('subgroup_name'))
+            if not groupe or groupe != groupe:  # None ou NaN
+                continue
+            if promotion and promotion == promotion:
+                parents[groupe] = promotion
+            if sous_groupe and sous_groupe == sous_groupe:
+                parents[f"{groupe}{sous_groupe}"] = groupe
+        return cls(parents)
+
+    @classmethod
+    def depuis_donnees(cls, data: Mapping[str, Any]) -> 'ArbreGroupes':
+        """Arbre fourni par le chargement (clé hierarchie_groupes), sinon HIERARCHIE_GROUPES."""
+        return cls(data.get('hierarchie_groupes') or HIERARCHIE_GROUPES)
+
+    def ancetres(self, groupe: str) -> List[str]:
+        """Ancêtres du plus proche au plus lointain."""
+        resultat = []
+        while groupe in self.parents and self.parents[groupe] not in resultat:
+            groupe = self.parents[groupe]
+            resultat.append(groupe)
+        return resultat
+
+    def cours_par_feuille(self, map_groupe_cours: Mapping[str, List[str]],
+                          fermeture: bool = True) -> Dict[str, List[str]]:
+        """
+        Cours suivis par chaque public feuille (groupe sans sous-groupe planifié) : les siens
+        et ceux de ses ancêtres. Les feuilles dont les cours sont tous inclus dans ceux d'une
+        autre (ex. une promotion qui n'a que des CM) sont ignorées, ainsi que les doublons.
+        Avec fermeture=False, chaque groupe est pris seul, sans ses ancêtres.
+        """
+        if fermeture:
+            parents_planifies = {self.parents[g] for g in map_groupe_cours if g in self.parents}
+            cours = {}
+            for g in map_groupe_cours:
+                if g in parents_planifies:
+                    continue
+                suivis = list(map_groupe_cours[g])
+                for ancetre in self.ancetres(g):
+                    suivis += map_groupe_cours.get(ancetre, [])
+                cours[g] = list(dict.fromkeys(suivis))
+        else:
+            cours = {g: list(dict.fromkeys(cids)) for g, cids in map_groupe_cours.items()}
+
+        ensembles = {g: frozenset(cids) for g, cids in cours.items()}
+        retenus: Dict[str, List[str]] = {}
+        vus = set()
+        for g, cids in cours.items():
+            if ensembles[g] in vus or any(ensembles[g] < autre for autre in ensembles.values()):
+                continue
+            vus.add(ensembles[g])
+            retenus[g] = cids
+        return retenus
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.parents)
+
@@ -0,0 +1,142 @@
+"""
+Extraction d'un noyau d'infaisabilité par hypothèses (assumptions CP-SAT).
+Respecte le principe Single Responsibility (SOLID).
+
+Le modèle est construit avec gardes=True : chaque bloc de contraintes
+(professeurs, salles, publics feuilles avec leurs ancêtres, ordre
+CM → TD → TP, disponibilités) est posé entité par entité sous un littéral d'activation.
+Une seule résolution, tous les littéraux en hypothèses (AddAssumptions),
+renvoie via SufficientAssumptionsForInfeasibility un sous-ensemble de gardes
+incompatibles entre elles. Une passe de suppression le réduit ensuite à un
+noyau minimal : chaque garde dont le retrait laisse le problème infaisable
+est écartée. Le rapport indique les blocs et les entités (professeur, salle,
+groupe, paire de cours) en conflit, sans les 63 résolutions de la recherche
+combinatoire de app.diagnostic_automatique.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from ortools.sat.python import cp_model
+
+from logger_config import get_logger
+from time_table_model import TimetableModel
+
+logger = get_logger(__name__)
+
+# (bloc, entité)
+Garde = Tuple[str, str]
+
+
+@dataclass
+class NoyauInfaisabilite:
+    """Résultat du diagnostic : statut de la résolution gardée et gardes du noyau."""
+    statut: str
+    gardes: List[Garde] = field(default_factory=list)
+    duree: float = 0.0
+    minimal: bool = False
+
+    @property
+    def infaisable(self) -> bool:
+        return self.statut == "INFEASIBLE"
+
+    def blocs(self) -> List[str]:
+        """Blocs impliqués, dans l'ordre d'apparition."""
+        return list(dict.fromkeys(bloc for bloc, _ in self.gardes))
+
+    def par_bloc(self) -> Dict[str, List[str]]:
+        """{bloc: [entités en conflit]}."""
+        resultat: Dict[str, List[str]] = {}
+        for bloc, entite in self.gardes:
+            resultat.setdefault(bloc, []).append(entite)
+        return resultat
+
+
+class InfeasibilityCoreExtractor:
+    """Construit le modèle gardé, extrait puis minimise un noyau d'infaisabilité."""
+
+    def __init__(self, data: Dict[str, Any], model_class=TimetableModel, timeout: float = 60.0,
+                 minimiser: bool = True, timeout_minimisation: float = 10.0):
+        self.data = data
+        self.model_class = model_class
+        self.timeout = timeout
+        self.minimiser = minimiser
+        self.timeout_minimisation = timeout_minimisation
+
+    def _resoudre(self, model: cp_model.CpModel, hypotheses: Sequence[Any],
+                  timeout: float) -> Tuple[int, cp_model.CpSolver]:
+        model.ClearAssumptions()
+        model.AddAssumptions(list(hypotheses))
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = timeout
+        # Les hypothèses insatisfaites ne sont exploitables qu'avec un seul worker
+        solver.parameters.num_workers = 1
+        return solver.Solve(model), solver
+
+    def extraire(self) -> NoyauInfaisabilite:
+        """Une résolution avec toutes les gardes en hypothèses, puis minimisation éventuelle."""
+        debut = time.perf_counter()
+        scheduler = self.model_class(self.data)
+        scheduler.build_model(gardes=True)
+        model = scheduler.model
+        model.ClearObjective()  # seule la faisabilité compte
+        gardes = scheduler.gardes
+        logger.info(f"   -> Diagnostic par noyau : {len(gardes)} gardes sur "
+                    f"{len({bloc for bloc, _ in gardes})} blocs.")
+
+        statut, solver = self._resoudre(model, gardes.values(), self.timeout)
+        if statut != cp_model.INFEASIBLE:
+            return NoyauInfaisabilite(solver.StatusName(statut), duree=time.perf_counter() - debut)
+
+        indices = set(solver.SufficientAssumptionsForInfeasibility())
+        noyau = [cle for cle, litteral in gardes.items() if litteral.Index() in indices]
+        logger.info(f"   -> Noyau initial : {len(noyau)} gardes.")
+        minimal = False
+        if self.minimiser:
+            noyau, minimal = self._minimiser(model, gardes, noyau)
+        return NoyauInfaisabilite("INFEASIBLE", noyau, time.perf_counter() - debut, minimal)
+
+    def _minimiser(self, model: cp_model.CpModel, gardes: Dict[Garde, Any],
+                   noyau: List[Garde]) -> Tuple[List[Garde], bool]:
+        """
+        Retire une à une les gardes dont l'absence laisse le problème infaisable.
+        Une vérification non conclusive (temps dépassé) conserve la garde : le noyau
+        reste valide mais n'est plus garanti minimal.
+        """
+        minimal = True
+        for cle in list(noyau):
+            if cle not in noyau:
+                continue  # déjà écartée par un noyau plus petit
+            essai = [c for c in noyau if c != cle]
+            statut, solver = self._resoudre(model, [gardes[c] for c in essai], self.timeout_minimisation)
+            if statut == cp_model.INFEASIBLE:
+                indices = set(solver.SufficientAssumptionsForInfeasibility())
+                noyau = [c for c in essai if gardes[c].Index() in indices]
+            elif statut not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                minimal = False
+        return noyau, minimal
+
+
+def journaliser_noyau(noyau: NoyauInfaisabilite) -> None:
+    """Journalise les blocs et entités en conflit."""
+    if not noyau.infaisable:
+        logger.info(f"Diagnostic par noyau : aucun conflit prouvé ({noyau.statut}, {noyau.duree:.1f}s).")
+        return
+    if not noyau.gardes:
+        logger.warning("Diagnostic par noyau : infaisable sans aucun bloc gardé "
+                       "(domaines vides, liaisons ou disponibilités des groupes en cause).")
+        return
+    qualificatif = "minimal" if noyau.minimal else "non garanti minimal"
+    logger.warning(f"Diagnostic par noyau ({qualificatif}, {noyau.duree:.1f}s) : "
+                   f"blocs en conflit {', '.join(noyau.blocs())}")
+    for bloc, entites in noyau.par_bloc().items():
+        logger.warning(f" - {bloc} : {', '.join(entites)}")
+
+
+def diagnostic_par_noyau(data: Dict[str, Any], model_class=TimetableModel, timeout: float = 60.0,
+                         minimiser: bool = True) -> NoyauInfaisabilite:
+    """Extrait et journalise le noyau d'infaisabilité des données."""
+    logger.info("🔍 DIAGNOSTIC D'INFAISABILITÉ PAR NOYAU (hypothèses)")
+    noyau = InfeasibilityCoreExtractor(data, model_class, timeout, minimiser).extraire()
+    journaliser_noyau(noyau)
+    return noyau
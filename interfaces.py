@@ -107,3 +107,20 @@ class IYearConfigBuilder(Protocol):
     ) -> List[Any]:
         """Construit les configurations pour chaque année."""
         ...
+
+
+# ==============================================================================
+# INTERFACES POUR LA DIFFUSION DES SOLUTIONS INTERMÉDIAIRES
+# ==============================================================================
+
+class ISolutionSink(Protocol):
+    """Interface pour un destinataire des solutions améliorantes du solveur."""
+
+    def publier(self, numero: int, objectif: float, temps: float,
+                assignments: List[CourseAssignment]) -> None:
+        """Reçoit la n-ième solution trouvée (objectif et temps écoulé en secondes)."""
+        ...
+
+    def fermer(self) -> None:
+        """Libère les ressources une fois la résolution terminée."""
+        ...
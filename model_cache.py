@@ -0,0 +1,123 @@
+"""
+Cache des modèles CP-SAT construits, adressé par le contenu des données.
+Respecte le principe Single Responsibility (SOLID).
+
+La clé est l'empreinte SHA-256 des données préparées (sortie de
+`load_and_prepare_data`), des options de construction et du code source des
+modules qui construisent le modèle. L'entrée contient le CpModelProto au format
+texte et les indices proto des variables du registre. Sur un succès, le modèle
+est rechargé au lieu d'être reconstruit.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from disk_cache import DiskLRUCache
+from logger_config import get_logger
+from objectives import ObjectiveSet
+from start_domains import StartDomainEngine
+from variable_registry import VariableRegistry, FAMILLES_INDEXEES
+
+logger = get_logger(__name__)
+
+CACHE_DIR = Path(__file__).parent / "cache" / "modeles"
+VERSION_FORMAT = 2
+# Modules dont une modification invalide les modèles en cache
+MODULES_CONSTRUCTION = ("time_table_model.py", "variable_registry.py", "start_domains.py",
+                        "room_candidates.py", "symmetry_breaking.py", "objectives.py", "group_tree.py")
+
+
+def _canonique(objet: Any) -> Any:
+    """Forme canonique JSON-sérialisable (clés de dictionnaire triées, tuples/sets normalisés)."""
+    if isinstance(objet, dict):
+        paires = [(json.dumps(_canonique(k), sort_keys=True, default=str), _canonique(v)) for k, v in objet.items()]
+        return sorted(paires, key=lambda p: p[0])
+    if isinstance(objet, (list, tuple)):
+        return [_canonique(v) for v in objet]
+    if isinstance(objet, (set, frozenset)):
+        return sorted((_canonique(v) for v in objet), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if hasattr(objet, 'item'):  # scalaires NumPy
+        return objet.item()
+    return objet
+
+
+def empreinte_donnees(data: Dict[str, Any], options: Dict[str, Any]) -> str:
+    """Empreinte SHA-256 des données, des options et du code de construction."""
+    h = hashlib.sha256()
+    h.update(str(VERSION_FORMAT).encode())
+    for module in MODULES_CONSTRUCTION:
+        chemin = Path(__file__).parent / module
+        if chemin.exists():
+            h.update(chemin.read_bytes())
+    h.update(json.dumps(_canonique(options), sort_keys=True, default=str).encode())
+    h.update(json.dumps(_canonique(data), sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class ModelCache:
+    """Sauvegarde et recharge les modèles construits de TimetableModel."""
+
+    def __init__(self, dossier: Path = CACHE_DIR, max_entrees: int = 5, max_octets: Optional[int] = 2 * 1024 ** 3):
+        self.stockage = DiskLRUCache(dossier, max_entrees=max_entrees, max_octets=max_octets)
+
+    def sauvegarder(self, cle: str, timetable_model) -> None:
+        """Enregistre le proto et les indices des variables d'un modèle construit."""
+        entree = {
+            "version": VERSION_FORMAT,
+            "proto": str(timetable_model.model.Proto()),
+            "registre": timetable_model.registry.exporter_indices(),
+            "penalites_capacite": [v.Index() for v in timetable_model._vars.get('penalites_capacite', [])],
+            "objectifs": timetable_model.objectifs.exporter_indices(),
+            "salles_candidates": getattr(timetable_model, 'salles_candidates', None),
+            "rapport_symetries": getattr(timetable_model, 'rapport_symetries', None),
+        }
+        chemin = self.stockage.ecrire(cle, entree)
+        logger.info(f"   -> Modèle mis en cache ({chemin.name})")
+
+    def charger(self, cle: str, timetable_model) -> bool:
+        """
+        Recharge le modèle en cache dans `timetable_model` (proto, registre, vue _vars).
+
+        Returns:
+            True en cas de succès, False si la clé est absente ou l'entrée invalide.
+        """
+        entree = self.stockage.lire(cle)
+        if entree is None or entree.get("version") != VERSION_FORMAT:
+            return False
+        if not timetable_model.model.Proto().parse_text_format(entree["proto"]):
+            logger.warning("   -> Entrée de cache invalide, reconstruction du modèle.")
+            self.stockage.supprimer(cle)
+            return False
+        model = timetable_model.model
+        registre = VariableRegistry.depuis_indices(model, entree["registre"])
+        timetable_model.registry = registre
+        timetable_model._vars = self._vue_variables(registre)
+        timetable_model._vars['penalites_capacite'] = [model.GetBoolVarFromProtoIndex(i)
+                                                       for i in entree["penalites_capacite"]]
+        timetable_model.objectifs = ObjectiveSet.depuis_indices(model, entree["objectifs"])
+        # Domaines de départ : les modèles en cache n'ont aucune famille relâchée (diagnostic exclu)
+        timetable_model.domaines = StartDomainEngine(timetable_model.data)
+        timetable_model.temps_utiles = timetable_model.domaines.temps_utiles()
+        if entree["salles_candidates"] is not None:
+            timetable_model.salles_candidates = entree["salles_candidates"]
+        if entree["rapport_symetries"] is not None:
+            timetable_model.rapport_symetries = entree["rapport_symetries"]
+        logger.info(f"   -> Modèle chargé depuis le cache ({cle[:12]}…)")
+        return True
+
+    @staticmethod
+    def _vue_variables(registre: VariableRegistry) -> Dict[str, Dict]:
+        """Reconstruit la vue _vars {famille: {(cid, clé): var}} à partir du registre."""
+        vue: Dict[str, Dict] = {}
+        for i, cid in enumerate(registre.course_ids()):
+            for famille in FAMILLES_INDEXEES:
+                for cle, var in registre.variables(famille, i).items():
+                    vue.setdefault(famille, {})[cid, cle] = var
+            for famille in ('debut', 'intervalle'):
+                var = registre.scalaire(famille, i)
+                if var is not None:
+                    vue.setdefault(famille, {})[cid] = var
+        for famille in ('start', 'occupe', 'y_salle', 'z_prof'):
+            vue.setdefault(famille, {})
+        return vue
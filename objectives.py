@@ -0,0 +1,160 @@
+"""
+Termes d'objectif nommés et résolution lexicographique.
+Respecte le principe Single Responsibility (SOLID).
+
+Chaque critère (capacité, fin tardive, séances déplacées...) est un terme
+nommé, somme pondérée de variables du modèle. Deux façons de les combiner :
+
+- somme pondérée (un seul Minimize, poids de priorité) : comportement historique ;
+- résolution lexicographique : on minimise le premier terme, on borne sa valeur
+  (terme <= meilleure valeur trouvée), on indique la solution courante (AddHint)
+  puis on minimise le terme suivant. Les grands coefficients disparaissent et
+  chaque étape rapporte son temps et sa valeur.
+"""
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ortools.sat.python import cp_model
+
+from logger_config import get_logger
+from solver_profiles import SolverProfile
+
+logger = get_logger(__name__)
+
+# Ordre de priorité par défaut (du plus important au moins important)
+ORDRE_PAR_DEFAUT = ("deplacements", "capacite", "fin_tardive", "trous_groupes", "trous_profs")
+
+# (variable, coefficient)
+Terme = Tuple[Any, int]
+
+
+class ObjectiveSet:
+    """Termes d'objectif nommés, chacun étant une somme pondérée de variables."""
+
+    def __init__(self):
+        self._termes: Dict[str, List[Terme]] = {}
+
+    def ajouter(self, nom: str, var, coef: int = 1) -> None:
+        self._termes.setdefault(nom, []).append((var, coef))
+
+    def definir(self, nom: str, termes: Iterable[Terme]) -> None:
+        self._termes[nom] = list(termes)
+
+    def noms(self) -> List[str]:
+        return list(self._termes)
+
+    def termes(self, nom: str) -> List[Terme]:
+        return self._termes.get(nom, [])
+
+    def expression(self, nom: str):
+        termes = self.termes(nom)
+        return cp_model.LinearExpr.WeightedSum([v for v, _ in termes], [c for _, c in termes])
+
+    def somme_ponderee(self, poids: Dict[str, int]):
+        """Somme des termes multipliés par leur poids (un terme sans poids compte 1)."""
+        return sum(self.expression(nom) * poids.get(nom, 1) for nom in self._termes)
+
+    def ordonner(self, ordre: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Noms des termes non vides dans l'ordre de priorité demandé ;
+        les termes absents de l'ordre sont placés à la fin.
+        """
+        ordre = list(ordre or ORDRE_PAR_DEFAUT)
+        inconnus = [nom for nom in ordre if nom not in self._termes]
+        if inconnus:
+            logger.debug(f"Termes d'objectif absents du modèle : {inconnus}")
+        noms = [nom for nom in ordre if nom in self._termes] + [nom for nom in self._termes if nom not in ordre]
+        return [nom for nom in noms if self._termes[nom]]
+
+    def valeur(self, nom: str, solver) -> int:
+        return sum(solver.Value(v) * c for v, c in self.termes(nom))
+
+    def exporter_indices(self) -> Dict[str, List[Tuple[int, int]]]:
+        """{nom: [(indice proto, coefficient)]} pour la mise en cache."""
+        return {nom: [(v.Index(), c) for v, c in termes] for nom, termes in self._termes.items()}
+
+    @classmethod
+    def depuis_indices(cls, model: cp_model.CpModel, indices: Dict[str, List[Tuple[int, int]]]) -> 'ObjectiveSet':
+        objectifs = cls()
+        for nom, termes in indices.items():
+            objectifs.definir(nom, [(model.GetIntVarFromProtoIndex(i), c) for i, c in termes])
+        return objectifs
+
+
+@dataclass
+class StageReport:
+    """Bilan d'une étape de la résolution lexicographique."""
+    nom: str
+    statut: str
+    valeur: Optional[int]
+    borne: Optional[float]
+    duree: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class LexicographicSolver:
+    """
+    Minimise les termes un par un dans l'ordre de priorité.
+    Le modèle est modifié : les bornes des étapes terminées y restent.
+    """
+
+    def __init__(self, model: cp_model.CpModel, objectifs: ObjectiveSet, ordre: Optional[Sequence[str]] = None):
+        self.model = model
+        self.objectifs = objectifs
+        self.ordre = objectifs.ordonner(ordre)
+        self.etapes: List[StageReport] = []
+
+    def resoudre(self, profil: SolverProfile,
+                 callback: Optional[cp_model.CpSolverSolutionCallback] = None) -> Tuple[int, cp_model.CpSolver]:
+        """
+        Le temps du profil est partagé entre les étapes ; le temps non consommé par une
+        étape est reporté sur les suivantes. Le callback éventuel reçoit les solutions
+        de toutes les étapes (objectif = valeur du terme de l'étape en cours).
+
+        Returns:
+            (statut, solveur) de la dernière étape ayant trouvé une solution
+            (ou de la première étape en cas d'échec).
+        """
+        fin = time.perf_counter() + profil.max_time_seconds
+        statut, solver = cp_model.UNKNOWN, None
+        etapes = self.ordre or [None]
+        for k, nom in enumerate(etapes):
+            restant = max(0.0, fin - time.perf_counter())
+            budget = restant / (len(etapes) - k)
+            if nom is None:
+                self.model.ClearObjective()
+            else:
+                self.model.Minimize(self.objectifs.expression(nom))
+            candidat = cp_model.CpSolver()
+            profil.avec(max_time_seconds=budget).appliquer(candidat)
+            debut = time.perf_counter()
+            statut_etape = candidat.Solve(self.model, callback)
+            trouve = statut_etape in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            valeur = int(candidat.ObjectiveValue()) if trouve and nom is not None else None
+            self.etapes.append(StageReport(nom or "faisabilite", candidat.StatusName(statut_etape), valeur,
+                                           candidat.BestObjectiveBound() if trouve and nom is not None else None,
+                                           time.perf_counter() - debut))
+            logger.info(f"   -> Étape {k + 1}/{len(etapes)} [{nom or 'faisabilite'}] : "
+                        f"{candidat.StatusName(statut_etape)}, valeur {valeur}, "
+                        f"{self.etapes[-1].duree:.1f}s")
+            if not trouve:
+                if solver is None:
+                    statut, solver = statut_etape, candidat
+                break
+            # Une étape précédente non prouvée optimale rend la solution globale seulement faisable
+            statut = statut_etape if statut in (cp_model.UNKNOWN, cp_model.OPTIMAL) else cp_model.FEASIBLE
+            solver = candidat
+            if nom is not None:
+                self.model.Add(self.objectifs.expression(nom) <= valeur)
+            self._indiquer_solution(candidat)
+        return statut, solver
+
+    def _indiquer_solution(self, solver: cp_model.CpSolver) -> None:
+        """Remplace les indications par la solution courante (toutes les variables)."""
+        self.model.ClearHints()
+        for i in range(len(self.model.Proto().variables)):
+            var = self.model.GetIntVarFromProtoIndex(i)
+            self.model.AddHint(var, solver.Value(var))
@@ -0,0 +1,98 @@
+"""
+Planification d'une réparation à changement minimal d'un emploi du temps existant.
+Respecte le principe Single Responsibility (SOLID).
+
+Après un changement de données (professeur indisponible, salle fermée...),
+on détecte les cours dont l'affectation actuelle n'est plus valide, puis on
+rouvre ces cours et leur voisinage : les cours du même jour qui partagent un
+groupe (ou un groupe parent/enfant), un professeur autorisé ou la même salle.
+Tous les autres cours restent figés sur leur affectation actuelle.
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from logger_config import get_logger
+from room_candidates import RoomCandidateSelector
+from start_domains import StartDomainEngine
+from warm_start import Indication
+
+logger = get_logger(__name__)
+
+
+class RepairPlanner:
+    """Détermine les cours à rouvrir et ceux à figer pour une réparation."""
+
+    def __init__(self, data: Dict[str, Any], affectations: Dict[str, Indication],
+                 hierarchie: Optional[Dict[str, str]] = None):
+        self.data = data
+        self.affectations = affectations
+        self.hierarchie = hierarchie or {}
+        self.domaines = StartDomainEngine(data)
+        self.salles_candidates = RoomCandidateSelector(data, self.domaines).calculer()
+        self._cours = {c['id']: c for c in data['cours']}
+
+    def _jour(self, cid: str) -> Optional[int]:
+        creneau = self.affectations.get(cid, (None, None, None))[0]
+        return None if creneau is None else creneau // self.data['creneaux_par_jour']
+
+    def _groupes_etendus(self, cours: Dict[str, Any]) -> Set[str]:
+        groupes = set(cours['groups'])
+        return groupes | {self.hierarchie[g] for g in groupes if g in self.hierarchie}
+
+    def affectation_valide(self, cours: Dict[str, Any]) -> bool:
+        """L'affectation actuelle du cours respecte-t-elle encore les données ?"""
+        cid = cours['id']
+        creneau, salle, prof = self.affectations.get(cid, (None, None, None))
+        if creneau is None or salle is None:
+            return False
+        duree = self.data['duree_cours'][cid]
+        if creneau >= self.data['nb_slots'] or not self.domaines.masque_departs(cours)[creneau]:
+            return False
+        if salle not in self.salles_candidates[cid][0] or not self.domaines.masque_salle(salle, duree)[creneau]:
+            return False
+        if prof is not None:
+            if prof not in cours.get('allowed_prof_indices', [prof]):
+                return False
+            if not self.domaines.masque_prof(prof, duree)[creneau]:
+                return False
+        return True
+
+    def cours_affectes(self) -> List[str]:
+        """Cours sans affectation actuelle ou dont l'affectation n'est plus valide."""
+        return [c['id'] for c in self.data['cours'] if not self.affectation_valide(c)]
+
+    def _voisins(self, a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        jour_a = self._jour(a['id'])
+        if jour_a is not None and self._jour(b['id']) != jour_a:
+            return False
+        if self._groupes_etendus(a) & self._groupes_etendus(b):
+            return True
+        if set(a.get('allowed_prof_indices', [])) & set(b.get('allowed_prof_indices', [])):
+            return True
+        salle_a = self.affectations.get(a['id'], (None, None, None))[1]
+        return salle_a is not None and salle_a == self.affectations.get(b['id'], (None, None, None))[1]
+
+    def planifier(self) -> Tuple[Set[str], Dict[str, Indication]]:
+        """
+        Returns:
+            (cours rouverts, affectations figées {cid: (créneau, salle, professeur)})
+        """
+        affectes = self.cours_affectes()
+        rouverts = set(affectes)
+        for cid in affectes:
+            a = self._cours[cid]
+            rouverts.update(b['id'] for b in self.data['cours']
+                            if b['id'] not in rouverts and self._voisins(a, b))
+        figes = {cid: self.affectations[cid] for cid in self._cours if cid not in rouverts}
+        logger.info(f"   -> Réparation : {len(affectes)} cours affectés, {len(rouverts)} rouverts, "
+                    f"{len(figes)} figés.")
+        return rouverts, figes
+
+    def differences(self, assignments) -> List[Tuple[str, Indication, Indication]]:
+        """Séances déplacées (créneau ou salle) : [(cid, ancienne, nouvelle affectation)]."""
+        diff = []
+        for a in assignments:
+            ancienne = self.affectations.get(a.course_id, (None, None, None))
+            nouvelle = (a.start_slot, a.room_id, a.teacher_id)
+            if ancienne[:2] != nouvelle[:2]:
+                diff.append((a.course_id, ancienne, nouvelle))
+        return diff
@@ -0,0 +1,67 @@
+"""
+Sélection des salles candidates de chaque cours.
+Respecte le principe Single Responsibility (SOLID).
+
+Une salle est candidate pour un cours si elle est compatible avec
+l'enseignement (table teachings_rooms), si sa capacité suffit pour le groupe
+et si elle est disponible à au moins un des départs autorisés du cours.
+Le modèle ne crée des variables y_salle que pour ces candidates.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from start_domains import StartDomainEngine
+
+
+class RoomCandidateSelector:
+    """Calcule la liste des salles candidates (indices physiques) par cours."""
+
+    def __init__(self, data: Dict[str, Any], domaines: Optional[StartDomainEngine] = None):
+        self.data = data
+        self.domaines = domaines or StartDomainEngine(data)
+        self._salle_ids = list(data.get('salles', {}).keys())
+        self._capacites = list(data.get('capacites', list(data.get('salles', {}).values())))
+        self._indice_salle = {salle_id: r for r, salle_id in enumerate(self._salle_ids)}
+
+    def taille_cours(self, cours: Dict[str, Any]) -> int:
+        """Effectif du cours (taille de son groupe principal)."""
+        return self.data.get('taille_groupes', {}).get(cours['groups'][0], 0)
+
+    def salles_compatibles(self, cours: Dict[str, Any]) -> List[int]:
+        """
+        Salles autorisées par teachings_rooms pour (enseignement, type).
+        Sans entrée pour le cours, toutes les salles sont compatibles.
+        """
+        compatibilites = self.data.get('salles_compatibles', {})
+        salle_ids = compatibilites.get((cours.get('teaching_id'), cours.get('type_id')))
+        if not salle_ids:
+            return list(range(len(self._salle_ids)))
+        indices = [self._indice_salle[s] for s in salle_ids if s in self._indice_salle]
+        return sorted(indices) or list(range(len(self._salle_ids)))
+
+    def _disponible(self, cours: Dict[str, Any], r_idx: int) -> bool:
+        """La salle est libre pendant toute la durée d'au moins un départ autorisé du cours."""
+        if 'salle' in self.domaines.relachees:
+            return True
+        duree = self.data['duree_cours'][cours['id']]
+        return bool(np.any(self.domaines.masque_departs(cours) & self.domaines.masque_salle(r_idx, duree)))
+
+    def selectionner(self, cours: Dict[str, Any]) -> Tuple[List[int], bool]:
+        """
+        Retourne (salles candidates, débordement).
+
+        Le débordement vaut True lorsqu'aucune salle compatible n'a une capacité
+        suffisante : les salles compatibles disponibles sont alors proposées et
+        leur usage est pénalisé dans l'objectif.
+        """
+        taille = self.taille_cours(cours)
+        compatibles = [r for r in self.salles_compatibles(cours) if self._disponible(cours, r)]
+        candidates = [r for r in compatibles if self._capacites[r] >= taille]
+        if candidates:
+            return candidates, False
+        return compatibles or self.salles_compatibles(cours), True
+
+    def calculer(self) -> Dict[str, Tuple[List[int], bool]]:
+        """Salles candidates de tous les cours : {cid: (indices, débordement)}."""
+        return {c['id']: self.selectionner(c) for c in self.data['cours']}
@@ -0,0 +1,99 @@
+"""
+Instantanés locaux des données préparées d'une semaine.
+Respecte le principe Single Responsibility (SOLID).
+
+La sortie de `load_and_prepare_data` est enregistrée sur disque (pickle binaire
+via DiskLRUCache, borné en nombre d'entrées et en taille) sous une clé formée de
+l'identifiant de semaine et du jeton de changement de la base
+(DataProviderID.jeton_modifications). Tant que le jeton ne change pas, les
+lancements suivants relisent l'instantané au lieu de réinterroger la base.
+
+Hors ligne, le dernier instantané de la semaine est utilisé sans aucune
+connexion : une exécution de production peut ainsi être rejouée sur un poste
+local.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from data_provider_id import DataProviderID
+from disk_cache import DiskLRUCache
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_DIR = Path(__file__).parent / "cache" / "semaines"
+VERSION_FORMAT = 1
+
+
+class SnapshotCache:
+    """Lit et enregistre les données préparées par (semaine, jeton de changement)."""
+
+    def __init__(self, dossier: Path = CACHE_DIR, max_entrees: int = 20,
+                 max_octets: Optional[int] = 512 * 1024 ** 2):
+        self.stockage = DiskLRUCache(dossier, max_entrees=max_entrees, max_octets=max_octets)
+
+    @staticmethod
+    def _prefixe(week_id: int) -> str:
+        return f"semaine_{week_id}_"
+
+    def cle(self, week_id: int, jeton: str) -> str:
+        return f"{self._prefixe(week_id)}{jeton[:16]}"
+
+    def _entrees_semaine(self, week_id: int) -> List[Path]:
+        """Fichiers des instantanés de la semaine, du moins récent au plus récent."""
+        return [p for p in self.stockage.entrees() if p.stem.startswith(self._prefixe(week_id))]
+
+    def charger(self, data_provider, week_id: int) -> Dict[str, Any]:
+        """
+        Données préparées de la semaine : l'instantané si le jeton de la base n'a pas
+        changé, sinon un chargement complet qui remplace l'instantané.
+        """
+        try:
+            jeton = data_provider.jeton_modifications()
+        except Exception as e:
+            logger.warning(f"   -> Jeton de changement indisponible ({e}) : chargement sans instantané.")
+            return data_provider.load_and_prepare_data(week_id)
+        entree = self.stockage.lire(self.cle(week_id, jeton))
+        if entree is not None and entree.get("version") == VERSION_FORMAT:
+            logger.info(f"   -> Données de la semaine {week_id} lues depuis l'instantané ({jeton[:12]}…)")
+            return entree["donnees"]
+        donnees = data_provider.load_and_prepare_data(week_id)
+        self.enregistrer(week_id, jeton, donnees, data_provider.get_list_room())
+        return donnees
+
+    def enregistrer(self, week_id: int, jeton: str, donnees: Dict[str, Any], liste_salles: List[str]) -> None:
+        """Enregistre l'instantané et supprime ceux de la même semaine devenus obsolètes."""
+        cle = self.cle(week_id, jeton)
+        for chemin in self._entrees_semaine(week_id):
+            if chemin.stem != cle:
+                self.stockage.supprimer(chemin.stem)
+        entree = {"version": VERSION_FORMAT, "week_id": week_id, "jeton": jeton,
+                  "donnees": donnees, "liste_salles": list(liste_salles)}
+        chemin = self.stockage.ecrire(cle, entree)
+        logger.info(f"   -> Instantané de la semaine {week_id} enregistré ({chemin.name})")
+
+    def hors_ligne(self, week_id: int) -> Optional[Dict[str, Any]]:
+        """Dernier instantané valide de la semaine (None si aucun), sans accès à la base."""
+        for chemin in reversed(self._entrees_semaine(week_id)):
+            entree = self.stockage.lire(chemin.stem)
+            if entree is not None and entree.get("version") == VERSION_FORMAT:
+                logger.info(f"   -> Hors ligne : instantané {chemin.name} de la semaine {week_id}")
+                return entree
+        return None
+
+
+class SnapshotDataProvider:
+    """
+    Remplace DataProviderID hors ligne pour l'affichage de la solution :
+    liste des salles tirée de l'instantané, aucune écriture en base.
+    """
+
+    def __init__(self, liste_salles: List[str]):
+        self.liste_salles = list(liste_salles)
+
+    def get_list_room(self) -> List[str]:
+        return list(self.liste_salles)
+
+    def convert_courses_dict_to_list_insert(self, courses_dict_list) -> list:
+        logger.info("   -> Hors ligne : séances non enregistrées dans edt_slot.")
+        return DataProviderID.courses_dict_to_rows(courses_dict_list)
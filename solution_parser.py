@@ -12,6 +12,7 @@ class SolutionParser:
     def __init__(self, solution: Dict[str, Any], data: Dict[str, Any]):
         self.solver = solution['solver']
         self._vars = solution['vars']
+        self._registry = solution.get('registry')
         self.data = data
 
     def parse_assignments(self) -> List[CourseAssignment]:
@@ -36,29 +37,41 @@ class SolutionParser:
 
         return assignments
 
+    def _course_variables(self, course_id: int, famille: str, nb_cles: int) -> Dict[int, Any]:
+        """
+        Retourne {clé: variable} d'un cours pour une famille (start, y_salle, z_prof).
+
+        Utilise le registre indexé du modèle ; à défaut, lit directement les clés
+        (course_id, clé) de la vue `vars`, sans parcourir toutes les variables.
+        """
+        if self._registry is not None and self._registry.contient(course_id):
+            return self._registry.variables(famille, self._registry.index(course_id))
+        variables = self._vars.get(famille, {})
+        return {k: variables[course_id, k] for k in range(nb_cles)
+                if variables.get((course_id, k)) is not None}
+
+    def _find_selected_key(self, course_id: int, famille: str, nb_cles: int) -> Optional[int]:
+        """Trouve la clé dont la variable booléenne vaut 1 dans la solution."""
+        for key, var in self._course_variables(course_id, famille, nb_cles).items():
+            if self.solver.Value(var):
+                return key
+        return None
+
     def _find_start_slot(self, course_id: int) -> Optional[int]:
         """Trouve le créneau de début pour un cours."""
-        for slot_key, var in self._vars['start'].items():
-            if var is not None and var.Name().startswith(f"start_{course_id}"):
-                if self.solver.Value(var):
-                    return slot_key[1] if isinstance(slot_key, tuple) else None
-        return None
+        return self._find_selected_key(course_id, 'start', self.data['nb_slots'])
 
     def _find_room_index(self, course_id: int) -> Optional[int]:
         """Trouve l'index de la salle affectée à un cours."""
-        for room_key, var in self._vars['y_salle'].items():
-            if var.Name().startswith(f"y_salle_{course_id}"):
-                if self.solver.Value(var):
-                    return room_key[1] if isinstance(room_key, tuple) else None
-        return None
+        return self._find_selected_key(course_id, 'y_salle', len(self.data['salles']))
 
     def _find_teacher_index(self, course_id: int) -> Optional[int]:
-        """Trouve l'index du professeur affecté à un cours."""
-        for teacher_key, var in self._vars['z_prof'].items():
-            if var.Name().startswith(f"z_prof_{course_id}"):
-                if self.solver.Value(var):
-                    return teacher_key[1] if isinstance(teacher_key, tuple) else None
-        return None
+        """Trouve l'index du professeur affecté à un cours (constant si imposé)."""
+        if self._registry is not None and self._registry.contient(course_id):
+            prof_fixe = self._registry.prof_fixe(self._registry.index(course_id))
+            if prof_fixe is not None:
+                return prof_fixe
+        return self._find_selected_key(course_id, 'z_prof', len(self.data['profs']))
 
     def _is_valid_assignment(self, start_slot: Optional[int],
                             room_idx: Optional[int],
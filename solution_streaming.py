@@ -0,0 +1,170 @@
+"""
+Diffusion des solutions intermédiaires du solveur CP-SAT.
+Respecte le principe Single Responsibility (SOLID).
+
+Un callback de solution (`CpSolverSolutionCallback`) décode chaque solution
+améliorante en `CourseAssignment` et la transmet à des destinataires
+interchangeables (ISolutionSink) : fichier JSONL, table de staging en base,
+file en mémoire pour l'interface graphique. La meilleure solution connue est
+ainsi disponible immédiatement, et un arrêt brutal ou un dépassement du temps
+ne fait pas perdre tout le travail déjà effectué.
+"""
+import json
+import queue
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+from ortools.sat.python import cp_model
+from sqlalchemy import text
+
+from course_data_models import CourseAssignment
+from interfaces import ISolutionSink
+from logger_config import get_logger
+from solution_parser import SolutionParser
+
+logger = get_logger(__name__)
+
+TABLE_STAGING = "edt_slot_staging"
+
+
+class SolutionStreamingCallback(cp_model.CpSolverSolutionCallback):
+    """Décode chaque solution trouvée et la publie vers les destinataires."""
+
+    def __init__(self, data: Dict[str, Any], variables: Dict[str, Any], registry,
+                 sinks: Sequence[ISolutionSink]):
+        super().__init__()
+        self.data = data
+        self.sinks = list(sinks)
+        # Le callback expose Value() : il remplace le solveur pour le SolutionParser
+        self._parser = SolutionParser({'solver': self, 'vars': variables, 'registry': registry}, data)
+        self.nb_solutions = 0
+        self.meilleur_objectif: Optional[float] = None
+
+    def on_solution_callback(self) -> None:
+        self.nb_solutions += 1
+        self.meilleur_objectif = self.ObjectiveValue()
+        assignments = self._parser.parse_assignments()
+        logger.info(f"   -> Solution n°{self.nb_solutions} : objectif {self.meilleur_objectif:g} "
+                    f"({len(assignments)} cours, {self.WallTime():.1f}s)")
+        for sink in self.sinks:
+            try:
+                sink.publier(self.nb_solutions, self.meilleur_objectif, self.WallTime(), assignments)
+            except Exception as e:
+                # Un destinataire défaillant ne doit jamais interrompre la recherche
+                logger.error(f"Erreur de diffusion vers {type(sink).__name__} : {e}")
+
+    def fermer(self) -> None:
+        """Ferme tous les destinataires (appelé en fin de résolution)."""
+        for sink in self.sinks:
+            try:
+                sink.fermer()
+            except Exception as e:
+                logger.error(f"Erreur à la fermeture de {type(sink).__name__} : {e}")
+
+
+class JsonlSink:
+    """Ajoute une ligne JSON par solution dans un fichier (écrite et vidée immédiatement)."""
+
+    def __init__(self, chemin: Path):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._fichier = self.chemin.open("a", encoding="utf-8")
+
+    def publier(self, numero: int, objectif: float, temps: float,
+                assignments: List[CourseAssignment]) -> None:
+        ligne = {"solution": numero, "objectif": objectif, "temps": round(temps, 3),
+                 "horodatage": time.time(), "affectations": [asdict(a) for a in assignments]}
+        self._fichier.write(json.dumps(ligne, ensure_ascii=False, default=str) + "\n")
+        self._fichier.flush()
+
+    def fermer(self) -> None:
+        if not self._fichier.closed:
+            self._fichier.close()
+
+
+class StagingTableSink:
+    """
+    Maintient la meilleure solution connue dans une table de staging.
+    Chaque solution remplace, dans une même transaction, les lignes de l'exécution courante.
+
+    L'écriture est faite par un thread dédié : publier() ne fait que déposer la solution
+    dans un emplacement unique (la plus récente remplace celle encore en attente), sans
+    bloquer la recherche CP-SAT. fermer() écrit la dernière solution déposée.
+    """
+
+    def __init__(self, engine, week_id: int, table: str = TABLE_STAGING, run_id: Optional[str] = None):
+        self.engine = engine
+        self.week_id = week_id
+        self.table = table
+        self.run_id = run_id or uuid.uuid4().hex
+        self._en_attente = QueueSink()
+        self._ecrivain = threading.Thread(target=self._ecrire_en_continu, name=f"staging-{self.run_id[:8]}",
+                                          daemon=True)
+        self._ecrivain.start()
+
+    def lignes(self, numero: int, objectif: float, assignments: List[CourseAssignment]) -> pd.DataFrame:
+        return pd.DataFrame([{
+            "run_id": self.run_id, "week_id": self.week_id, "solution_number": numero,
+            "objective": objectif, "course_id": a.course_id, "start_slot": a.start_slot,
+            "room_id": a.room_name, "teacher": a.teacher_name, "duration": a.duration,
+        } for a in assignments])
+
+    def publier(self, numero: int, objectif: float, temps: float,
+                assignments: List[CourseAssignment]) -> None:
+        self._en_attente.publier(numero, objectif, temps, assignments)
+
+    def _ecrire(self, numero: int, objectif: float, assignments: List[CourseAssignment]) -> None:
+        df = self.lignes(numero, objectif, assignments)
+        with self.engine.begin() as connexion:
+            connexion.execute(text(f"DELETE FROM {self.table} WHERE run_id = :run_id"),
+                              {"run_id": self.run_id})
+            df.to_sql(name=self.table, con=connexion, if_exists='append', index=False)
+
+    def _ecrire_en_continu(self) -> None:
+        """Boucle du thread d'écriture ; None demande l'arrêt."""
+        while True:
+            element = self._en_attente.file.get()
+            if element is None:
+                return
+            try:
+                self._ecrire(*element)
+            except Exception as e:
+                logger.error(f"Erreur d'écriture dans {self.table} : {e}")
+
+    def fermer(self) -> None:
+        """Attend l'écriture de la dernière solution déposée puis arrête le thread."""
+        if self._ecrivain.is_alive():
+            # put bloquant : le signal d'arrêt passe après la solution encore en attente
+            self._en_attente.file.put(None)
+            self._ecrivain.join()
+
+
+class QueueSink:
+    """
+    Publie (numéro, objectif, affectations) dans une file en mémoire (interface graphique).
+    Si la file est pleine, la plus ancienne solution est retirée : seule la plus récente compte.
+    """
+
+    def __init__(self, file: Optional[queue.Queue] = None):
+        self.file = file if file is not None else queue.Queue(maxsize=1)
+
+    def publier(self, numero: int, objectif: float, temps: float,
+                assignments: List[CourseAssignment]) -> None:
+        element = (numero, objectif, assignments)
+        while True:
+            try:
+                self.file.put_nowait(element)
+                return
+            except queue.Full:
+                try:
+                    self.file.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def fermer(self) -> None:
+        pass
@@ -97,13 +97,15 @@ class SolutionVisualizer:
         self._actual_starts = {a.course_id: a.start_slot for a in self._assignments}
         self._course_infos: List[CourseScheduleInfo] = []
 
-    def display(self, data_provider, week_id: str):
+    def display(self, data_provider, week_id: str, remplacer_semaine: bool = False):
         """
         Affiche la solution complète : console + graphiques.
 
         Args:
             data_provider: Fournisseur de données pour accès base de données
             week_id: Identifiant de la semaine
+            remplacer_semaine: remplace les lignes edt_slot de la semaine au lieu de les
+                compléter (réparation d'une semaine déjà enregistrée)
         """
         logger.info("\n4. Affichage de la solution trouvée :")
 
@@ -111,7 +113,7 @@ class SolutionVisualizer:
         self._print_schedule_to_console()
 
         # Génération graphique
-        self._generate_graphical_schedule(data_provider, week_id)
+        self._generate_graphical_schedule(data_provider, week_id, remplacer_semaine)
 
     def _print_schedule_to_console(self):
         """Affiche l'emploi du temps dans la console."""
@@ -120,13 +122,14 @@ class SolutionVisualizer:
         # Construit les infos de cours pour usage ultérieur
         self._course_infos = self._schedule_builder.build_course_schedule_info(self._assignments)
 
-    def _generate_graphical_schedule(self, data_provider, week_id: str):
+    def _generate_graphical_schedule(self, data_provider, week_id: str, remplacer_semaine: bool = False):
         """
         Génère les emplois du temps graphiques pour toutes les années.
 
         Args:
             data_provider: Fournisseur de données
             week_id: Identifiant de la semaine
+            remplacer_semaine: remplace les lignes edt_slot de la semaine au lieu de les compléter
         """
         try:
             # Récupère la liste des salles
@@ -134,7 +137,10 @@ class SolutionVisualizer:
 
             # Convertit les cours en format dictionnaire pour data_provider
             courses_dict_list = [info.to_dict() for info in self._course_infos]
-            data_provider.convert_courses_dict_to_list_insert(courses_dict_list)
+            if remplacer_semaine:
+                data_provider.replace_week_rows(week_id, data_provider.courses_dict_to_rows(courses_dict_list))
+            else:
+                data_provider.convert_courses_dict_to_list_insert(courses_dict_list)
 
             # Convertit en listes par année (B1, B2, B3)
             b1, b2, b3 = self._course_converter.convert_to_room_lists(
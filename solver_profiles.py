@@ -0,0 +1,113 @@
+"""
+Profils de paramétrage du solveur CP-SAT.
+Respecte le principe Single Responsibility (SOLID).
+
+Un profil regroupe le nombre de workers, la limite de temps, l'écart relatif
+accepté, le niveau de linéarisation, le temps déterministe et la graine
+aléatoire. Le nombre de workers par défaut est le nombre de cœurs réellement
+utilisables par le processus (affinité CPU et quota cgroup v1/v2 inclus).
+Le profil est choisi en ligne de commande (--profil) ou via la variable
+d'environnement SOLVER_PROFILE (.env).
+"""
+import math
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional
+
+from ortools.sat.python import cp_model
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def _quota_cgroup() -> Optional[int]:
+    """Nombre de cœurs autorisés par le quota cgroup (None si illimité ou inconnu)."""
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, periode = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+            if quota != "max":
+                return max(1, math.ceil(int(quota) / int(periode)))
+        elif CGROUP_V1_QUOTA.exists() and CGROUP_V1_PERIOD.exists():
+            quota = int(CGROUP_V1_QUOTA.read_text().strip())
+            periode = int(CGROUP_V1_PERIOD.read_text().strip())
+            if quota > 0 and periode > 0:
+                return max(1, math.ceil(quota / periode))
+    except (OSError, ValueError) as e:
+        logger.debug(f"Quota cgroup illisible : {e}")
+    return None
+
+
+def nombre_coeurs_utilisables() -> int:
+    """Cœurs utilisables : affinité du processus bornée par le quota cgroup."""
+    if hasattr(os, "sched_getaffinity"):
+        coeurs = len(os.sched_getaffinity(0))
+    else:
+        coeurs = os.cpu_count() or 1
+    quota = _quota_cgroup()
+    return max(1, min(coeurs, quota) if quota else coeurs)
+
+
+@dataclass(frozen=True)
+class SolverProfile:
+    """Paramètres CP-SAT nommés ; nb_workers=None utilise tous les cœurs utilisables."""
+    nom: str
+    max_time_seconds: float
+    nb_workers: Optional[int] = None
+    relative_gap_limit: float = 0.0
+    linearization_level: int = 1
+    max_deterministic_time: Optional[float] = None
+    random_seed: int = 0
+    stop_after_first_solution: bool = False
+
+    def workers(self) -> int:
+        return self.nb_workers or nombre_coeurs_utilisables()
+
+    def avec(self, **changements) -> 'SolverProfile':
+        """Copie du profil avec certains paramètres remplacés (None = inchangé)."""
+        return replace(self, **{k: v for k, v in changements.items() if v is not None})
+
+    def appliquer(self, solver: cp_model.CpSolver) -> None:
+        """Applique le profil aux paramètres du solveur."""
+        p = solver.parameters
+        p.max_time_in_seconds = self.max_time_seconds
+        p.num_search_workers = self.workers()
+        p.relative_gap_limit = self.relative_gap_limit
+        p.linearization_level = self.linearization_level
+        p.random_seed = self.random_seed
+        p.stop_after_first_solution = self.stop_after_first_solution
+        if self.max_deterministic_time is not None:
+            p.max_deterministic_time = self.max_deterministic_time
+
+    def description(self) -> str:
+        return (f"{self.nom} (workers={self.workers()}, temps max={self.max_time_seconds}s, "
+                f"gap relatif={self.relative_gap_limit}, linéarisation={self.linearization_level}, "
+                f"temps déterministe={self.max_deterministic_time}, graine={self.random_seed})")
+
+
+PROFILS: Dict[str, SolverProfile] = {
+    "fast-feasible": SolverProfile("fast-feasible", max_time_seconds=60, relative_gap_limit=0.05,
+                                   linearization_level=0, stop_after_first_solution=True),
+    "balanced": SolverProfile("balanced", max_time_seconds=300, relative_gap_limit=0.01),
+    "optimal": SolverProfile("optimal", max_time_seconds=1800, linearization_level=2),
+}
+PROFIL_PAR_DEFAUT = "balanced"
+
+
+def charger_profil(nom: Optional[str] = None) -> SolverProfile:
+    """
+    Retourne le profil demandé, sinon celui de SOLVER_PROFILE, sinon le profil par défaut.
+    SOLVER_WORKERS et SOLVER_MAX_TIME surchargent le nombre de workers et la limite de temps.
+    """
+    nom = nom or os.getenv("SOLVER_PROFILE", PROFIL_PAR_DEFAUT)
+    if nom not in PROFILS:
+        raise ValueError(f"Profil solveur inconnu : {nom} (attendu : {', '.join(PROFILS)})")
+    workers = os.getenv("SOLVER_WORKERS")
+    temps = os.getenv("SOLVER_MAX_TIME")
+    return PROFILS[nom].avec(nb_workers=int(workers) if workers else None,
+                             max_time_seconds=float(temps) if temps else None)
@@ -0,0 +1,150 @@
+"""
+Précalcul des créneaux de départ autorisés pour chaque cours.
+Respecte le principe Single Responsibility (SOLID).
+
+Toutes les règles qui interdisent un départ (fin de journée, pause midi,
+disponibilités des groupes, professeurs et salles, horaires obligatoires)
+sont évaluées une seule fois sous forme de masques NumPy sur l'axe global
+des créneaux (indice = jour * creneaux_par_jour + décalage). Le modèle ne
+crée ensuite des variables que pour les départs autorisés.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from function import recup_id_slot_from_str_to_int
+
+
+class StartDomainEngine:
+    """
+    Calcule et met en cache les masques de départ par durée et par ressource.
+    Les familles de `relachees` ('prof', 'salle') ne restreignent pas les domaines
+    de départ : leurs disponibilités sont alors portées par des contraintes du modèle
+    (blocs désactivables ou gardés pour le diagnostic d'infaisabilité).
+    """
+
+    def __init__(self, data: Dict[str, Any], relachees: Iterable[str] = ()):
+        self.data = data
+        self.relachees = frozenset(relachees)
+        self.jours: int = data['jours']
+        self.creneaux_par_jour: int = data['creneaux_par_jour']
+        self.nb_slots: int = data['nb_slots']
+        self.fenetre_midi = set(data.get('fenetre_midi', []))
+        self._salle_ids = list(data.get('salles', {}).keys())
+        self._cache_duree: Dict[int, np.ndarray] = {}
+        self._cache_plages: Dict[Tuple[str, Any, int], np.ndarray] = {}
+        self._cache_departs: Dict[str, np.ndarray] = {}
+
+    # ------------------------------------------------------------------
+    # Axe du temps
+    # ------------------------------------------------------------------
+    def temps_utiles(self) -> List[int]:
+        """Créneaux globaux hors pause midi (les seuls qu'un cours peut occuper)."""
+        return [t for t in range(self.nb_slots) if t % self.creneaux_par_jour not in self.fenetre_midi]
+
+    # ------------------------------------------------------------------
+    # Masques élémentaires
+    # ------------------------------------------------------------------
+    def masque_duree(self, duree: int) -> np.ndarray:
+        """Départs qui tiennent dans la journée sans traverser la pause midi."""
+        if duree not in self._cache_duree:
+            offsets = np.arange(self.creneaux_par_jour)
+            jour = offsets + duree <= self.creneaux_par_jour
+            for midi in self.fenetre_midi:
+                # Le cours couvre [offset, offset + duree) : il traverse `midi` si offset <= midi < offset + duree
+                jour &= ~((offsets <= midi) & (midi < offsets + duree))
+            self._cache_duree[duree] = np.tile(jour, self.jours)
+        return self._cache_duree[duree]
+
+    def _masque_plages(self, plages_par_jour: Dict[int, List[Tuple[int, int]]], duree: int) -> np.ndarray:
+        """Départs entièrement contenus dans une plage disponible du jour (jour sans plage = indisponible)."""
+        offsets = np.arange(self.creneaux_par_jour)
+        masque = np.zeros((self.jours, self.creneaux_par_jour), dtype=bool)
+        for jour in range(self.jours):
+            for debut, fin in plages_par_jour.get(jour, []):
+                masque[jour] |= (debut <= offsets) & (offsets + duree <= fin)
+        return masque.ravel()
+
+    def _masque_exact(self, plages_par_jour: Dict[int, List[Tuple[int, int]]], duree: int) -> np.ndarray:
+        """Départs correspondant exactement à une plage (début et fin identiques)."""
+        masque = np.zeros((self.jours, self.creneaux_par_jour), dtype=bool)
+        for jour in range(self.jours):
+            for debut, fin in plages_par_jour.get(jour, []):
+                if fin == debut + duree and 0 <= debut < self.creneaux_par_jour:
+                    masque[jour, debut] = True
+        return masque.ravel()
+
+    def _masque_ressource(self, famille: str, cle: Any, plages: Optional[dict], duree: int) -> np.ndarray:
+        """Masque d'une ressource mis en cache ; une ressource sans contrainte est toujours disponible."""
+        cache_key = (famille, cle, duree)
+        if cache_key not in self._cache_plages:
+            if plages is None:
+                masque = np.ones(self.nb_slots, dtype=bool)
+            elif famille == 'obligation':
+                masque = self._masque_exact(plages, duree)
+            else:
+                masque = self._masque_plages(plages, duree)
+            self._cache_plages[cache_key] = masque
+        return self._cache_plages[cache_key]
+
+    def masque_prof(self, p_idx: int, duree: int) -> np.ndarray:
+        """Départs compatibles avec les disponibilités du professeur d'indice p_idx."""
+        prof_name = self.data['profs'][p_idx]
+        teacher_id = self.data.get('prof_to_teacher_id', {}).get(prof_name)
+        dispos = self.data.get('disponibilites_profs', {})
+        plages = dispos.get(teacher_id) if teacher_id else None
+        return self._masque_ressource('prof', teacher_id, plages, duree)
+
+    def masque_salle(self, r_idx: int, duree: int) -> np.ndarray:
+        """Départs compatibles avec les disponibilités de la salle d'indice r_idx."""
+        salle_id = self._salle_ids[r_idx]
+        plages = self.data.get('disponibilites_salles', {}).get(salle_id)
+        return self._masque_ressource('salle', salle_id, plages, duree)
+
+    def masque_groupes(self, cid: str, duree: int) -> np.ndarray:
+        """Départs où tous les groupes associés au cours sont disponibles."""
+        dispos = self.data.get('disponibilites_groupes', {})
+        masque = np.ones(self.nb_slots, dtype=bool)
+        for groupe_id in self.data.get('map_cours_groupes', {}).get(cid, []):
+            if groupe_id in dispos:
+                masque = masque & self._masque_ressource('groupe', groupe_id, dispos[groupe_id], duree)
+        return masque
+
+    def masque_obligations(self, cid: str, duree: int) -> np.ndarray:
+        """Départs imposés par un horaire obligatoire du slot (tous autorisés si aucun)."""
+        obligations = self.data.get('obligations_slots', {})
+        if not obligations:
+            return np.ones(self.nb_slots, dtype=bool)
+        slot_id = recup_id_slot_from_str_to_int(cid)
+        return self._masque_ressource('obligation', slot_id, obligations.get(slot_id), duree)
+
+    # ------------------------------------------------------------------
+    # Domaines par cours
+    # ------------------------------------------------------------------
+    def masque_departs(self, cours: Dict[str, Any]) -> np.ndarray:
+        """
+        Masque des départs autorisés d'un cours : durée/midi, groupes, horaires obligatoires,
+        au moins un professeur autorisé disponible et au moins une salle disponible.
+        """
+        cid = cours['id']
+        if cid in self._cache_departs:
+            return self._cache_departs[cid]
+        duree = self.data['duree_cours'][cid]
+        masque = self.masque_duree(duree) & self.masque_groupes(cid, duree) & self.masque_obligations(cid, duree)
+
+        profs = cours.get('allowed_prof_indices', list(range(len(self.data.get('profs', [])))))
+        if profs and 'prof' not in self.relachees:
+            masque = masque & np.logical_or.reduce([self.masque_prof(p, duree) for p in profs])
+        if self._salle_ids and 'salle' not in self.relachees:
+            masque = masque & np.logical_or.reduce(
+                [self.masque_salle(r, duree) for r in range(len(self._salle_ids))])
+        self._cache_departs[cid] = masque
+        return masque
+
+    def departs_autorises(self, cours: Dict[str, Any]) -> List[int]:
+        """Indices globaux des créneaux où le cours peut démarrer."""
+        return np.flatnonzero(self.masque_departs(cours)).tolist()
+
+    def calculer(self) -> Dict[str, List[int]]:
+        """Départs autorisés de tous les cours : {cid: [créneaux]}."""
+        return {c['id']: self.departs_autorises(c) for c in self.data['cours']}
@@ -0,0 +1,63 @@
+"""
+Détection des symétries du problème d'emploi du temps.
+Respecte le principe Single Responsibility (SOLID).
+
+Deux cours sont interchangeables s'ils ont le même enseignement, les mêmes
+groupes, la même durée, les mêmes professeurs autorisés, les mêmes salles
+candidates et les mêmes départs autorisés. Deux salles sont interchangeables si
+elles ont la même capacité, les mêmes disponibilités et les mêmes
+compatibilités (teachings_rooms). Le modèle impose ensuite un ordre sur chaque
+classe pour ne pas explorer les permutations équivalentes.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from start_domains import StartDomainEngine
+
+
+class SymmetryDetector:
+    """Regroupe les cours et les salles en classes d'équivalence (taille >= 2)."""
+
+    def __init__(self, data: Dict[str, Any], domaines: Optional[StartDomainEngine] = None,
+                 salles_candidates: Optional[Dict[str, Tuple[List[int], bool]]] = None):
+        self.data = data
+        self.domaines = domaines or StartDomainEngine(data)
+        self.salles_candidates = salles_candidates or {}
+
+    @staticmethod
+    def _enseignement(cid: str) -> str:
+        """Identifiant sans le suffixe de slot : 'TD_R1.01_G1_s12' -> 'TD_R1.01_G1'."""
+        return cid.rsplit('_s', 1)[0]
+
+    def _signature_cours(self, cours: Dict[str, Any]) -> Tuple:
+        cid = cours['id']
+        return (
+            self._enseignement(cid),
+            cours.get('teaching_id'),
+            cours.get('type_id'),
+            tuple(sorted(cours['groups'])),
+            self.data['duree_cours'][cid],
+            tuple(sorted(cours.get('allowed_prof_indices', range(len(self.data.get('profs', [])))))),
+            tuple(self.salles_candidates.get(cid, ([], False))[0]),
+            tuple(self.domaines.departs_autorises(cours)),
+        )
+
+    def classes_cours(self) -> List[List[str]]:
+        """Classes de cours interchangeables, dans l'ordre des données."""
+        classes: Dict[Tuple, List[str]] = {}
+        for cours in self.data['cours']:
+            classes.setdefault(self._signature_cours(cours), []).append(cours['id'])
+        return [ids for ids in classes.values() if len(ids) > 1]
+
+    def _signature_salle(self, salle_id: Any, capacite: int) -> Tuple:
+        dispos = self.data.get('disponibilites_salles', {}).get(salle_id)
+        plages = None if dispos is None else tuple(sorted((j, tuple(p)) for j, p in dispos.items()))
+        compatibilites = tuple(sorted(
+            cle for cle, salles in self.data.get('salles_compatibles', {}).items() if salle_id in salles))
+        return capacite, plages, compatibilites
+
+    def classes_salles(self) -> List[List[int]]:
+        """Classes de salles interchangeables (indices physiques, ordre croissant)."""
+        classes: Dict[Tuple, List[int]] = {}
+        for r_idx, (salle_id, capacite) in enumerate(self.data.get('salles', {}).items()):
+            classes.setdefault(self._signature_salle(salle_id, capacite), []).append(r_idx)
+        return [indices for indices in classes.values() if len(indices) > 1]
@@ -5,6 +5,7 @@ Refactorisé pour éliminer la duplication de code.
 import unittest
 from unittest.mock import MagicMock, patch
 from ortools.sat.python import cp_model
+from solver_profiles import charger_profil
 
 
 def make_model_data(jours=5, creneaux=8, fenetre_midi=None):
@@ -103,7 +104,7 @@ class TestTestCombination(unittest.TestCase):
             mock_solver_class, cp_model.INFEASIBLE, ['profs'], timeout=120
         )
         self.assertEqual(mock_solver.parameters.max_time_in_seconds, 120)
-        self.assertEqual(mock_solver.parameters.num_search_workers, 8)
+        self.assertEqual(mock_solver.parameters.num_search_workers, charger_profil().workers())
         self.assertFalse(mock_solver.parameters.log_search_progress)
 
     @patch('app.cp_model.CpSolver')
@@ -216,5 +217,58 @@ class TestBlockNames(unittest.TestCase):
         self.assertEqual(len(self.EXPECTED_BLOCKS), 7)
 
 
+class TestDiagnosticParallele(unittest.TestCase):
+    """Tests de la recherche combinatoire répartie sur un pool de processus."""
+
+    def test_initialiseur_et_tache(self):
+        import app
+        from time_table_model import TimetableModel
+        from test_time_table_model import make_conflit_prof_data
+        app._initialiser_diagnostic(TimetableModel, make_conflit_prof_data(), 10, charger_profil().avec(nb_workers=1))
+        blocs, faisable, duree = app._tester_combinaison_worker(('profs',))
+        self.assertEqual(blocs, ('profs',))
+        self.assertTrue(faisable)
+        self.assertGreaterEqual(duree, 0)
+
+    def test_pool_trouve_un_bloc_responsable(self):
+        from app import diagnostic_automatique
+        from time_table_model import TimetableModel
+        from test_time_table_model import make_conflit_prof_data
+        gagnante = diagnostic_automatique(TimetableModel, make_conflit_prof_data(), timeout_per_test=10, nb_processus=2)
+        self.assertIn(gagnante, (['profs'], ['prof disponibles']))
+
+    def test_evenement_arret_leve_avant_le_test(self):
+        import multiprocessing
+        import app
+        from time_table_model import TimetableModel
+        from test_time_table_model import make_conflit_prof_data
+        arret = multiprocessing.Event()
+        arret.set()
+        app._initialiser_diagnostic(TimetableModel, make_conflit_prof_data(), 10, charger_profil().avec(nb_workers=1),
+                                    arret)
+        self.addCleanup(app._CONTEXTE_DIAGNOSTIC.clear)
+        _, faisable, _ = app._tester_combinaison_worker(('profs',))
+        self.assertFalse(faisable)
+
+    def test_evenement_arret_interrompt_la_recherche(self):
+        import threading
+        from app import _arreter_sur_signal
+        solver = MagicMock()
+        arret, termine = threading.Event(), threading.Event()
+        surveillance = threading.Thread(target=_arreter_sur_signal, args=(solver, arret, termine, 0.01))
+        surveillance.start()
+        arret.set()
+        surveillance.join(timeout=5)
+        self.assertFalse(surveillance.is_alive())
+        solver.StopSearch.assert_called_once()
+
+    @patch('app.ProcessPoolExecutor')
+    @patch('app.test_combination', return_value=True)
+    def test_un_processus_reste_sequentiel(self, mock_test_combination, mock_pool):
+        from app import diagnostic_automatique
+        self.assertEqual(diagnostic_automatique(MagicMock(), make_model_data(), 10, nb_processus=1), ['profs'])
+        mock_pool.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests pour le module batch_generation.
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from batch_generation import BatchGenerator, ResultatSemaine, parser_semaines, journaliser_recapitulatif
+from data_provider_id import DataProviderID
+from solver_profiles import PROFILS
+from test_time_table_model import make_complete_data
+
+
+class TestParserSemaines(unittest.TestCase):
+
+    def test_liste_et_plages(self):
+        self.assertEqual(parser_semaines("12-14, 3,13"), [3, 12, 13, 14])
+
+    def test_plage_inversee(self):
+        with self.assertRaises(ValueError):
+            parser_semaines("14-12")
+
+    def test_vide(self):
+        with self.assertRaises(ValueError):
+            parser_semaines(" , ")
+
+
+def make_provider():
+    provider = MagicMock()
+    provider.load_shared_data.return_value = {'salles': {}}
+    provider.load_and_prepare_data.side_effect = lambda week_id, shared: make_complete_data()
+    provider.courses_dict_to_rows.side_effect = DataProviderID.courses_dict_to_rows
+    return provider
+
+
+class TestBatchGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = make_provider()
+        self.generateur = BatchGenerator(self.provider, profil=PROFILS['balanced'].avec(max_time_seconds=10),
+                                         workers_par_semaine=1, nb_processus=2)
+
+    def test_donnees_communes_chargees_une_fois(self):
+        donnees = self.generateur.charger([3, 4, 5])
+        self.assertEqual(sorted(donnees), [3, 4, 5])
+        self.provider.load_shared_data.assert_called_once()
+        for appel in self.provider.load_and_prepare_data.call_args_list:
+            self.assertIs(appel.kwargs['shared'], self.provider.load_shared_data.return_value)
+
+    def test_generer_insere_en_une_fois(self):
+        resultats = self.generateur.generer([3, 4])
+        self.assertEqual([r.week_id for r in resultats], [3, 4])
+        self.assertTrue(all(r.resolue for r in resultats))
+        self.assertEqual(resultats[0].cours[0]['name'], 'CM_Test_G1_s1')
+        self.provider.insert_edt_rows.assert_called_once()
+        self.assertEqual(len(self.provider.insert_edt_rows.call_args.args[0]), 2)
+
+    def test_semaines_non_resolues_ignorees(self):
+        resultats = [ResultatSemaine(1, "INFEASIBLE", None, 0.1),
+                     ResultatSemaine(2, "OPTIMAL", 0.0, 0.1, [{'name': 'CM_Test_G1_s1', 'day': 0,
+                                                                 'start_hour': '08:00', 'room': 'S1'}])]
+        self.assertEqual(self.generateur.enregistrer(resultats), 1)
+        journaliser_recapitulatif(resultats)
+
+    def test_workers_par_semaine(self):
+        self.assertEqual(self.generateur.profil.workers(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests pour le module build_profiler.
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ortools.sat.python import cp_model
+
+from build_profiler import BuildProfiler
+from time_table_model import TimetableModel
+from test_time_table_model import make_complete_data
+
+
+class TestBuildProfiler(unittest.TestCase):
+
+    def test_compte_variables_et_contraintes(self):
+        model = cp_model.CpModel()
+        profiler = BuildProfiler(model, "booleen")
+        with profiler.bloc('test'):
+            x = model.NewBoolVar('x')
+            y = model.NewBoolVar('y')
+            model.Add(x + y <= 1)
+        bloc = profiler.profil.blocs[0]
+        self.assertEqual((bloc.nom, bloc.variables, bloc.contraintes), ('test', 2, 1))
+        self.assertGreaterEqual(bloc.duree_s, 0)
+        self.assertGreaterEqual(bloc.memoire_pic_ko, 0)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), "mémoire résidente mesurée via /proc")
+    def test_memoire_residente_voit_les_allocations_cp_sat(self):
+        model = cp_model.CpModel()
+        profiler = BuildProfiler(model)
+        with profiler.bloc('cp_sat'):
+            for i in range(30000):
+                model.AddBoolOr([model.NewBoolVar(f'x{i}'), model.NewBoolVar(f'y{i}')])
+        bloc = profiler.profil.blocs[0]
+        self.assertGreater(bloc.memoire_rss_ko, 1024)
+        self.assertGreater(bloc.memoire_rss_ko, bloc.memoire_pic_ko)
+
+    def test_bloc_mesure_meme_en_cas_d_exception(self):
+        profiler = BuildProfiler(cp_model.CpModel())
+        with self.assertRaises(ValueError):
+            with profiler.bloc('echec'):
+                raise ValueError("boom")
+        self.assertEqual(profiler.profil.blocs[0].nom, 'echec')
+
+    def test_ecrire_json(self):
+        profiler = BuildProfiler(cp_model.CpModel(), "intervalles")
+        with profiler.bloc('vide'):
+            pass
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = profiler.profil.ecrire_json(Path(dossier) / "profil.json")
+            contenu = json.loads(chemin.read_text(encoding="utf-8"))
+        self.assertEqual(contenu['mode'], 'intervalles')
+        self.assertEqual(contenu['blocs'][0]['nom'], 'vide')
+
+
+class TestProfilageBuildModel(unittest.TestCase):
+
+    def test_profil_desactive_par_defaut(self):
+        model = TimetableModel(make_complete_data())
+        model.build_model()
+        self.assertIsNone(model.profil_construction)
+
+    def test_profil_par_bloc(self):
+        model = TimetableModel(make_complete_data())
+        with tempfile.TemporaryDirectory() as dossier:
+            with patch('build_profiler.LOGS_DIR', Path(dossier)):
+                model.build_model(profiler=True)
+            self.assertEqual(len(list(Path(dossier).glob('build_profile_*.json'))), 1)
+        noms = [b.nom for b in model.profil_construction.blocs]
+        for nom in ('variables', 'linking', 'salle', 'professeurs', 'etudiant',
+                    'disponibilites_professeurs', 'disponibilites_groupes', 'disponibilites_salles',
+                    'disponibilites_cour_heure', 'ordre_cm_td_tp', 'penalites_fin_tardive', 'objectif'):
+            self.assertIn(nom, noms)
+        proto = model.model.Proto()
+        self.assertEqual(model.profil_construction.variables_totales, len(proto.variables))
+        self.assertEqual(model.profil_construction.contraintes_totales, len(proto.constraints))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,45 @@
 # Fichier: tests/test_data_provider_id.py
 
+import threading
+
 import pytest
 import pandas as pd
 from unittest.mock import Mock, patch, MagicMock
 from data_provider_id import DataProviderID
 
 
+def lecture_par_requete(resultats, barriere=None):
+    """
+    side_effect de pd.read_sql : DataFrame choisi d'après un fragment du SQL, les requêtes
+    étant exécutées en parallèle dans un ordre quelconque. Une barrière optionnelle bloque
+    chaque lecture jusqu'à ce que toutes soient en cours.
+    """
+    def lire(sql, *args, **kwargs):
+        if barriere is not None:
+            barriere.wait()
+        for fragment, df in resultats.items():
+            if fragment in sql:
+                return df
+        raise AssertionError(f"Requête inattendue : {sql}")
+    return lire
+
+
+def resultats_requetes(df_salles, df_profs, df_prof_slot, df_teachings_rooms, df_arbre, df_planning, df_dispos):
+    """{fragment SQL: DataFrame} pour les requêtes communes et celles d'une semaine."""
+    return {
+        "FROM rooms": df_salles,
+        "FROM slots_teachers": df_prof_slot,
+        "FROM teachers t": df_profs,
+        "FROM teachings_rooms": df_teachings_rooms,
+        "FROM `groups` g": df_arbre,
+        "FROM slots s": df_planning,
+        "FROM teacher_constraints": df_dispos,
+        "FROM room_constraints": df_dispos,
+        "FROM group_constraints": df_dispos,
+        "FROM slot_constraints": df_dispos,
+    }
+
+
 @pytest.fixture
 def db_config():
     return {
@@ -144,6 +178,9 @@ class TestBuildCourseStructures:
         assert len(cours) == 1
         assert 'TD_Info_G1_s2' in cours[0]['id']
         assert cours[0]['groups'] == ['G1']
+        assert cours[0]['promotion'] == 'BUT1'
+        assert cours[0]['type_id'] == 2
+        assert cours[0]['teaching_id'] is None
 
     def test_build_course_structures_tp(self, data_provider):
         df = pd.DataFrame({
@@ -227,17 +264,12 @@ class TestLoadAndPrepareData:
         }, index=[1])
         df_prof_slot = pd.DataFrame({'slot_id': [1], 'prof_name': ['Prof A']})
         df_dispos = pd.DataFrame(columns=['teacher_id', 'day_of_week', 'start_time', 'end_time', 'priority', 'week_id'])
+        df_teachings_rooms = pd.DataFrame({'teaching_id': [7, 7], 'type_id': [1, 1], 'room_id': [1, 2]})
+        df_arbre = pd.DataFrame({'promotion_name': ['BUT1', 'BUT1'], 'group_name': ['G1', 'G1'],
+                                 'subgroup_name': ['A', None]})
 
-        with patch.object(pd, 'read_sql', side_effect=[
-                              df_salles,
-                              df_profs,
-                              df_planning,
-                              df_dispos,
-                              df_dispos,
-                              df_dispos,
-                              df_dispos,
-                              df_prof_slot
-                          ]):
+        with patch.object(pd, 'read_sql', side_effect=lecture_par_requete(resultats_requetes(
+                df_salles, df_profs, df_prof_slot, df_teachings_rooms, df_arbre, df_planning, df_dispos))):
             with patch('data_provider_id.get_availabilityProf_From_Unavailable', return_value={}):
                 with patch('data_provider_id.get_availabilityRoom_From_Unavailable', return_value={}):
                     with patch('data_provider_id.get_availabilityGroup_From_Unavailable', return_value={}):
@@ -254,6 +286,110 @@ class TestLoadAndPrepareData:
         assert 'disponibilites_profs' in result
         assert result['salles'] == {'A101': 30, 'B202': 50}
         assert result['profs'] == ['Prof A', 'Prof B']
+        assert result['salles_compatibles'] == {(7, 1): [1, 2]}
+        assert result['hierarchie_groupes'] == {'G1': 'BUT1', 'G1A': 'G1'}
+
+    def test_donnees_partagees_lues_une_seule_fois(self, data_provider):
+        df_salles = pd.DataFrame({'name': ['A101'], 'seat_capacity': [30]})
+        df_profs = pd.DataFrame({'teacher_id': [1], 'prof_name': ['Prof A']})
+        df_prof_slot = pd.DataFrame({'slot_id': [1], 'prof_name': ['Prof A']})
+        df_teachings_rooms = pd.DataFrame({'teaching_id': [7], 'type_id': [1], 'room_id': [1]})
+        df_planning = pd.DataFrame({
+            'duration': [1.5], 'type_id': [1], 'teaching_title': ['Math'], 'promotion_name': ['BUT1'],
+            'group_name': [None], 'subgroup_name': [None], 'promo_size': [100], 'group_size': [None],
+            'subgroup_size': [None], 'promotion_id': [1]
+        }, index=[1])
+        df_dispos = pd.DataFrame(columns=['teacher_id', 'day_of_week', 'start_time', 'end_time', 'priority', 'week_id'])
+
+        df_arbre = pd.DataFrame(columns=['promotion_name', 'group_name', 'subgroup_name'])
+
+        lecture = lecture_par_requete(resultats_requetes(
+            df_salles, df_profs, df_prof_slot, df_teachings_rooms, df_arbre, df_planning, df_dispos))
+        with patch.object(pd, 'read_sql', side_effect=lecture):
+            shared = data_provider.load_shared_data()
+        with patch.object(pd, 'read_sql', side_effect=lecture) as read_sql:
+            with patch('data_provider_id.get_availabilityProf_From_Unavailable', return_value={}), \
+                    patch('data_provider_id.get_availabilityRoom_From_Unavailable', return_value={}), \
+                    patch('data_provider_id.get_availabilityGroup_From_Unavailable', return_value={}), \
+                    patch('data_provider_id.get_availabilitySlot_From_Unavailable', return_value={}):
+                semaine1 = data_provider.load_and_prepare_data(week_id=1, shared=shared)
+                semaine2 = data_provider.load_and_prepare_data(week_id=2, shared=shared)
+
+        assert read_sql.call_count == 10
+        assert semaine1['salles'] == semaine2['salles'] == {'A101': 30}
+        assert semaine2['salles_compatibles'] == {(7, 1): [1]}
+        assert shared['profs'] == ['Prof A']
+
+    def test_requetes_executees_en_parallele(self, data_provider):
+        df_planning = pd.DataFrame({
+            'duration': [1.0], 'type_id': [2], 'teaching_title': ['Info'], 'promotion_name': ['BUT1'],
+            'group_name': ['G1'], 'subgroup_name': [None], 'promo_size': [100], 'group_size': [30],
+            'subgroup_size': [None], 'promotion_id': [1]
+        }, index=[1])
+        resultats = resultats_requetes(
+            pd.DataFrame({'name': ['A101'], 'seat_capacity': [30]}),
+            pd.DataFrame({'teacher_id': [1], 'prof_name': ['Prof A']}),
+            pd.DataFrame({'slot_id': [1], 'prof_name': ['Prof A']}),
+            pd.DataFrame({'teaching_id': [7], 'type_id': [1], 'room_id': [1]}),
+            pd.DataFrame(columns=['promotion_name', 'group_name', 'subgroup_name']),
+            df_planning,
+            pd.DataFrame(columns=['teacher_id', 'day_of_week', 'start_time', 'end_time', 'priority', 'week_id']))
+        # Les 10 lectures doivent être en cours simultanément pour franchir la barrière
+        barriere = threading.Barrier(len(resultats), timeout=10)
+
+        with patch.object(pd, 'read_sql', side_effect=lecture_par_requete(resultats, barriere)) as read_sql:
+            with patch('data_provider_id.get_availabilityProf_From_Unavailable', return_value={}), \
+                    patch('data_provider_id.get_availabilityRoom_From_Unavailable', return_value={}), \
+                    patch('data_provider_id.get_availabilityGroup_From_Unavailable', return_value={}), \
+                    patch('data_provider_id.get_availabilitySlot_From_Unavailable', return_value={}):
+                result = data_provider.load_and_prepare_data(week_id=4)
+
+        assert read_sql.call_count == 10
+        assert not barriere.broken
+        assert result['cours'][0]['groups'] == ['G1']
+        parametres = [appel.kwargs.get('params') for appel in read_sql.call_args_list]
+        assert (4,) in parametres
+        assert parametres.count({'week_id': 4}) == 4
+
+
+class TestJetonModifications:
+    def test_jeton_stable_et_sensible_aux_changements(self, data_provider):
+        df_jeton = pd.DataFrame({'nom': ['rooms', 'teacher_constraints'], 'lignes': [3, 2],
+                                 'marque': ['2025-01-06 10:00:00', '123456']})
+        df_modifie = df_jeton.assign(lignes=[4, 2])
+
+        with patch.object(pd, 'read_sql', side_effect=[df_jeton, df_jeton.copy(), df_modifie]) as read_sql:
+            jetons = [data_provider.jeton_modifications() for _ in range(3)]
+
+        assert jetons[0] == jetons[1] != jetons[2]
+        sql = read_sql.call_args_list[0].args[0]
+        assert "MAX(updated_at)" in sql and "FROM slot_constraints" in sql
+
+
+class TestLoadReferenceAssignments:
+    def test_load_reference_assignments(self, data_provider):
+        df_edt = pd.DataFrame({
+            'slot_id': [1, 2],
+            'day_of_week': ['Mardi', 'Lundi'],
+            'start_hour': ['09:00:00', '13:30:00'],
+            'room_id': [12, None],
+            'teaching_id': [7, 8],
+            'type_id': [3, 1],
+            'duration': [1.5, 2.0],
+            'promotion_name': ['BUT1', 'BUT1'],
+            'group_name': ['G1', None],
+            'subgroup_name': ['A', None],
+        })
+        df_profs = pd.DataFrame({'slot_id': [1], 'prof_name': ['Prof A']})
+
+        with patch.object(pd, 'read_sql', side_effect=[df_edt, df_profs]):
+            references = data_provider.load_reference_assignments(reference_week_id=3)
+
+        assert references[0] == {'slot_id': 1, 'teaching_id': 7, 'type_id': 3, 'groupe': 'G1A', 'duree': 3, 'jour': 1,
+                                 'decalage': 2, 'room_id': 12, 'profs': ['Prof A']}
+        assert references[1]['groupe'] == 'BUT1'
+        assert references[1]['room_id'] is None
+        assert references[1]['profs'] == []
 
 
 class TestGetAvailabilityProfFromUnavailable:
@@ -328,6 +464,18 @@ class TestConvertCoursesDictToListInsertComplete:
         mock_insert.assert_called_once()
 
 
+class TestReplaceWeekRows:
+    def test_suppression_puis_insertion_dans_une_transaction(self, data_provider):
+        connexion = data_provider.engine.begin.return_value.__enter__.return_value
+        with patch.object(pd.DataFrame, 'to_sql') as to_sql:
+            data_provider.replace_week_rows(5, [('08:00', '42', 'A101', 'Lundi')])
+
+        requete, parametres = connexion.execute.call_args.args
+        assert "DELETE FROM edt_slot" in str(requete) and "week_id = :week_id" in str(requete)
+        assert parametres == {'week_id': 5}
+        to_sql.assert_called_once_with(name='edt_slot', con=connexion, if_exists='append', index=False)
+
+
 class TestInsertDataWithPandas:
     def test_insert_data_with_pandas_success(self, data_provider):
         df_test = pd.DataFrame({
@@ -0,0 +1,56 @@
+"""
+Tests pour le module decomposition.
+"""
+import unittest
+
+from ortools.sat.python import cp_model
+
+from decomposition import decouper_par_promotion, DecomposedSolver, PROMOTION_INCONNUE
+from solution_parser import SolutionParser
+from test_time_table_model import make_complete_data, add_course
+
+
+def make_data():
+    """Deux promotions partageant un professeur et une salle."""
+    data = make_complete_data()
+    data.update({'jours': 1, 'nb_slots': 4, 'slots': [(0, o) for o in range(4)],
+                 'cours': [], 'map_groupe_cours': {}, 'duree_cours': {},
+                 'salles': {'S1': 50}, 'capacites': [50], 'profs': ['P0']})
+    add_course(data, 'TD_A_G1_s1', ['G1'], allowed_profs=[0])
+    add_course(data, 'TD_B_G1_s2', ['G1'], allowed_profs=[0])
+    add_course(data, 'TD_C_G4_s3', ['G4'], allowed_profs=[0])
+    for c, promotion in zip(data['cours'], ('BUT1', 'BUT1', 'BUT2')):
+        c['promotion'] = promotion
+    return data
+
+
+class TestDecouperParPromotion(unittest.TestCase):
+
+    def test_decoupage(self):
+        sous = decouper_par_promotion(make_data())
+        self.assertEqual(sorted(sous), ['BUT1', 'BUT2'])
+        self.assertEqual([c['id'] for c in sous['BUT1']['cours']], ['TD_A_G1_s1', 'TD_B_G1_s2'])
+        self.assertEqual(sous['BUT2']['duree_cours'], {'TD_C_G4_s3': 1})
+        self.assertEqual(sous['BUT2']['map_groupe_cours'], {'G4': ['TD_C_G4_s3']})
+        self.assertEqual(sous['BUT2']['salles'], {'S1': 50})
+
+    def test_cours_sans_promotion(self):
+        data = make_data()
+        del data['cours'][2]['promotion']
+        self.assertIn(PROMOTION_INCONNUE, decouper_par_promotion(data))
+
+
+class TestDecomposedSolver(unittest.TestCase):
+
+    def test_fusion_resout_les_ressources_partagees(self):
+        data = make_data()
+        resultat = DecomposedSolver(data, nb_coeurs=2).resoudre(max_time_seconds=20)
+        self.assertIn(resultat['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        self.assertEqual(set(resultat['statuts_promotions']), {'BUT1', 'BUT2'})
+        affectations = SolutionParser(resultat, data).parse_assignments()
+        # Un seul professeur et une seule salle : les trois cours sont sur des créneaux distincts
+        self.assertEqual(len({a.start_slot for a in affectations}), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
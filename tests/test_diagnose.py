@@ -3,7 +3,7 @@ Tests pour le module diagnose.
 Refactorisé pour éliminer la duplication de code.
 """
 import unittest
-from diagnose import diagnose_feasibility
+from diagnose import diagnose_feasibility, DiagnosticEmploiDuTemps, GrapheConflits
 
 
 def make_base_data(jours=5, creneaux=8, fenetre_midi=None, salles=None):
@@ -140,5 +140,88 @@ class TestDiagnoseFeasibility(unittest.TestCase):
             self.assertIn(key, result)
 
 
+class TestVerificationsRessources(unittest.TestCase):
+    """Tests des vérifications statiques par professeur, classe de salles, journée et hiérarchie."""
+
+    def test_professeur_surcharge(self):
+        data = make_base_data(jours=1)
+        data.update(profs=['Prof1'], prof_to_teacher_id={'Prof1': 7}, disponibilites_profs={7: {0: [(0, 2)]}})
+        for k in range(3):
+            add_course(data, f'C{k}', f'G{k}', duration=1, group_size=10)
+            data['cours'][-1]['allowed_prof_indices'] = [0]
+        result = diagnose_feasibility(data)
+        self.assertEqual(result['teacher_overloaded'], [('Prof1', 3, 2)])
+
+    def test_classe_de_salles_surchargee(self):
+        # Une seule grande salle : 7 créneaux utilisables par jour sur 1 jour (midi = 1 créneau)
+        data = make_base_data(jours=1, fenetre_midi=[3], salles={'Petite': 10, 'Grande': 100})
+        for k in range(8):
+            add_course(data, f'C{k}', f'G{k}', duration=1, group_size=80)
+        result = diagnose_feasibility(data)
+        self.assertEqual(result['room_class_overloaded'], [('Grande', 8, 7)])
+        self.assertEqual(result['group_overbooked'], [])
+
+    def test_empilement_autour_de_la_pause_midi(self):
+        # Plages de 3 et 5 créneaux : deux séances de 4 créneaux ne tiennent pas dans la journée
+        data = make_base_data(jours=1, creneaux=9, fenetre_midi=[3])
+        add_course(data, 'C1', 'G1', duration=4, group_size=10)
+        add_course(data, 'C2', 'G1', duration=4, group_size=10)
+        result = diagnose_feasibility(data)
+        self.assertEqual(result['group_overbooked'], [])
+        self.assertEqual(result['day_packing'], [('G1', 4, 2, 1)])
+
+    def test_sous_groupe_et_parent_surcharges(self):
+        data = make_base_data(jours=1, fenetre_midi=[])
+        add_course(data, 'CM', 'G1', duration=5, group_size=10)
+        add_course(data, 'TD', 'G1A', duration=4, group_size=10)
+        result = DiagnosticEmploiDuTemps(data, hierarchie={'G1A': 'G1'}).executer_diagnostic()
+        self.assertEqual(result['hierarchy_overbooked'], [('G1A+G1', 9, 8)])
+
+    def test_fail_fast_arrete_au_premier_probleme(self):
+        data = make_base_data(jours=1)
+        add_course(data, 'C1', 'G1', duration=10, group_size=100)
+        complet = diagnose_feasibility(data)
+        rapide = diagnose_feasibility(data, fail_fast=True)
+        self.assertTrue(complet['no_room'])
+        self.assertTrue(rapide['no_valid_start'])
+        self.assertEqual(rapide['no_room'], [])
+
+
+class TestCliquesConflits(unittest.TestCase):
+    """Tests du graphe de conflits et de la borne par clique."""
+
+    def _make_triangle(self):
+        # A et C partagent G1, B et C partagent G2, A et B ont le même professeur imposé
+        data = make_base_data(jours=1, creneaux=4, fenetre_midi=[])
+        data['profs'] = ['Prof1']
+        add_course(data, 'A', 'G1', duration=2, group_size=10)
+        add_course(data, 'B', 'G2', duration=2, group_size=10)
+        add_course(data, 'C', 'G1', duration=2, group_size=10)
+        data['cours'][-1]['groups'] = ['G1', 'G2']
+        data['map_groupe_cours']['G2'].append('C')
+        for cours in data['cours'][:2]:
+            cours['allowed_prof_indices'] = [0]
+        return data
+
+    def test_clique_mixte_groupes_et_professeur(self):
+        graphe = GrapheConflits(self._make_triangle(), hierarchie={})
+        self.assertIn([0, 1, 2], graphe.cliques())
+
+    def test_clique_surchargee_nommee(self):
+        result = diagnose_feasibility(self._make_triangle())
+        # Aucune vérification par groupe ou par professeur ne voit le conflit
+        self.assertEqual(result['group_overbooked'], [])
+        self.assertEqual(result['teacher_overloaded'], [])
+        self.assertEqual(result['clique_overloaded'], [(('A', 'B', 'C'), 6, 4)])
+
+    def test_hierarchie_relie_sous_groupe_et_parent(self):
+        data = make_base_data()
+        add_course(data, 'CM', 'G1', duration=1, group_size=10)
+        add_course(data, 'TD', 'G1A', duration=1, group_size=10)
+        graphe = GrapheConflits(data, hierarchie={'G1A': 'G1'})
+        self.assertTrue(graphe.adjacence[0, 1])
+        self.assertEqual(diagnose_feasibility(data)['clique_overloaded'], [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests pour le module greedy_scheduler.
+"""
+import unittest
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from greedy_scheduler import GreedyScheduler, departs_libres
+from time_table_model import TimetableModel, HIERARCHIE_GROUPES
+from test_time_table_model import make_base_data, make_complete_data, add_course
+
+
+def make_data(jours=1, creneaux=4):
+    data = make_complete_data()
+    data.update(make_base_data(jours=jours, creneaux=creneaux, salles={'S1': 50, 'S2': 20},
+                               profs=['P0', 'P1']))
+    data['capacites'] = [50, 20]
+    return data
+
+
+class TestDepartsLibres(unittest.TestCase):
+
+    def test_fenetres(self):
+        occupation = np.array([[0, 0, 1, 0, 0], [0, 0, 0, 0, 0]], dtype=bool)
+        np.testing.assert_array_equal(departs_libres(occupation, 2),
+                                      [[True, False, False, True, True], [True] * 5])
+
+
+class TestGreedyScheduler(unittest.TestCase):
+
+    def test_place_sans_conflit(self):
+        data = make_data()
+        add_course(data, 'TD_A_G1_s1', ['G1'], group_size=15, allowed_profs=[0])
+        add_course(data, 'TD_B_G1_s2', ['G1'], group_size=15, allowed_profs=[0, 1])
+        add_course(data, 'TD_C_G2_s3', ['G2'], allowed_profs=[0])
+        resultat = GreedyScheduler(data).planifier()
+        self.assertTrue(resultat.complet)
+        a, b, c = (resultat.affectations[cid] for cid in ('TD_A_G1_s1', 'TD_B_G1_s2', 'TD_C_G2_s3'))
+        self.assertNotEqual(a[0], b[0])  # même groupe
+        self.assertNotEqual(a[0], c[0])  # même professeur imposé
+        self.assertEqual(a[1], 1)  # plus petite salle suffisante
+
+    def test_hierarchie_ancetres_et_descendants(self):
+        data = make_data(creneaux=2)
+        add_course(data, 'TD_A_G1_s1', ['G1'], allowed_profs=[0])
+        add_course(data, 'TP_B_G1A_s2', ['G1A'], allowed_profs=[1])
+        add_course(data, 'TP_C_G1B_s3', ['G1B'], allowed_profs=[1])
+        resultat = GreedyScheduler(data, HIERARCHIE_GROUPES).planifier()
+        # G1 bloque ses sous-groupes ; G1A et G1B ne se bloquent pas entre eux (mais partagent P1)
+        self.assertEqual(resultat.non_places, ['TP_C_G1B_s3'])
+        self.assertNotEqual(resultat.affectations['TD_A_G1_s1'][0], resultat.affectations['TP_B_G1A_s2'][0])
+
+    def test_ordre_cm_td_tp(self):
+        data = make_data()
+        add_course(data, 'TP_M_G1A_s1', ['G1A'], allowed_profs=[1])
+        add_course(data, 'TD_M_G1_s2', ['G1'], allowed_profs=[1])
+        add_course(data, 'CM_M_BUT1_s3', ['BUT1', 'G1', 'G1A'], allowed_profs=[0])
+        aff = GreedyScheduler(data, HIERARCHIE_GROUPES).planifier().affectations
+        self.assertLess(aff['CM_M_BUT1_s3'][0], aff['TD_M_G1_s2'][0])
+        self.assertLess(aff['TD_M_G1_s2'][0], aff['TP_M_G1A_s1'][0])
+
+    def test_non_places_listes(self):
+        data = make_data(creneaux=1)
+        add_course(data, 'TD_A_G1_s1', ['G1'], allowed_profs=[0])
+        add_course(data, 'TD_B_G1_s2', ['G1'], allowed_profs=[1])
+        ordonnanceur = GreedyScheduler(data)
+        resultat = ordonnanceur.planifier()
+        self.assertEqual(len(resultat.non_places), 1)
+        self.assertEqual(len(ordonnanceur.parse_assignments()), 1)
+
+    def test_indications_pour_cp_sat(self):
+        data = make_data(jours=2)
+        for k in range(4):
+            add_course(data, f'TD_X{k}_G1_s{k}', ['G1'], allowed_profs=[0, 1])
+        resultat = GreedyScheduler(data).planifier()
+        model = TimetableModel(data)
+        model.build_model()
+        model.appliquer_indications(resultat.affectations)
+        # L'affectation gloutonne est une solution complète du modèle exact
+        solver = cp_model.CpSolver()
+        solver.parameters.fix_variables_to_their_hinted_value = True
+        solver.parameters.num_search_workers = 1
+        self.assertIn(solver.Solve(model.model), (cp_model.OPTIMAL, cp_model.FEASIBLE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Tests pour le module group_tree.
+"""
+import unittest
+
+from group_tree import ArbreGroupes, HIERARCHIE_GROUPES
+
+
+class TestArbreGroupes(unittest.TestCase):
+
+    def test_depuis_lignes(self):
+        lignes = [
+            {'promotion_name': 'BUT1', 'group_name': 'G1', 'subgroup_name': 'A'},
+            {'promotion_name': 'BUT1', 'group_name': 'G1', 'subgroup_name': 'B'},
+            {'promotion_name': 'BUT1', 'group_name': 'G2', 'subgroup_name': None},
+            {'promotion_name': 'BUT2', 'group_name': None, 'subgroup_name': None},
+        ]
+        arbre = ArbreGroupes.depuis_lignes(lignes)
+        self.assertEqual(arbre.parents, {'G1': 'BUT1', 'G1A': 'G1', 'G1B': 'G1', 'G2': 'BUT1'})
+        self.assertEqual(arbre.ancetres('G1A'), ['G1', 'BUT1'])
+
+    def test_repli_sur_la_hierarchie_par_defaut(self):
+        self.assertEqual(ArbreGroupes.depuis_donnees({}).parents, HIERARCHIE_GROUPES)
+        self.assertEqual(ArbreGroupes.depuis_donnees({'hierarchie_groupes': {'X': 'Y'}}).parents, {'X': 'Y'})
+
+    def test_groupes_feuilles(self):
+        groupes = {'BUT1': ['CM'], 'G1': ['CM', 'TD'], 'G1A': ['CM', 'TP'], 'G2': ['CM', 'TD2']}
+        self.assertEqual(ArbreGroupes(HIERARCHIE_GROUPES).cours_par_feuille(groupes),
+                         {'G1A': ['CM', 'TP', 'TD'], 'G2': ['CM', 'TD2']})
+
+    def test_fermeture_par_promotion(self):
+        arbre = ArbreGroupes({'G1': 'BUT1', 'G1A': 'G1', 'G2': 'BUT1'})
+        groupes = {'BUT1': ['SAE'], 'G1': ['TD'], 'G1A': ['TP'], 'G2': ['TD2']}
+        self.assertEqual(arbre.cours_par_feuille(groupes),
+                         {'G1A': ['TP', 'TD', 'SAE'], 'G2': ['TD2', 'SAE']})
+
+    def test_sans_fermeture(self):
+        arbre = ArbreGroupes({'G1A': 'G1'})
+        groupes = {'G1': ['TD', 'CM'], 'G1A': ['TP', 'CM'], 'G2': ['CM']}
+        self.assertEqual(arbre.cours_par_feuille(groupes, fermeture=False),
+                         {'G1': ['TD', 'CM'], 'G1A': ['TP', 'CM']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""
+Tests pour le module infeasibility_core.
+"""
+import unittest
+
+from infeasibility_core import InfeasibilityCoreExtractor, NoyauInfaisabilite, diagnostic_par_noyau
+from test_time_table_model import make_complete_data, make_conflit_prof_data
+
+
+class TestInfeasibilityCoreExtractor(unittest.TestCase):
+
+    def test_noyau_minimal_prof_et_disponibilite(self):
+        noyau = InfeasibilityCoreExtractor(make_conflit_prof_data(), timeout=10).extraire()
+        self.assertTrue(noyau.infaisable)
+        self.assertTrue(noyau.minimal)
+        self.assertEqual(sorted(noyau.gardes), [('prof disponibles', 'Prof1'), ('profs', 'Prof1')])
+        self.assertEqual(noyau.par_bloc(), {b: ['Prof1'] for b in noyau.blocs()})
+
+    def test_modele_faisable_sans_noyau(self):
+        noyau = diagnostic_par_noyau(make_complete_data(), timeout=10)
+        self.assertFalse(noyau.infaisable)
+        self.assertEqual(noyau.gardes, [])
+
+
+class TestNoyauInfaisabilite(unittest.TestCase):
+
+    def test_regroupement_par_bloc(self):
+        noyau = NoyauInfaisabilite("INFEASIBLE", [('salles', 'S1'), ('etudiant', 'G1'), ('salles', 'S2')])
+        self.assertEqual(noyau.blocs(), ['salles', 'etudiant'])
+        self.assertEqual(noyau.par_bloc(), {'salles': ['S1', 'S2'], 'etudiant': ['G1']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests pour les modules model_cache et disk_cache.
+"""
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ortools.sat.python import cp_model
+
+from disk_cache import DiskLRUCache
+from model_cache import ModelCache, empreinte_donnees
+from solution_parser import SolutionParser
+from time_table_model import TimetableModel, MODE_INTERVALLES
+from test_time_table_model import make_complete_data, add_course
+
+
+class TestDiskLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+
+    def test_ecriture_lecture(self):
+        cache = DiskLRUCache(Path(self.dossier.name))
+        cache.ecrire('a', {'x': 1})
+        self.assertEqual(cache.lire('a'), {'x': 1})
+        self.assertIsNone(cache.lire('absent'))
+
+    def test_eviction_lru_par_nombre(self):
+        cache = DiskLRUCache(Path(self.dossier.name), max_entrees=2)
+        cache.ecrire('a', 1)
+        cache.ecrire('b', 2)
+        ancien = time.time() - 100
+        os.utime(cache._chemin('b'), (ancien, ancien))  # 'b' devient la moins récemment utilisée
+        cache.ecrire('c', 3)
+        self.assertTrue(cache.contient('a'))
+        self.assertFalse(cache.contient('b'))
+        self.assertTrue(cache.contient('c'))
+
+    def test_eviction_par_taille(self):
+        cache = DiskLRUCache(Path(self.dossier.name), max_entrees=10, max_octets=1500)
+        cache.ecrire('a', b'x' * 1000)
+        cache.ecrire('b', b'y' * 1000)
+        self.assertFalse(cache.contient('a'))
+        self.assertTrue(cache.contient('b'))
+
+
+class TestEmpreinte(unittest.TestCase):
+
+    def test_stable_et_sensible_aux_donnees(self):
+        data = make_complete_data()
+        self.assertEqual(empreinte_donnees(data, {'mode': 'booleen'}), empreinte_donnees(dict(data), {'mode': 'booleen'}))
+        self.assertNotEqual(empreinte_donnees(data, {'mode': 'booleen'}), empreinte_donnees(data, {'mode': 'intervalles'}))
+        autre = make_complete_data()
+        autre['duree_cours']['CM_Test_G1_s1'] = 2
+        self.assertNotEqual(empreinte_donnees(data, {}), empreinte_donnees(autre, {}))
+
+    def test_cles_tuples_et_entiers(self):
+        data = {'salles_compatibles': {(1, 2): [3]}, 'salles': {10: 30, '10': 40}}
+        self.assertEqual(len(empreinte_donnees(data, {})), 64)
+
+
+class TestModelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+        self.cache = ModelCache(Path(self.dossier.name))
+        self.data = make_complete_data()
+        self.data['cours'] = []
+        self.data['map_groupe_cours'] = {}
+        self.data['profs'] = ['Prof1', 'Prof2']
+        self.data['salles'] = {'Salle1': 50, 'Salle2': 50}
+        self.data['capacites'] = [50, 50]
+        add_course(self.data, 'TD_X_G1_s1', ['G1'], allowed_profs=[0, 1])
+        add_course(self.data, 'TD_X_G1_s2', ['G1'], allowed_profs=[1])
+
+    def test_second_build_charge_depuis_le_cache(self):
+        for mode in ('booleen', MODE_INTERVALLES):
+            with self.subTest(mode=mode):
+                premier = TimetableModel(self.data, mode=mode)
+                premier.build_model(cache=self.cache)
+                second = TimetableModel(self.data, mode=mode)
+                with patch.object(TimetableModel, '_create_decision_variables') as creation:
+                    second.build_model(cache=self.cache)
+                creation.assert_not_called()
+                self.assertEqual(len(second.model.Proto().constraints), len(premier.model.Proto().constraints))
+                self.assertEqual(second.objectifs.exporter_indices(), premier.objectifs.exporter_indices())
+
+                resultat = second.solve(max_time_seconds=10)
+                self.assertIn(resultat['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+                affectations = SolutionParser(resultat, self.data).parse_assignments()
+                self.assertEqual(len(affectations), 2)
+
+    def test_etat_restaure_au_chargement(self):
+        premier = TimetableModel(self.data)
+        premier.build_model(cache=self.cache, trous=True, poids_trous=7)
+        second = TimetableModel(self.data)
+        second.build_model(cache=self.cache, trous=True, poids_trous=7)
+        self.assertEqual(second.poids_objectifs, premier.poids_objectifs)
+        self.assertEqual(second.poids_objectifs['trous_groupes'], 7)
+        self.assertEqual(list(second.temps_utiles), list(premier.temps_utiles))
+        self.assertIsNotNone(second.domaines)
+
+    def test_profilage_reconstruit_sans_cache(self):
+        TimetableModel(self.data).build_model(cache=self.cache)
+        modele = TimetableModel(self.data)
+        with tempfile.TemporaryDirectory() as logs, patch('build_profiler.LOGS_DIR', Path(logs)):
+            modele.build_model(profiler=True, cache=self.cache)
+        self.assertIsNotNone(modele.profil_construction)
+        self.assertGreater(modele.profil_construction.variables_totales, 0)
+
+    def test_options_differentes_reconstruisent(self):
+        TimetableModel(self.data).build_model(cache=self.cache)
+        modele = TimetableModel(self.data)
+        modele.build_model(casser_symetries=True, cache=self.cache)
+        self.assertEqual(len(self.cache.stockage.entrees()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests pour le module objectives.
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from ortools.sat.python import cp_model
+
+from objectives import ObjectiveSet, LexicographicSolver, ORDRE_PAR_DEFAUT
+from solver_profiles import PROFILS
+from time_table_model import TimetableModel
+from test_time_table_model import make_complete_data
+
+PROFIL_TEST = PROFILS['balanced'].avec(max_time_seconds=10, nb_workers=1)
+
+
+def make_modele():
+    """Deux critères contradictoires : a + b == 1, capacite = a, fin_tardive = 5 * b."""
+    model = cp_model.CpModel()
+    a, b = model.NewBoolVar('a'), model.NewBoolVar('b')
+    model.Add(a + b == 1)
+    objectifs = ObjectiveSet()
+    objectifs.ajouter('capacite', a)
+    objectifs.ajouter('fin_tardive', b, 5)
+    return model, objectifs, a, b
+
+
+class TestObjectiveSet(unittest.TestCase):
+
+    def test_ordonner(self):
+        objectifs = ObjectiveSet()
+        model = cp_model.CpModel()
+        objectifs.ajouter('trous', model.NewBoolVar('t'))
+        objectifs.ajouter('capacite', model.NewBoolVar('c'))
+        objectifs.definir('deplacements', [])
+        self.assertEqual(objectifs.ordonner(), ['capacite', 'trous'])
+        self.assertEqual(objectifs.ordonner(['trous', 'capacite']), ['trous', 'capacite'])
+        self.assertIn('deplacements', ORDRE_PAR_DEFAUT)
+
+    def test_export_indices(self):
+        model, objectifs, a, b = make_modele()
+        copie = ObjectiveSet.depuis_indices(model, objectifs.exporter_indices())
+        self.assertEqual(copie.exporter_indices(), {'capacite': [(a.Index(), 1)], 'fin_tardive': [(b.Index(), 5)]})
+
+
+class TestLexicographicSolver(unittest.TestCase):
+
+    def test_priorite_respectee(self):
+        for ordre, attendu in ((['capacite', 'fin_tardive'], (0, 1)), (['fin_tardive', 'capacite'], (1, 0))):
+            with self.subTest(ordre=ordre):
+                model, objectifs, a, b = make_modele()
+                lexico = LexicographicSolver(model, objectifs, ordre)
+                statut, solver = lexico.resoudre(PROFIL_TEST)
+                self.assertEqual(statut, cp_model.OPTIMAL)
+                self.assertEqual((solver.Value(a), solver.Value(b)), attendu)
+                self.assertEqual([e.nom for e in lexico.etapes], ordre)
+
+    def test_rapport_par_etape(self):
+        model, objectifs, _, _ = make_modele()
+        lexico = LexicographicSolver(model, objectifs, ['capacite', 'fin_tardive'])
+        lexico.resoudre(PROFIL_TEST)
+        self.assertEqual([(e.valeur, e.statut) for e in lexico.etapes], [(0, 'OPTIMAL'), (5, 'OPTIMAL')])
+        self.assertTrue(all(e.duree >= 0 for e in lexico.etapes))
+
+    def test_modele_infaisable(self):
+        model, objectifs, a, b = make_modele()
+        model.Add(a + b == 2)
+        model.Add(a == 0)
+        statut, _ = LexicographicSolver(model, objectifs).resoudre(PROFIL_TEST)
+        self.assertEqual(statut, cp_model.INFEASIBLE)
+
+    def test_sans_objectif(self):
+        model = cp_model.CpModel()
+        model.NewBoolVar('x')
+        lexico = LexicographicSolver(model, ObjectiveSet())
+        statut, _ = lexico.resoudre(PROFIL_TEST)
+        self.assertEqual(statut, cp_model.OPTIMAL)
+        self.assertEqual(lexico.etapes[0].nom, 'faisabilite')
+
+
+class TestSolveLexicographique(unittest.TestCase):
+
+    def test_timetable_model(self):
+        model = TimetableModel(make_complete_data())
+        model.build_model()
+        resultat = model.solve_lexicographique(profil=PROFIL_TEST)
+        self.assertIn(resultat['status'], (cp_model.OPTIMAL, cp_model.FEASIBLE))
+        self.assertIsNotNone(resultat['vars'])
+        self.assertEqual([e['nom'] for e in resultat['etapes']], model.objectifs.ordonner() or ['faisabilite'])
+
+    def test_solutions_publiees_et_destinataires_fermes(self):
+        model = TimetableModel(make_complete_data())
+        model.build_model()
+        sink = MagicMock()
+        resultat = model.solve_lexicographique(profil=PROFIL_TEST, sinks=[sink])
+        self.assertIn(resultat['status'], (cp_model.OPTIMAL, cp_model.FEASIBLE))
+        self.assertGreaterEqual(sink.publier.call_count, len(resultat['etapes']))
+        numeros = [appel.args[0] for appel in sink.publier.call_args_list]
+        self.assertEqual(numeros, list(range(1, len(numeros) + 1)))
+        sink.fermer.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
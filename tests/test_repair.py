@@ -0,0 +1,115 @@
+"""
+Tests pour le module repair et le mode réparation de TimetableModel.
+"""
+import unittest
+
+from ortools.sat.python import cp_model
+
+from repair import RepairPlanner
+from solution_parser import SolutionParser
+from time_table_model import TimetableModel, HIERARCHIE_GROUPES
+from test_time_table_model import make_complete_data, add_course
+
+
+def make_data():
+    """2 jours de 4 créneaux, 3 salles, 3 professeurs."""
+    data = make_complete_data()
+    data.update({'jours': 2, 'nb_slots': 8, 'slots': [(j, o) for j in range(2) for o in range(4)],
+                 'cours': [], 'map_groupe_cours': {}, 'duree_cours': {},
+                 'salles': {'S1': 50, 'S2': 50, 'S3': 50}, 'capacites': [50, 50, 50],
+                 'profs': ['P0', 'P1', 'P2'], 'prof_to_teacher_id': {'P0': 10, 'P1': 11, 'P2': 12}})
+    add_course(data, 'TD_A_G1_s1', ['G1'], allowed_profs=[0])
+    add_course(data, 'TP_Z_G1A_s2', ['G1A'], allowed_profs=[1])
+    add_course(data, 'TD_B_G2_s3', ['G2'], allowed_profs=[2])
+    add_course(data, 'TD_C_G3_s4', ['G3'], allowed_profs=[2])
+    return data
+
+
+AFFECTATIONS = {
+    'TD_A_G1_s1': (0, 0, 0),
+    'TP_Z_G1A_s2': (1, 1, 1),
+    'TD_B_G2_s3': (0, 2, 2),
+    'TD_C_G3_s4': (4, 0, 2),
+}
+
+
+class TestRepairPlanner(unittest.TestCase):
+
+    def test_aucun_changement(self):
+        planner = RepairPlanner(make_data(), AFFECTATIONS, HIERARCHIE_GROUPES)
+        self.assertEqual(planner.cours_affectes(), [])
+        rouverts, figes = planner.planifier()
+        self.assertEqual(rouverts, set())
+        self.assertEqual(figes, AFFECTATIONS)
+
+    def test_professeur_indisponible_et_voisinage(self):
+        data = make_data()
+        data['disponibilites_profs'] = {10: {1: [(0, 4)]}}  # P0 absent le jour 0
+        planner = RepairPlanner(data, AFFECTATIONS, HIERARCHIE_GROUPES)
+        self.assertEqual(planner.cours_affectes(), ['TD_A_G1_s1'])
+        rouverts, figes = planner.planifier()
+        # Le TP de G1A (sous-groupe) et le cours partageant la salle S1 le même jour sont rouverts ;
+        # le cours du jour 1 reste figé.
+        self.assertEqual(rouverts, {'TD_A_G1_s1', 'TP_Z_G1A_s2'})
+        self.assertIn('TD_C_G3_s4', figes)
+
+    def test_salle_fermee(self):
+        data = make_data()
+        data['disponibilites_salles'] = {'S3': {}}
+        planner = RepairPlanner(data, AFFECTATIONS, HIERARCHIE_GROUPES)
+        self.assertEqual(planner.cours_affectes(), ['TD_B_G2_s3'])
+
+    def test_cours_sans_affectation_affecte(self):
+        affectations = {k: v for k, v in AFFECTATIONS.items() if k != 'TD_C_G3_s4'}
+        planner = RepairPlanner(make_data(), affectations, HIERARCHIE_GROUPES)
+        self.assertEqual(planner.cours_affectes(), ['TD_C_G3_s4'])
+
+
+class TestModeReparation(unittest.TestCase):
+
+    def test_reparation_deplace_uniquement_les_cours_necessaires(self):
+        data = make_data()
+        data['disponibilites_profs'] = {10: {1: [(0, 4)]}}
+        planner = RepairPlanner(data, AFFECTATIONS, HIERARCHIE_GROUPES)
+        _, figes = planner.planifier()
+        model = TimetableModel(data)
+        model.preparer_reparation(AFFECTATIONS, figes)
+        model.build_model()
+        result = model.solve(max_time_seconds=10)
+        self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        assignments = SolutionParser(result, data).parse_assignments()
+        differences = planner.differences(assignments)
+        self.assertEqual([cid for cid, _, _ in differences], ['TD_A_G1_s1'])
+        par_cours = {a.course_id: a for a in assignments}
+        for cid, (creneau, salle, _) in figes.items():
+            self.assertEqual((par_cours[cid].start_slot, par_cours[cid].room_id), (creneau, salle))
+
+    def test_symetries_ignorees_en_reparation(self):
+        data = make_data()
+        data['disponibilites_profs'] = {10: {1: [(0, 4)]}}
+        add_course(data, 'TD_D_G4_s5', ['G4'], allowed_profs=[1])
+        add_course(data, 'TD_D_G4_s6', ['G4'], allowed_profs=[1])
+        affectations = dict(AFFECTATIONS, TD_D_G4_s5=(6, 1, 1), TD_D_G4_s6=(2, 2, 1))
+        planner = RepairPlanner(data, affectations, HIERARCHIE_GROUPES)
+        _, figes = planner.planifier()
+        model = TimetableModel(data)
+        model.preparer_reparation(affectations, figes)
+        model.build_model(casser_symetries=True)
+        self.assertFalse(hasattr(model, 'rapport_symetries'))
+        result = model.solve(max_time_seconds=10)
+        self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        differences = planner.differences(SolutionParser(result, data).parse_assignments())
+        self.assertEqual([cid for cid, _, _ in differences], ['TD_A_G1_s1'])
+
+    def test_cours_figes_sans_variable_superflue(self):
+        data = make_data()
+        model = TimetableModel(data)
+        model.preparer_reparation(AFFECTATIONS, AFFECTATIONS)
+        model.build_model()
+        i = model.registry.index('TD_A_G1_s1')
+        self.assertEqual(list(model.registry.starts(i)), [0])
+        self.assertEqual(list(model.registry.salles(i)), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests pour le module room_candidates.
+"""
+import unittest
+from room_candidates import RoomCandidateSelector
+
+
+def make_data(**extra):
+    """Factory : 1 jour de 4 créneaux, trois salles de capacités 20, 40 et 100."""
+    data = {
+        'jours': 1,
+        'creneaux_par_jour': 4,
+        'nb_slots': 4,
+        'fenetre_midi': [],
+        'salles': {10: 20, 11: 40, 12: 100},
+        'capacites': [20, 40, 100],
+        'profs': ['Prof1'],
+        'cours': [{'id': 'TP_Math_G1A_s1', 'groups': ['G1A'], 'teaching_id': 5, 'type_id': 3}],
+        'duree_cours': {'TP_Math_G1A_s1': 1},
+        'taille_groupes': {'G1A': 18},
+    }
+    data.update(extra)
+    return data
+
+
+class TestRoomCandidateSelector(unittest.TestCase):
+
+    def test_toutes_salles_suffisantes_sans_compatibilite(self):
+        data = make_data()
+        self.assertEqual(RoomCandidateSelector(data).selectionner(data['cours'][0]), ([0, 1, 2], False))
+
+    def test_capacite_filtre_les_salles(self):
+        data = make_data(taille_groupes={'G1A': 30})
+        self.assertEqual(RoomCandidateSelector(data).selectionner(data['cours'][0]), ([1, 2], False))
+
+    def test_teachings_rooms_restreint_les_salles(self):
+        data = make_data(salles_compatibles={(5, 3): [11]})
+        self.assertEqual(RoomCandidateSelector(data).selectionner(data['cours'][0]), ([1], False))
+
+    def test_compatibilite_d_un_autre_type_ignoree(self):
+        data = make_data(salles_compatibles={(5, 2): [11]})
+        self.assertEqual(RoomCandidateSelector(data).selectionner(data['cours'][0])[0], [0, 1, 2])
+
+    def test_salle_indisponible_exclue(self):
+        data = make_data(disponibilites_salles={10: {}})
+        self.assertEqual(RoomCandidateSelector(data).selectionner(data['cours'][0]), ([1, 2], False))
+
+    def test_debordement_si_aucune_salle_assez_grande(self):
+        data = make_data(salles_compatibles={(5, 3): [10, 11]}, taille_groupes={'G1A': 60})
+        self.assertEqual(RoomCandidateSelector(data).selectionner(data['cours'][0]), ([0, 1], True))
+
+
+if __name__ == '__main__':
+    unittest.main()
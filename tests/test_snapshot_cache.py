@@ -0,0 +1,73 @@
+"""
+Tests pour le module snapshot_cache.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from snapshot_cache import SnapshotCache, SnapshotDataProvider
+from test_time_table_model import make_complete_data
+
+
+def make_provider(jeton='a' * 64, donnees=None):
+    provider = MagicMock()
+    provider.jeton_modifications.return_value = jeton
+    provider.load_and_prepare_data.return_value = donnees if donnees is not None else make_complete_data()
+    provider.get_list_room.return_value = ['Amphi A', 'Salle 101']
+    return provider
+
+
+class TestSnapshotCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+        self.cache = SnapshotCache(Path(self.dossier.name))
+
+    def test_second_chargement_lit_l_instantane(self):
+        provider = make_provider()
+        premier = self.cache.charger(provider, 12)
+        second = self.cache.charger(provider, 12)
+        provider.load_and_prepare_data.assert_called_once_with(12)
+        self.assertEqual(premier, second)
+        self.assertEqual(provider.jeton_modifications.call_count, 2)
+
+    def test_jeton_modifie_recharge_et_remplace(self):
+        self.cache.charger(make_provider(jeton='a' * 64), 12)
+        self.cache.charger(make_provider(jeton='b' * 64), 13)
+        provider = make_provider(jeton='c' * 64)
+        self.cache.charger(provider, 12)
+        provider.load_and_prepare_data.assert_called_once_with(12)
+        self.assertEqual([p.stem for p in self.cache._entrees_semaine(12)], [self.cache.cle(12, 'c' * 64)])
+        self.assertEqual(len(self.cache._entrees_semaine(13)), 1)
+
+    def test_jeton_indisponible_charge_sans_instantane(self):
+        provider = make_provider()
+        provider.jeton_modifications.side_effect = RuntimeError("colonne inconnue")
+        self.cache.charger(provider, 12)
+        provider.load_and_prepare_data.assert_called_once_with(12)
+        self.assertEqual(self.cache.stockage.entrees(), [])
+
+    def test_hors_ligne(self):
+        self.assertIsNone(self.cache.hors_ligne(12))
+        donnees = make_complete_data()
+        self.cache.charger(make_provider(donnees=donnees), 12)
+        instantane = self.cache.hors_ligne(12)
+        self.assertEqual(instantane['donnees'], donnees)
+        self.assertEqual(instantane['liste_salles'], ['Amphi A', 'Salle 101'])
+        self.assertIsNone(self.cache.hors_ligne(13))
+
+
+class TestSnapshotDataProvider(unittest.TestCase):
+
+    def test_salles_et_aucune_ecriture(self):
+        provider = SnapshotDataProvider(['Amphi A'])
+        self.assertEqual(provider.get_list_room(), ['Amphi A'])
+        lignes = provider.convert_courses_dict_to_list_insert(
+            [{'name': 'CM_Math_BUT1_s42', 'day': 0, 'start_hour': '08:00', 'room': 'A101'}])
+        self.assertEqual(lignes, [('08:00', '42', 'A101', 'Lundi')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Tests pour le module solution_streaming.
+"""
+import json
+import queue
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from ortools.sat.python import cp_model
+from sqlalchemy import create_engine, text
+
+from course_data_models import CourseAssignment
+from solution_streaming import JsonlSink, QueueSink, StagingTableSink
+from time_table_model import TimetableModel
+from test_time_table_model import make_complete_data
+
+
+def make_assignment(cid='CM_Test_G1_s1', slot=0):
+    return CourseAssignment(course_id=cid, start_slot=slot, room_id=0, teacher_id=0,
+                            room_name='Salle1', teacher_name='Prof1', duration=1)
+
+
+class SinkEnregistreur:
+    """Destinataire de test qui conserve toutes les publications."""
+
+    def __init__(self):
+        self.publications = []
+        self.ferme = False
+
+    def publier(self, numero, objectif, temps, assignments):
+        self.publications.append((numero, objectif, assignments))
+
+    def fermer(self):
+        self.ferme = True
+
+
+class SinkDefaillant(SinkEnregistreur):
+
+    def publier(self, numero, objectif, temps, assignments):
+        raise RuntimeError("panne")
+
+
+class TestSolveAvecSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.model = TimetableModel(make_complete_data())
+        self.model.build_model()
+
+    def test_solutions_publiees_et_decodees(self):
+        sink = SinkEnregistreur()
+        resultat = self.model.solve(max_time_seconds=10, nb_workers=1, sinks=[sink])
+        self.assertIn(resultat['status'], (cp_model.OPTIMAL, cp_model.FEASIBLE))
+        self.assertGreaterEqual(len(sink.publications), 1)
+        numero, _, assignments = sink.publications[-1]
+        self.assertEqual(numero, len(sink.publications))
+        self.assertEqual([a.course_id for a in assignments], ['CM_Test_G1_s1'])
+        self.assertTrue(sink.ferme)
+
+    def test_sink_defaillant_n_interrompt_pas_la_resolution(self):
+        defaillant, sain = SinkDefaillant(), SinkEnregistreur()
+        resultat = self.model.solve(max_time_seconds=10, nb_workers=1, sinks=[defaillant, sain])
+        self.assertIn(resultat['status'], (cp_model.OPTIMAL, cp_model.FEASIBLE))
+        self.assertGreaterEqual(len(sain.publications), 1)
+        self.assertTrue(defaillant.ferme)
+
+
+class TestJsonlSink(unittest.TestCase):
+
+    def test_une_ligne_par_solution(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = Path(dossier) / "flux" / "solutions.jsonl"
+            sink = JsonlSink(chemin)
+            sink.publier(1, 42.0, 0.5, [make_assignment()])
+            sink.publier(2, 10.0, 1.0, [make_assignment(slot=3)])
+            sink.fermer()
+            lignes = [json.loads(l) for l in chemin.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([l['solution'] for l in lignes], [1, 2])
+        self.assertEqual(lignes[1]['objectif'], 10.0)
+        self.assertEqual(lignes[1]['affectations'][0]['start_slot'], 3)
+
+
+class TestStagingTableSink(unittest.TestCase):
+
+    def setUp(self):
+        # Base fichier : le thread d'écriture et le test partagent les mêmes données
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        self.engine = create_engine(f"sqlite:///{Path(dossier.name) / 'staging.db'}")
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connexion:
+            connexion.execute(text(
+                "CREATE TABLE edt_slot_staging (run_id TEXT, week_id INT, solution_number INT, objective REAL, "
+                "course_id TEXT, start_slot INT, room_id TEXT, teacher TEXT, duration INT)"))
+
+    def test_remplace_la_solution_precedente_de_l_execution(self):
+        sink = StagingTableSink(self.engine, week_id=7, run_id="run1")
+        autre = StagingTableSink(self.engine, week_id=7, run_id="run2")
+        autre.publier(1, 5.0, 0.1, [make_assignment()])
+        sink.publier(1, 50.0, 0.1, [make_assignment(), make_assignment('TD_X_G1_s1')])
+        sink.publier(2, 20.0, 0.2, [make_assignment(slot=4)])
+        autre.fermer()
+        sink.fermer()
+
+        df = pd.read_sql("SELECT * FROM edt_slot_staging WHERE run_id = 'run1'", self.engine)
+        self.assertEqual(len(df), 1)
+        self.assertEqual(int(df['solution_number'][0]), 2)
+        self.assertEqual(int(df['start_slot'][0]), 4)
+        self.assertEqual(pd.read_sql("SELECT COUNT(*) AS n FROM edt_slot_staging", self.engine)['n'][0], 2)
+
+    def test_publier_ne_bloque_pas_et_garde_la_plus_recente(self):
+        sink = StagingTableSink(self.engine, week_id=7, run_id="run1")
+        liberation = threading.Event()
+        ecrites = []
+
+        def ecrire_lentement(numero, objectif, assignments):
+            liberation.wait(5)
+            ecrites.append(numero)
+
+        sink._ecrire = ecrire_lentement
+        debut = time.perf_counter()
+        for numero in (1, 2, 3):
+            sink.publier(numero, 10.0 - numero, 0.1, [make_assignment()])
+        self.assertLess(time.perf_counter() - debut, 1.0)
+        liberation.set()
+        sink.fermer()
+        self.assertEqual(ecrites[-1], 3)
+        self.assertLessEqual(len(ecrites), 2)
+        self.assertFalse(sink._ecrivain.is_alive())
+
+
+class TestQueueSink(unittest.TestCase):
+
+    def test_conserve_la_solution_la_plus_recente(self):
+        sink = QueueSink()
+        sink.publier(1, 30.0, 0.1, [make_assignment()])
+        sink.publier(2, 20.0, 0.2, [make_assignment(slot=2)])
+        numero, objectif, assignments = sink.file.get_nowait()
+        self.assertEqual((numero, objectif), (2, 20.0))
+        self.assertEqual(assignments[0].start_slot, 2)
+        self.assertTrue(sink.file.empty())
+
+    def test_file_fournie_non_bornee(self):
+        file = queue.Queue()
+        sink = QueueSink(file)
+        for n in range(3):
+            sink.publier(n, float(n), 0.0, [])
+        self.assertEqual(file.qsize(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -203,7 +203,7 @@ def test_display_calls_console_and_graphical():
 
     # Vérifie que les deux méthodes ont été appelées
     visualizer._print_schedule_to_console.assert_called_once()
-    visualizer._generate_graphical_schedule.assert_called_once_with(data_provider, "S222")
+    visualizer._generate_graphical_schedule.assert_called_once_with(data_provider, "S222", False)
 
 
 def test_generate_graphical_schedule_handles_exception(caplog):
@@ -277,4 +277,12 @@ def test_generate_graphical_schedule_success():
     # Vérifie les appels
     data_provider.get_list_room.assert_called_once()
     data_provider.convert_courses_dict_to_list_insert.assert_called_once()
+    data_provider.replace_week_rows.assert_not_called()
     visualizer._graphical_generator.generate_schedules.assert_called_once()
+
+    # Réparation : les lignes de la semaine sont remplacées au lieu d'être complétées
+    data_provider.reset_mock()
+    data_provider.courses_dict_to_rows.return_value = []
+    visualizer._generate_graphical_schedule(data_provider, "S222", remplacer_semaine=True)
+    data_provider.replace_week_rows.assert_called_once_with("S222", [])
+    data_provider.convert_courses_dict_to_list_insert.assert_not_called()
@@ -0,0 +1,100 @@
+"""
+Tests pour le module solver_profiles.
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ortools.sat.python import cp_model
+
+import solver_profiles
+from solver_profiles import PROFILS, SolverProfile, charger_profil, nombre_coeurs_utilisables
+
+
+class TestNombreCoeurs(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+        self.racine = Path(self.dossier.name)
+
+    def _patch_cgroup(self, v2=None, quota_v1=None, periode_v1=None):
+        cpu_max = self.racine / "cpu.max"
+        quota = self.racine / "cfs_quota_us"
+        periode = self.racine / "cfs_period_us"
+        if v2 is not None:
+            cpu_max.write_text(v2)
+        if quota_v1 is not None:
+            quota.write_text(quota_v1)
+            periode.write_text(periode_v1)
+        return patch.multiple(solver_profiles, CGROUP_V2_CPU_MAX=cpu_max,
+                              CGROUP_V1_QUOTA=quota, CGROUP_V1_PERIOD=periode)
+
+    def test_quota_cgroup_v2(self):
+        with self._patch_cgroup(v2="150000 100000\n"), patch('os.sched_getaffinity', return_value=set(range(32))):
+            self.assertEqual(nombre_coeurs_utilisables(), 2)
+
+    def test_cgroup_v2_illimite(self):
+        with self._patch_cgroup(v2="max 100000\n"), patch('os.sched_getaffinity', return_value=set(range(6))):
+            self.assertEqual(nombre_coeurs_utilisables(), 6)
+
+    def test_quota_cgroup_v1(self):
+        with self._patch_cgroup(quota_v1="400000", periode_v1="100000"), \
+                patch('os.sched_getaffinity', return_value=set(range(32))):
+            self.assertEqual(nombre_coeurs_utilisables(), 4)
+
+    def test_affinite_plus_petite_que_le_quota(self):
+        with self._patch_cgroup(quota_v1="-1", periode_v1="100000"), \
+                patch('os.sched_getaffinity', return_value={0, 1, 2}):
+            self.assertEqual(nombre_coeurs_utilisables(), 3)
+
+
+class TestSolverProfile(unittest.TestCase):
+
+    def test_profils_nommes(self):
+        self.assertEqual(set(PROFILS), {'fast-feasible', 'balanced', 'optimal'})
+
+    def test_appliquer(self):
+        solver = cp_model.CpSolver()
+        SolverProfile('test', max_time_seconds=12, nb_workers=3, relative_gap_limit=0.1,
+                      linearization_level=2, max_deterministic_time=5, random_seed=7).appliquer(solver)
+        p = solver.parameters
+        self.assertEqual((p.max_time_in_seconds, p.num_search_workers, p.linearization_level, p.random_seed),
+                         (12, 3, 2, 7))
+        self.assertAlmostEqual(p.relative_gap_limit, 0.1)
+        self.assertEqual(p.max_deterministic_time, 5)
+
+    def test_avec_ignore_none(self):
+        profil = PROFILS['balanced'].avec(max_time_seconds=None, nb_workers=4)
+        self.assertEqual((profil.max_time_seconds, profil.workers()), (300, 4))
+
+    def test_workers_par_defaut(self):
+        with patch('solver_profiles.nombre_coeurs_utilisables', return_value=5):
+            self.assertEqual(PROFILS['optimal'].workers(), 5)
+
+
+class TestChargerProfil(unittest.TestCase):
+
+    def test_defaut(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(charger_profil().nom, 'balanced')
+
+    def test_variables_environnement(self):
+        env = {'SOLVER_PROFILE': 'fast-feasible', 'SOLVER_WORKERS': '2', 'SOLVER_MAX_TIME': '30'}
+        with patch.dict(os.environ, env, clear=True):
+            profil = charger_profil()
+        self.assertEqual((profil.nom, profil.workers(), profil.max_time_seconds), ('fast-feasible', 2, 30.0))
+
+    def test_nom_explicite_prioritaire(self):
+        with patch.dict(os.environ, {'SOLVER_PROFILE': 'fast-feasible'}, clear=True):
+            self.assertEqual(charger_profil('optimal').nom, 'optimal')
+
+    def test_profil_inconnu(self):
+        with self.assertRaises(ValueError):
+            charger_profil('turbo')
+
+
+if __name__ == '__main__':
+    unittest.main()
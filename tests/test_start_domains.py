@@ -0,0 +1,80 @@
+"""
+Tests pour le module start_domains.
+"""
+import unittest
+from start_domains import StartDomainEngine
+
+
+def make_data(**extra):
+    """Factory : 2 jours de 4 créneaux, pause midi au décalage 2."""
+    data = {
+        'jours': 2,
+        'creneaux_par_jour': 4,
+        'nb_slots': 8,
+        'fenetre_midi': [2],
+        'salles': {'S1': 30},
+        'profs': ['Prof1', 'Prof2'],
+        'cours': [{'id': 'C1', 'groups': ['G1'], 'allowed_prof_indices': [0, 1]}],
+        'duree_cours': {'C1': 1},
+    }
+    data.update(extra)
+    return data
+
+
+class TestMasqueDuree(unittest.TestCase):
+
+    def test_duree_un_exclut_midi(self):
+        engine = StartDomainEngine(make_data())
+        self.assertEqual(engine.masque_duree(1).tolist(), [True, True, False, True] * 2)
+
+    def test_duree_deux_exclut_midi_et_fin_de_journee(self):
+        engine = StartDomainEngine(make_data())
+        self.assertEqual(engine.masque_duree(2).tolist(), [True, False, False, False] * 2)
+
+    def test_masque_mis_en_cache(self):
+        engine = StartDomainEngine(make_data())
+        self.assertIs(engine.masque_duree(1), engine.masque_duree(1))
+
+    def test_temps_utiles(self):
+        engine = StartDomainEngine(make_data())
+        self.assertEqual(engine.temps_utiles(), [0, 1, 3, 4, 5, 7])
+
+
+class TestDepartsAutorises(unittest.TestCase):
+
+    def test_sans_disponibilites(self):
+        data = make_data()
+        engine = StartDomainEngine(data)
+        self.assertEqual(engine.departs_autorises(data['cours'][0]), [0, 1, 3, 4, 5, 7])
+
+    def test_disponibilites_groupes(self):
+        data = make_data(map_cours_groupes={'C1': ['G1']},
+                         disponibilites_groupes={'G1': {1: [(0, 2)]}})
+        engine = StartDomainEngine(data)
+        self.assertEqual(engine.departs_autorises(data['cours'][0]), [4, 5])
+
+    def test_union_des_professeurs_autorises(self):
+        data = make_data(prof_to_teacher_id={'Prof1': 1, 'Prof2': 2},
+                         disponibilites_profs={1: {0: [(0, 1)]}, 2: {1: [(3, 4)]}})
+        engine = StartDomainEngine(data)
+        self.assertEqual(engine.departs_autorises(data['cours'][0]), [0, 7])
+
+    def test_disponibilites_salles(self):
+        data = make_data(disponibilites_salles={'S1': {0: [(0, 4)]}})
+        engine = StartDomainEngine(data)
+        self.assertEqual(engine.departs_autorises(data['cours'][0]), [0, 1, 3])
+
+    def test_horaires_obligatoires(self):
+        data = make_data(cours=[{'id': 'CM_Math_G1_s5', 'groups': ['G1']}],
+                         duree_cours={'CM_Math_G1_s5': 1},
+                         obligations_slots={5: {1: [(3, 4)]}})
+        engine = StartDomainEngine(data)
+        self.assertEqual(engine.departs_autorises(data['cours'][0]), [7])
+
+    def test_calculer(self):
+        data = make_data()
+        self.assertEqual(StartDomainEngine(data).calculer(), {'C1': [0, 1, 3, 4, 5, 7]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests pour le module symmetry_breaking.
+"""
+import unittest
+from symmetry_breaking import SymmetryDetector
+
+
+def make_data(**extra):
+    """Factory : 1 jour de 4 créneaux, deux TD identiques et un TD d'un autre groupe."""
+    data = {
+        'jours': 1,
+        'creneaux_par_jour': 4,
+        'nb_slots': 4,
+        'fenetre_midi': [],
+        'salles': {1: 30, 2: 30, 3: 100},
+        'profs': ['Prof1'],
+        'cours': [
+            {'id': 'TD_R1.01_G1_s1', 'groups': ['G1'], 'allowed_prof_indices': [0]},
+            {'id': 'TD_R1.01_G1_s2', 'groups': ['G1'], 'allowed_prof_indices': [0]},
+            {'id': 'TD_R1.01_G2_s3', 'groups': ['G2'], 'allowed_prof_indices': [0]},
+        ],
+        'duree_cours': {'TD_R1.01_G1_s1': 1, 'TD_R1.01_G1_s2': 1, 'TD_R1.01_G2_s3': 1},
+    }
+    data.update(extra)
+    return data
+
+
+class TestClassesCours(unittest.TestCase):
+
+    def test_seances_identiques_regroupees(self):
+        self.assertEqual(SymmetryDetector(make_data()).classes_cours(), [['TD_R1.01_G1_s1', 'TD_R1.01_G1_s2']])
+
+    def test_duree_differente_separe(self):
+        data = make_data()
+        data['duree_cours']['TD_R1.01_G1_s2'] = 2
+        self.assertEqual(SymmetryDetector(data).classes_cours(), [])
+
+    def test_professeurs_differents_separent(self):
+        data = make_data(profs=['Prof1', 'Prof2'])
+        data['cours'][1]['allowed_prof_indices'] = [1]
+        self.assertEqual(SymmetryDetector(data).classes_cours(), [])
+
+    def test_horaire_obligatoire_separe(self):
+        data = make_data(obligations_slots={2: {0: [(1, 2)]}})
+        self.assertEqual(SymmetryDetector(data).classes_cours(), [])
+
+
+class TestClassesSalles(unittest.TestCase):
+
+    def test_salles_de_meme_capacite(self):
+        self.assertEqual(SymmetryDetector(make_data()).classes_salles(), [[0, 1]])
+
+    def test_disponibilites_differentes_separent(self):
+        data = make_data(disponibilites_salles={1: {0: [(0, 2)]}})
+        self.assertEqual(SymmetryDetector(data).classes_salles(), [])
+
+    def test_compatibilites_differentes_separent(self):
+        data = make_data(salles_compatibles={(5, 2): [1]})
+        self.assertEqual(SymmetryDetector(data).classes_salles(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
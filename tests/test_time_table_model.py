@@ -5,7 +5,7 @@ Refactorisé pour éliminer la duplication de code.
 import unittest
 from unittest.mock import MagicMock, patch
 from ortools.sat.python import cp_model
-from time_table_model import TimetableModel
+from time_table_model import TimetableModel, MODE_BOOLEEN, MODE_INTERVALLES
 
 
 def make_base_data(jours=1, creneaux=4, fenetre_midi=None, salles=None, profs=None):
@@ -93,20 +93,36 @@ class TestCreateDecisionVariables(unittest.TestCase):
 
     def test_creates_occupe_variables(self):
         model = self._create_model_with_vars()
-        for t in range(self.data['nb_slots']):
+        for t in model.temps_utiles:
             self.assertIn(('C1', t), model._vars['occupe'])
 
-    def test_start_none_when_overlaps_midi(self):
-        """Un cours qui chevauche midi ne doit pas avoir de start valide."""
+    def test_no_occupe_variable_during_midi(self):
+        """Aucun départ ne couvre la pause midi : pas de variable d'occupation."""
+        model = self._create_model_with_vars()
+        for jour in range(self.data['jours']):
+            t = jour * self.data['creneaux_par_jour'] + 2
+            self.assertNotIn(('C1', t), model._vars['occupe'])
+
+    def test_start_absent_when_overlaps_midi(self):
+        """Un cours qui chevauche midi ne doit pas avoir de variable de start."""
         self.data['duree_cours'] = {'C1': 2}
         model = self._create_model_with_vars()
-        self.assertIsNone(model._vars['start'][('C1', 1)])
+        self.assertNotIn(('C1', 1), model._vars['start'])
 
-    def test_start_none_when_exceeds_day(self):
-        """Un cours qui dépasse la journée ne doit pas avoir de start valide."""
+    def test_start_absent_when_exceeds_day(self):
+        """Un cours qui dépasse la journée ne doit pas avoir de variable de start."""
         self.data['duree_cours'] = {'C1': 2}
         model = self._create_model_with_vars()
-        self.assertIsNone(model._vars['start'][('C1', 3)])
+        self.assertNotIn(('C1', 3), model._vars['start'])
+
+    def test_start_absent_when_prof_unavailable(self):
+        """Les disponibilités du seul professeur autorisé réduisent le domaine de départ."""
+        self.data['prof_to_teacher_id'] = {self.data['profs'][0]: 7}
+        self.data['disponibilites_profs'] = {7: {0: [(0, 1)]}}
+        self.data['cours'][0]['allowed_prof_indices'] = [0]
+        model = self._create_model_with_vars()
+        starts = sorted(s for (cid, s) in model._vars['start'])
+        self.assertEqual(starts, [0])
 
 
 class TestContrainteOrdre(unittest.TestCase):
@@ -138,9 +154,29 @@ class TestContrainteOrdre(unittest.TestCase):
         ordres = self._get_ordres()
         self.assertTrue(any('TD_Maths' in a and 'TP_Maths' in b for a, b in ordres))
 
+    def test_promotions_separees(self):
+        """Une même matière dans deux promotions ne crée pas d'ordre croisé."""
+        data = make_base_data(creneaux=8)
+        add_course(data, 'CM_Maths_BUT1_s1', ['BUT1'])
+        add_course(data, 'TD_Maths_G4_s2', ['G4'])
+        data['cours'][0]['promotion'] = 'BUT1'
+        data['cours'][1]['promotion'] = 'BUT2'
+        model = TimetableModel(data)
+        model.contrainte_ordre_cm_td_tp(data)
+        self.assertEqual(model._ordres_a_forcer, [])
+
+    def test_plusieurs_cm_tous_avant_td(self):
+        data = make_base_data(creneaux=8)
+        for cid in ['CM_Maths_BUT1_s1', 'CM_Maths_BUT1_s4', 'TD_Maths_G1_s2']:
+            add_course(data, cid, ['G1'])
+        model = TimetableModel(data)
+        model.contrainte_ordre_cm_td_tp(data)
+        self.assertIn(('CM_Maths_BUT1_s1', 'TD_Maths_G1_s2'), model._ordres_a_forcer)
+        self.assertIn(('CM_Maths_BUT1_s4', 'TD_Maths_G1_s2'), model._ordres_a_forcer)
+
 
 class TestContrainteHierarchique(unittest.TestCase):
-    """Tests pour contrainte_hierarchique."""
+    """Tests pour la hiérarchie, intégrée à contrainte_etudiant (fermeture par ancêtres)."""
 
     def test_hierarchie_g1a_g1(self):
         data = make_base_data()
@@ -149,7 +185,20 @@ class TestContrainteHierarchique(unittest.TestCase):
         
         model = TimetableModel(data)
         model._create_decision_variables()
-        model.contrainte_hierarchique(data)  # Ne doit pas lever d'exception
+        avant = len(model.model.Proto().constraints)
+        model.contrainte_etudiant(data)
+        # Une seule feuille (G1A, qui suit aussi C1) : une contrainte par créneau
+        self.assertEqual(len(model.model.Proto().constraints) - avant, data['nb_slots'])
+
+    def test_arbre_fourni_par_les_donnees(self):
+        data = make_base_data(creneaux=1)
+        add_course(data, 'CM_X_BUT1_s1', ['BUT1'])
+        add_course(data, 'TD_X_G9_s2', ['G9'])
+        data['hierarchie_groupes'] = {'G9': 'BUT1'}
+        model = TimetableModel(data)
+        model.build_model()
+        solver = cp_model.CpSolver()
+        self.assertEqual(solver.Solve(model.model), cp_model.INFEASIBLE)
 
 
 class TestContrainteEtudiant(unittest.TestCase):
@@ -187,6 +236,57 @@ class TestPenaliserFinTardive(unittest.TestCase):
         self.assertGreater(len(model.penalites_fin_tardive), 0)
 
 
+class TestPenaliserTrous(unittest.TestCase):
+    """Tests pour penaliser_trous (trous des journées des groupes et professeurs)."""
+
+    def make_data(self, fenetre_midi=None, duration=1):
+        data = make_complete_data()
+        data.update(make_base_data(creneaux=8, fenetre_midi=fenetre_midi))
+        data['capacites'] = [50]
+        add_course(data, 'TD_A_G1_s1', ['G1'], duration=duration, allowed_profs=[0])
+        add_course(data, 'TD_B_G1_s2', ['G1'], duration=duration, allowed_profs=[0])
+        return data
+
+    def resoudre(self, model):
+        solver = cp_model.CpSolver()
+        solver.parameters.num_search_workers = 1
+        status = solver.Solve(model.model)
+        self.assertEqual(status, cp_model.OPTIMAL)
+        return solver
+
+    def test_journee_compacte(self):
+        for mode in (MODE_BOOLEEN, MODE_INTERVALLES):
+            with self.subTest(mode=mode):
+                model = TimetableModel(self.make_data(), mode=mode)
+                model.build_model(trous=True)
+                solver = self.resoudre(model)
+                debuts = [solver.Value(model.registry.debut(i)) for i in range(2)]
+                self.assertEqual(abs(debuts[0] - debuts[1]), 1)
+                self.assertEqual(solver.ObjectiveValue(), 0)
+
+    def test_trou_force_penalise_groupe_et_professeur(self):
+        model = TimetableModel(self.make_data())
+        model.build_model(trous=True, poids_trous=7)
+        model.model.Add(model.registry.debut(0) == 0)
+        model.model.Add(model.registry.debut(1) == 3)
+        solver = self.resoudre(model)
+        self.assertEqual(model.objectifs.valeur('trous_groupes', solver), 2)
+        self.assertEqual(model.objectifs.valeur('trous_profs', solver), 2)
+        self.assertEqual(solver.ObjectiveValue(), 4 * 7)
+
+    def test_pause_midi_non_comptee(self):
+        model = TimetableModel(self.make_data(fenetre_midi=[3, 4], duration=3))
+        model.build_model(trous=True)
+        solver = self.resoudre(model)
+        self.assertEqual(solver.ObjectiveValue(), 0)
+
+    def test_desactive_par_defaut(self):
+        model = TimetableModel(self.make_data())
+        model.build_model()
+        self.assertEqual(model.objectifs.termes('trous_groupes'), [])
+        self.assertNotIn('trous_groupes', model.poids_objectifs)
+
+
 class TestSolve(unittest.TestCase):
     """Tests pour la méthode solve."""
 
@@ -208,6 +308,15 @@ class TestSolve(unittest.TestCase):
         result = model.solve(max_time_seconds=10)
         self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
 
+    def test_solve_avec_profil(self):
+        from solver_profiles import PROFILS
+        model = TimetableModel(self.data)
+        model.build_model()
+        result = model.solve(profil=PROFILS['fast-feasible'].avec(max_time_seconds=10, nb_workers=1))
+        self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        self.assertEqual(result['profil'], 'fast-feasible')
+        self.assertEqual(result['solver'].parameters.num_search_workers, 1)
+
 
 class TestDefineObjectiveFunction(unittest.TestCase):
     """Tests pour _define_objective_function."""
@@ -215,7 +324,7 @@ class TestDefineObjectiveFunction(unittest.TestCase):
     def test_cree_penalites_capacite(self):
         data = make_base_data(salles={'Salle1': 20, 'Salle2': 50})
         data['capacites'] = [20, 50]
-        add_course(data, 'C1', ['G1'], group_size=30)  # Trop grand pour Salle1
+        add_course(data, 'C1', ['G1'], group_size=60)  # Trop grand pour toutes les salles : débordement
         
         model = TimetableModel(data)
         model._create_decision_variables()
@@ -223,7 +332,21 @@ class TestDefineObjectiveFunction(unittest.TestCase):
         model._define_objective_function()
         
         self.assertIn('penalites_capacite', model._vars)
-        self.assertGreater(len(model._vars['penalites_capacite']), 0)
+        self.assertEqual(len(model._vars['penalites_capacite']), 2)
+
+    def test_salle_trop_petite_exclue_des_candidates(self):
+        data = make_base_data(salles={'Salle1': 20, 'Salle2': 50})
+        data['capacites'] = [20, 50]
+        add_course(data, 'C1', ['G1'], group_size=30)  # Trop grand pour Salle1 uniquement
+
+        model = TimetableModel(data)
+        model._create_decision_variables()
+        model.penalites_fin_tardive = []
+        model._define_objective_function()
+
+        self.assertNotIn(('C1', 0), model._vars['y_salle'])
+        self.assertIn(('C1', 1), model._vars['y_salle'])
+        self.assertEqual(model._vars['penalites_capacite'], [])
 
 
 class TestAddLinkingConstraints(unittest.TestCase):
@@ -238,6 +361,129 @@ class TestAddLinkingConstraints(unittest.TestCase):
         model._add_linking_constraints()  # Ne doit pas lever d'exception
 
 
+class TestRegistreVariables(unittest.TestCase):
+    """Tests pour l'accès aux variables via le registre indexé."""
+
+    def test_prefixes_proches_resolus_separement(self):
+        """Les cours ..._s7 et ..._s70 ne partagent pas leurs variables de début."""
+        data = make_complete_data()
+        data['cours'] = []
+        data['map_groupe_cours'] = {}
+        data['salles'] = {'Salle1': 50, 'Salle2': 50}
+        data['capacites'] = [50, 50]
+        add_course(data, 'TD_X_G1_s7', ['G1'])
+        add_course(data, 'TD_X_G2_s70', ['G2'])
+        model = TimetableModel(data)
+        model.build_model()
+        result = model.solve(max_time_seconds=10)
+        self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        solver, registry = result['solver'], result['registry']
+        for cid in ('TD_X_G1_s7', 'TD_X_G2_s70'):
+            starts = registry.starts(registry.index(cid))
+            self.assertEqual(sum(solver.Value(v) for v in starts.values()), 1)
+
+    def test_parser_utilise_registre(self):
+        from solution_parser import SolutionParser
+        data = make_complete_data()
+        model = TimetableModel(data)
+        model.build_model()
+        result = model.solve(max_time_seconds=10)
+        assignments = SolutionParser(result, data).parse_assignments()
+        self.assertEqual(len(assignments), 1)
+        self.assertEqual(assignments[0].course_id, 'CM_Test_G1_s1')
+
+
+class TestVariablesProfesseurs(unittest.TestCase):
+    """Tests pour la création des variables de professeur restreintes aux professeurs autorisés."""
+
+    def _data(self):
+        data = make_complete_data()
+        data['cours'] = []
+        data['map_groupe_cours'] = {}
+        data['profs'] = ['Prof1', 'Prof2', 'Prof3']
+        data['salles'] = {'Salle1': 50, 'Salle2': 50}
+        data['capacites'] = [50, 50]
+        return data
+
+    def test_variables_uniquement_pour_professeurs_autorises(self):
+        data = self._data()
+        add_course(data, 'C1', ['G1'], allowed_profs=[0, 2])
+        model = TimetableModel(data)
+        model._create_decision_variables()
+        self.assertEqual(sorted(k for (cid, k) in model._vars['z_prof']), [0, 2])
+
+    def test_professeur_unique_sans_variable(self):
+        data = self._data()
+        add_course(data, 'C1', ['G1'], allowed_profs=[1])
+        model = TimetableModel(data)
+        model._create_decision_variables()
+        self.assertEqual(model._vars['z_prof'], {})
+        self.assertEqual(model.registry.prof_fixe(model.registry.index('C1')), 1)
+
+    def test_professeur_unique_partage_infaisable(self):
+        """Deux cours au même professeur imposé ne peuvent pas se chevaucher."""
+        data = self._data()
+        data.update({'creneaux_par_jour': 1, 'nb_slots': 1, 'slots': [(0, 0)]})
+        add_course(data, 'TD_X_G1_s1', ['G1'], allowed_profs=[0])
+        add_course(data, 'TD_X_G2_s2', ['G2'], allowed_profs=[0])
+        for mode in (MODE_BOOLEEN, MODE_INTERVALLES):
+            with self.subTest(mode=mode):
+                model = TimetableModel(data, mode=mode)
+                model.build_model()
+                self.assertEqual(model.solve(max_time_seconds=10)['status'], cp_model.INFEASIBLE)
+
+    def test_parser_resout_professeur_impose(self):
+        from solution_parser import SolutionParser
+        data = self._data()
+        add_course(data, 'TD_X_G1_s1', ['G1'], allowed_profs=[2])
+        model = TimetableModel(data)
+        model.build_model()
+        result = model.solve(max_time_seconds=10)
+        assignments = SolutionParser(result, data).parse_assignments()
+        self.assertEqual(len(assignments), 1)
+        self.assertEqual(assignments[0].teacher_name, 'Prof3')
+
+
+class TestCasserSymetries(unittest.TestCase):
+    """Tests pour l'étape optionnelle de cassage de symétries."""
+
+    def _data(self):
+        data = make_complete_data()
+        data['cours'] = []
+        data['map_groupe_cours'] = {}
+        data['salles'] = {'Salle1': 50, 'Salle2': 50}
+        data['capacites'] = [50, 50]
+        add_course(data, 'TD_X_G1_s1', ['G1'], allowed_profs=[0])
+        add_course(data, 'TD_X_G1_s2', ['G1'], allowed_profs=[0])
+        add_course(data, 'TD_X_G2_s3', ['G2'], allowed_profs=[0])
+        return data
+
+    def test_etape_desactivee_par_defaut(self):
+        model = TimetableModel(self._data())
+        model.build_model()
+        self.assertFalse(hasattr(model, 'rapport_symetries'))
+
+    def test_rapport_des_classes(self):
+        model = TimetableModel(self._data())
+        model.build_model(casser_symetries=True)
+        self.assertEqual(model.rapport_symetries, {
+            'classes_cours': 1, 'cours_symetriques': 2, 'classes_salles': 1, 'salles_symetriques': 2})
+
+    def test_ordre_des_seances_et_salles(self):
+        data = self._data()
+        for mode in (MODE_BOOLEEN, MODE_INTERVALLES):
+            with self.subTest(mode=mode):
+                model = TimetableModel(data, mode=mode)
+                model.build_model(casser_symetries=True)
+                result = model.solve(max_time_seconds=10)
+                self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+                solver, reg = result['solver'], result['registry']
+                debut = lambda cid: solver.Value(reg.debut(reg.index(cid)))
+                self.assertLess(debut('TD_X_G1_s1'), debut('TD_X_G1_s2'))
+                # Le premier cours du registre utilise forcément la première salle de la classe
+                self.assertEqual(solver.Value(reg.salles(reg.index('TD_X_G1_s1'))[0]), 1)
+
+
 class TestContrainteDisponibilites(unittest.TestCase):
     """Tests pour les contraintes de disponibilités."""
 
@@ -294,6 +540,31 @@ class TestAppliquerOrdreCmTdTp(unittest.TestCase):
         model.contrainte_ordre_cm_td_tp(data)
         model.appliquer_ordre_cm_td_tp()
 
+    def test_une_inegalite_par_paire(self):
+        data = make_base_data(creneaux=8)
+        for cid in ['CM_Maths_G1_s1', 'TD_Maths_G1_s2', 'TP_Maths_G1A_s3']:
+            add_course(data, cid, ['G1'])
+        model = TimetableModel(data)
+        model._create_decision_variables()
+        model.contrainte_ordre_cm_td_tp(data)
+        avant = len(model.model.Proto().constraints)
+        model.appliquer_ordre_cm_td_tp()
+        self.assertEqual(len(model.model.Proto().constraints) - avant, len(model._ordres_a_forcer))
+
+    def test_ordre_respecte_a_la_resolution(self):
+        data = make_complete_data()
+        data['cours'], data['map_groupe_cours'] = [], {}
+        data['creneaux_par_jour'], data['nb_slots'] = 6, 6
+        data['slots'] = [(0, o) for o in range(6)]
+        add_course(data, 'TD_Maths_G1_s2', ['G1'])
+        add_course(data, 'CM_Maths_BUT1_s1', ['BUT1'])
+        model = TimetableModel(data)
+        model.build_model()
+        result = model.solve(max_time_seconds=10)
+        solver = result['solver']
+        self.assertLess(solver.Value(model._vars['debut']['CM_Maths_BUT1_s1']),
+                        solver.Value(model._vars['debut']['TD_Maths_G1_s2']))
+
     def test_sans_ordres_a_forcer(self):
         data = make_base_data()
         model = TimetableModel(data)
@@ -301,5 +572,116 @@ class TestAppliquerOrdreCmTdTp(unittest.TestCase):
         model.appliquer_ordre_cm_td_tp()  # Ne doit pas lever d'exception
 
 
+class TestModeIntervalles(unittest.TestCase):
+    """Tests pour la formulation intervalles + NoOverlap."""
+
+    def _make_data(self):
+        data = make_complete_data()
+        data['creneaux_par_jour'] = 3
+        data['slots'] = [(0, o) for o in range(3)]
+        data['nb_slots'] = 3
+        data['salles'] = {'Salle1': 50, 'Salle2': 50}
+        data['capacites'] = [50, 50]
+        data['profs'] = ['Prof1', 'Prof2']
+        add_course(data, 'TD_Test_G1A_s2', ['G1A'], duration=2, allowed_profs=[0])
+        add_course(data, 'TD_Autre_G2_s3', ['G2'], duration=2, allowed_profs=[0, 1])
+        return data
+
+    def _solve(self, data, mode):
+        model = TimetableModel(data, mode=mode)
+        model.build_model()
+        solver = cp_model.CpSolver()
+        status = solver.Solve(model.model)
+        return model, solver, status
+
+    def test_mode_inconnu_leve_erreur(self):
+        with self.assertRaises(ValueError):
+            TimetableModel(make_base_data(), mode="inconnu")
+
+    def test_cree_intervalles_sans_occupe(self):
+        model = TimetableModel(self._make_data(), mode=MODE_INTERVALLES)
+        model._create_decision_variables()
+        self.assertEqual(model._vars['occupe'], {})
+        self.assertIn('CM_Test_G1_s1', model._vars['intervalle'])
+        self.assertIn(('TD_Autre_G2_s3', 1), model._vars['intervalle_prof'])
+        self.assertNotIn(('TD_Test_G1A_s2', 1), model._vars['intervalle_prof'])
+
+    def test_meme_statut_et_objectif_que_booleen(self):
+        data = self._make_data()
+        _, solver_b, status_b = self._solve(data, MODE_BOOLEEN)
+        _, solver_i, status_i = self._solve(data, MODE_INTERVALLES)
+        self.assertEqual(status_b, status_i)
+        self.assertEqual(solver_b.ObjectiveValue(), solver_i.ObjectiveValue())
+
+    def test_hierarchie_et_prof_sans_chevauchement(self):
+        model, solver, status = self._solve(self._make_data(), MODE_INTERVALLES)
+        self.assertIn(status, [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        debut = {cid: solver.Value(v) for cid, v in model._vars['debut'].items()}
+        # G1A hérite des cours de G1 : le CM et le TD du sous-groupe ne se chevauchent pas
+        self.assertTrue(debut['CM_Test_G1_s1'] + 1 <= debut['TD_Test_G1A_s2']
+                        or debut['TD_Test_G1A_s2'] + 2 <= debut['CM_Test_G1_s1'])
+
+    def test_trop_de_cours_pour_une_salle_est_infaisable(self):
+        data = self._make_data()
+        data['salles'] = {'Salle1': 50}
+        data['capacites'] = [50]
+        _, _, status_b = self._solve(data, MODE_BOOLEEN)
+        _, _, status_i = self._solve(data, MODE_INTERVALLES)
+        self.assertEqual(status_b, cp_model.INFEASIBLE)
+        self.assertEqual(status_i, cp_model.INFEASIBLE)
+
+
+def make_conflit_prof_data():
+    """Deux cours de groupes distincts, un seul professeur disponible sur un seul créneau."""
+    data = make_base_data(creneaux=2, salles={'Salle1': 50, 'Salle2': 50})
+    add_course(data, 'CM_Test_G1_s1', ['G1'], allowed_profs=[0])
+    add_course(data, 'CM_Test_G2_s2', ['G2'], allowed_profs=[0])
+    data.update({
+        'capacites': [50, 50],
+        'map_cours_groupes': {'CM_Test_G1_s1': ['G1'], 'CM_Test_G2_s2': ['G2']},
+        'disponibilites_profs': {7: {0: [(0, 1)]}},
+        'disponibilites_salles': {},
+        'disponibilites_groupes': {},
+        'obligations_slots': {},
+        'prof_to_teacher_id': {'Prof1': 7}
+    })
+    return data
+
+
+class TestBlocsDesactivables(unittest.TestCase):
+    """Tests pour build_model(disable_blocks=...) et le mode gardé."""
+
+    def _status(self, model):
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = 10
+        return solver.Solve(model.model)
+
+    def test_desactiver_un_bloc_rend_faisable(self):
+        model = TimetableModel(make_conflit_prof_data())
+        model.build_model()
+        self.assertEqual(self._status(model), cp_model.INFEASIBLE)
+        for bloc in (['profs'], ['prof disponibles']):
+            with self.subTest(bloc=bloc):
+                model = TimetableModel(make_conflit_prof_data())
+                model.build_model(disable_blocks=bloc)
+                self.assertIn(self._status(model), (cp_model.OPTIMAL, cp_model.FEASIBLE))
+
+    def test_bloc_inconnu_leve_une_erreur(self):
+        with self.assertRaises(ValueError):
+            TimetableModel(make_complete_data()).build_model(disable_blocks=['inconnu'])
+
+    def test_gardes_par_entite(self):
+        model = TimetableModel(make_conflit_prof_data())
+        model.build_model(gardes=True)
+        self.assertIn(('profs', 'Prof1'), model.gardes)
+        self.assertIn(('prof disponibles', 'Prof1'), model.gardes)
+        # Sans hypothèse, les gardes peuvent être relâchées : le modèle est faisable
+        self.assertIn(self._status(model), (cp_model.OPTIMAL, cp_model.FEASIBLE))
+
+    def test_gardes_refusees_en_mode_intervalles(self):
+        with self.assertRaises(ValueError):
+            TimetableModel(make_complete_data(), mode=MODE_INTERVALLES).build_model(gardes=True)
+
+
 if __name__ == '__main__':
     unittest.main()
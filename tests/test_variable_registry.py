@@ -0,0 +1,58 @@
+"""
+Tests pour le module variable_registry.
+"""
+import unittest
+from ortools.sat.python import cp_model
+from variable_registry import VariableRegistry
+
+
+class TestVariableRegistry(unittest.TestCase):
+    """Tests unitaires pour VariableRegistry."""
+
+    def setUp(self):
+        self.model = cp_model.CpModel()
+        self.registry = VariableRegistry()
+
+    def test_indices_attribues_dans_l_ordre(self):
+        self.assertEqual(self.registry.ajouter_cours('C1'), 0)
+        self.assertEqual(self.registry.ajouter_cours('C2'), 1)
+        self.assertEqual(self.registry.ajouter_cours('C1'), 0)
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(self.registry.course_id(1), 'C2')
+
+    def test_index_inconnu_leve_keyerror(self):
+        with self.assertRaises(KeyError):
+            self.registry.index('Inconnu')
+
+    def test_variables_par_cours(self):
+        i = self.registry.ajouter_cours('C1')
+        var = self.model.NewBoolVar('start_C1_3')
+        self.registry.ajouter('start', i, 3, var)
+        self.assertIs(self.registry.starts(i)[3], var)
+        self.assertEqual(self.registry.salles(i), {})
+
+    def test_pas_de_collision_de_prefixe(self):
+        """Les cours _s7 et _s70 ont des variables strictement séparées."""
+        i7 = self.registry.ajouter_cours('TD_X_G1_s7')
+        i70 = self.registry.ajouter_cours('TD_X_G1_s70')
+        self.registry.ajouter('start', i7, 0, self.model.NewBoolVar('start_TD_X_G1_s7_0'))
+        self.registry.ajouter('start', i70, 0, self.model.NewBoolVar('start_TD_X_G1_s70_0'))
+        self.assertEqual(len(self.registry.starts(i7)), 1)
+        self.assertEqual(len(self.registry.starts(i70)), 1)
+
+    def test_scalaires(self):
+        i = self.registry.ajouter_cours('C1')
+        self.assertIsNone(self.registry.debut(i))
+        debut = self.model.NewIntVar(0, 10, 'debut_C1')
+        self.registry.definir('debut', i, debut)
+        self.assertIs(self.registry.debut(i), debut)
+
+    def test_prof_fixe(self):
+        i = self.registry.ajouter_cours('C1')
+        self.assertIsNone(self.registry.prof_fixe(i))
+        self.registry.definir('prof_fixe', i, 2)
+        self.assertEqual(self.registry.prof_fixe(i), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests pour le module warm_start et les indications de départ du modèle.
+"""
+import unittest
+
+from ortools.sat.python import cp_model
+
+from time_table_model import TimetableModel
+from warm_start import ReferenceWeekMatcher
+from test_time_table_model import make_complete_data, add_course
+
+
+def make_data():
+    data = make_complete_data()
+    data.update({'jours': 2, 'nb_slots': 8, 'slots': [(j, o) for j in range(2) for o in range(4)],
+                 'cours': [], 'map_groupe_cours': {}, 'duree_cours': {},
+                 'salles': {101: 50, 102: 50}, 'capacites': [50, 50], 'profs': ['Prof A', 'Prof B']})
+    add_course(data, 'TD_Math_G1_s10', ['G1'], allowed_profs=[0, 1])
+    add_course(data, 'TD_Math_G1_s11', ['G1'], duration=2, allowed_profs=[0, 1])
+    add_course(data, 'TD_Info_G2_s12', ['G2'], allowed_profs=[0, 1])
+    for c, teaching in zip(data['cours'], (7, 7, 8)):
+        c.update({'teaching_id': teaching, 'type_id': 2})
+    return data
+
+
+def ref(teaching_id, groupe, jour, decalage, room_id=101, duree=1, profs=('Prof B',)):
+    return {'teaching_id': teaching_id, 'type_id': 2, 'groupe': groupe, 'duree': duree,
+            'jour': jour, 'decalage': decalage, 'room_id': room_id, 'profs': list(profs)}
+
+
+class TestReferenceWeekMatcher(unittest.TestCase):
+
+    def test_association_par_enseignement_type_groupe(self):
+        data = make_data()
+        indications = ReferenceWeekMatcher(data).associer([
+            ref(7, 'G1', 1, 0, duree=2, room_id=102),
+            ref(7, 'G1', 0, 1),
+            ref(8, 'G3', 0, 0),
+        ])
+        self.assertEqual(indications, {
+            'TD_Math_G1_s10': (1, 0, 1),  # même durée en priorité
+            'TD_Math_G1_s11': (4, 1, 1),
+        })
+
+    def test_professeur_non_autorise_ignore(self):
+        data = make_data()
+        data['cours'][2]['allowed_prof_indices'] = [0]
+        indications = ReferenceWeekMatcher(data).associer([ref(8, 'G2', 0, 3, room_id=999)])
+        self.assertEqual(indications, {'TD_Info_G2_s12': (3, None, None)})
+
+
+    def test_association_exacte_par_slot(self):
+        data = make_data()
+        data['cours'][0]['allowed_prof_indices'] = [0]
+        indications = ReferenceWeekMatcher(data).associer_par_slot([
+            dict(ref(7, 'G1', 1, 0, duree=2, room_id=102), slot_id=11),
+            dict(ref(7, 'G1', 0, 1, profs=('Prof A',)), slot_id=10),
+            dict(ref(8, 'G2', 0, 0), slot_id=99),
+        ])
+        # Séances identiques non permutées ; la séance 12 n'a pas de ligne enregistrée
+        self.assertEqual(indications, {'TD_Math_G1_s10': (1, 0, 0), 'TD_Math_G1_s11': (4, 1, 1)})
+
+
+class TestAppliquerIndications(unittest.TestCase):
+
+    def test_indications_respectees_et_taux(self):
+        data = make_data()
+        model = TimetableModel(data)
+        model.build_model()
+        nb = model.appliquer_indications({'TD_Math_G1_s10': (5, 1, 1), 'Inconnu': (0, 0, 0)})
+        self.assertGreater(nb, 0)
+        self.assertEqual(len(model.model.Proto().solution_hint.vars), nb)
+        result = model.solve(max_time_seconds=10)
+        self.assertIn(result['status'], [cp_model.OPTIMAL, cp_model.FEASIBLE])
+        self.assertIsNotNone(result['indications_conservees'])
+        self.assertGreaterEqual(result['indications_conservees'], 0.0)
+        self.assertLessEqual(result['indications_conservees'], 100.0)
+
+    def test_creneau_hors_domaine_ignore(self):
+        data = make_data()
+        model = TimetableModel(data)
+        model.build_model()
+        # Le cours de durée 2 ne peut pas démarrer au dernier créneau de la journée
+        self.assertEqual(model.appliquer_indications({'TD_Math_G1_s11': (3, None, None)}), 0)
+
+    def test_sans_indication(self):
+        model = TimetableModel(make_data())
+        model.build_model()
+        self.assertIsNone(model.solve(max_time_seconds=10)['indications_conservees'])
+
+
+if __name__ == '__main__':
+    unittest.main()
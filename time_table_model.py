@@ -1,192 +1,527 @@
 """
 Modèle d'optimisation pour la génération d'emplois du temps.
 """
-from typing import Dict, Any, List, Optional
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from ortools.sat.python import cp_model
 from logger_config import get_logger
+from variable_registry import VariableRegistry
+from start_domains import StartDomainEngine
+from room_candidates import RoomCandidateSelector
+from symmetry_breaking import SymmetryDetector
+from build_profiler import BuildProfiler
+from model_cache import empreinte_donnees
+from solver_profiles import SolverProfile, charger_profil
+from solution_streaming import SolutionStreamingCallback
+from objectives import ObjectiveSet, LexicographicSolver
+from interfaces import ISolutionSink
+from group_tree import ArbreGroupes, HIERARCHIE_GROUPES  # HIERARCHIE_GROUPES : ré-export historique
 
 # Configuration du logger pour ce module
 logger = get_logger(__name__)
 
-from function import recup_cours, recup_id_slot_from_str_to_int
+from function import recup_cours
+
+# Modes de formulation disponibles pour les conflits de ressources
+MODE_BOOLEEN = "booleen"  # une variable produit par (cours, créneau, salle/prof)
+MODE_INTERVALLES = "intervalles"  # intervalles optionnels + AddNoOverlap
+MODES_MODELE = (MODE_BOOLEEN, MODE_INTERVALLES)
+
+# Coût d'une séance déplacée en mode réparation (au-dessus des fins tardives, sous la capacité)
+POIDS_DEPLACEMENT = 10000
+# Poids des termes d'objectif dans la somme pondérée (hors mode lexicographique)
+POIDS_OBJECTIFS = {"capacite": 1000000, "deplacements": POIDS_DEPLACEMENT, "fin_tardive": 1}
+# Coût par défaut d'un créneau de trou (professeur ou groupe)
+POIDS_TROUS = 100
+
+# Blocs de contraintes désactivables (build_model(disable_blocks=...)) et gardables pour le diagnostic
+BLOCS_DIAGNOSTIC = ("profs", "salles", "etudiant", "hierarchies",
+                    "ordre_cm_td_tp", "prof disponibles", "salles dispo")
+
 
 
 class TimetableModel:
-    def __init__(self, data: Dict[str, Any]):
+    def __init__(self, data: Dict[str, Any], mode: str = MODE_BOOLEEN):
+        if mode not in MODES_MODELE:
+            raise ValueError(f"Mode de modèle inconnu : {mode} (attendu : {', '.join(MODES_MODELE)})")
         self.data = data
+        self.mode = mode
         self.model = cp_model.CpModel()
         self._vars = {}
+        self.registry = VariableRegistry()
         self.temp = []
         self._ordres_a_forcer=[]
-
-    def build_model(self):
-        logger.info("2. Construction du modèle d'optimisation...")
-        self._create_decision_variables()
-        self._add_linking_constraints()
+        self._profiler: Optional[BuildProfiler] = None
+        self._indications: Dict[int, tuple] = {}  # indice proto -> (variable, valeur suggérée)
+        # Mode réparation : affectations actuelles {cid: (créneau, salle, prof)} et cours figés
+        self._affectations_actuelles: Dict[str, tuple] = {}
+        self._figes: Dict[str, tuple] = {}
+        self.objectifs = ObjectiveSet()
+        self.poids_objectifs = dict(POIDS_OBJECTIFS)
+        self.arbre_groupes = ArbreGroupes.depuis_donnees(data)
+        self.profil_construction = None
+        self._blocs_desactives: set = set()
+        # Gardes du diagnostic : {(bloc, entité): littéral} (None hors mode gardé)
+        self.gardes: Optional[Dict[Tuple[str, str], Any]] = None
+
+    def build_model(self, casser_symetries: bool = False, profiler: bool = False, cache=None,
+                    trous: bool = False, poids_trous: int = POIDS_TROUS,
+                    disable_blocks: Optional[Sequence[str]] = None, gardes: bool = False):
+        """
+        Construit le modèle. Les blocs de `disable_blocks` (voir BLOCS_DIAGNOSTIC) ne sont
+        pas ajoutés. Avec gardes=True, chaque bloc est ajouté par entité (professeur, salle,
+        groupe, paire de cours) sous un littéral d'activation listé dans `self.gardes` :
+        une résolution avec ces littéraux en hypothèses fournit un noyau d'infaisabilité.
+        Avec trous=True, les trous des journées des professeurs et des
+        groupes sont pénalisés (poids `poids_trous` par créneau, voir penaliser_trous).
+        Avec profiler=True, chaque bloc est mesuré (temps, pic mémoire,
+        variables et contraintes ajoutées) ; le rapport est disponible dans
+        `self.profil_construction` et écrit en JSON dans le dossier des logs.
+        Avec un `ModelCache`, un modèle déjà construit pour les mêmes données et options
+        est rechargé au lieu d'être reconstruit (le cache est ignoré avec profiler=True).
+        """
+        logger.info(f"2. Construction du modèle d'optimisation (mode {self.mode})...")
+        inconnus = set(disable_blocks or ()) - set(BLOCS_DIAGNOSTIC)
+        if inconnus:
+            raise ValueError(f"Blocs inconnus : {sorted(inconnus)} (attendu : {', '.join(BLOCS_DIAGNOSTIC)})")
+        if gardes and self.mode != MODE_BOOLEEN:
+            raise ValueError("Les gardes de diagnostic ne sont disponibles qu'en mode booléen")
+        self._blocs_desactives = set(disable_blocks or ())
+        self.gardes = {} if gardes else None
+        if self._blocs_desactives or gardes:
+            cache = None  # modèle de diagnostic : jamais mis en cache
+        if trous:
+            # Avant la recherche en cache : les poids doivent correspondre à l'objectif du proto rechargé
+            self.poids_objectifs.update(trous_groupes=poids_trous, trous_profs=poids_trous)
+        if cache is not None and profiler:
+            logger.info("   -> Profilage demandé : modèle reconstruit sans utiliser le cache.")
+            cache = None
+        cle_cache = None
+        if cache is not None:
+            cle_cache = empreinte_donnees(self.data, {"mode": self.mode, "casser_symetries": casser_symetries,
+                                                      "affectations": self._affectations_actuelles,
+                                                      "figes": self._figes,
+                                                      "trous": poids_trous if trous else None})
+            if cache.charger(cle_cache, self):
+                return
+        self._profiler = BuildProfiler(self.model, self.mode) if profiler else None
+        with self._bloc('variables'):
+            self._create_decision_variables()
+        with self._bloc('linking'):
+            self._add_linking_constraints()
         self._add_structural_constraints()
-        self.appliquer_ordre_cm_td_tp()  # ← ICI on les APPLIQUE (variables existent !)
-        self._define_objective_function()  # Déplacé avant la résolution
+        with self._bloc('ordre_cm_td_tp'):
+            if self._actif('ordre_cm_td_tp'):
+                self.appliquer_ordre_cm_td_tp()  # ← ICI on les APPLIQUE (variables existent !)
+        if casser_symetries and self._affectations_actuelles:
+            # Les classes de cours et de salles ignorent les séances figées et le coût des déplacements
+            logger.warning("   -> Cassage des symétries ignoré en mode réparation.")
+        elif casser_symetries:
+            with self._bloc('symetries'):
+                self.casser_symetries()
+        if trous:
+            with self._bloc('penalites_trous'):
+                self.penaliser_trous(self.data)
+        with self._bloc('objectif'):
+            self._define_objective_function()  # Déplacé avant la résolution
         logger.info("   -> Modèle construit.")
-
-    def solve(self, max_time_seconds: int = 600) -> Dict[str, Any]:
+        if cache is not None:
+            cache.sauvegarder(cle_cache, self)
+        if self._profiler is not None:
+            self.profil_construction = self._profiler.profil
+            self._profiler.journaliser()
+            chemin = self.profil_construction.ecrire_json()
+            logger.info(f"   -> Profil de construction écrit dans {chemin}")
+
+    def _bloc(self, nom: str):
+        """Contexte de mesure d'un bloc de construction (sans effet hors profilage)."""
+        return self._profiler.bloc(nom) if self._profiler is not None else nullcontext()
+
+    def _actif(self, bloc: str) -> bool:
+        return bloc not in self._blocs_desactives
+
+    def _garde(self, bloc: str, entite: Any):
+        """
+        Contexte plaçant les contraintes ajoutées sous le littéral de garde (bloc, entité).
+        Sans effet hors mode gardé. Les définitions de produits (int_prod) ne sont pas gardées.
+        """
+        if self.gardes is None:
+            return nullcontext()
+        return self._contraintes_gardees((bloc, str(entite)))
+
+    @contextmanager
+    def _contraintes_gardees(self, cle: Tuple[str, str]):
+        proto = self.model.Proto()
+        debut = len(proto.constraints)
+        yield
+        if cle not in self.gardes:
+            self.gardes[cle] = self.model.NewBoolVar(f"garde_{cle[0]}_{cle[1]}")
+        litteral = self.gardes[cle].Index()
+        for k in range(debut, len(proto.constraints)):
+            if not proto.constraints[k].has_int_prod():
+                proto.constraints[k].enforcement_literal.append(litteral)
+
+    def _familles_relachees(self) -> List[str]:
+        """Disponibilités retirées des domaines de départ (portées par des contraintes gardées ou désactivées)."""
+        familles = []
+        if self.gardes is not None or not self._actif('prof disponibles'):
+            familles.append('prof')
+        if self.gardes is not None or not self._actif('salles dispo'):
+            familles.append('salle')
+        return familles
+
+    def solve(self, max_time_seconds: Optional[float] = None, nb_workers: Optional[int] = None,
+              profil: Optional[SolverProfile] = None,
+              sinks: Optional[Sequence[ISolutionSink]] = None) -> Dict[str, Any]:
+        """
+        Résout le modèle avec un profil solveur (par défaut : SOLVER_PROFILE ou 'balanced').
+        max_time_seconds et nb_workers, s'ils sont fournis, surchargent le profil.
+        Si des destinataires (sinks) sont fournis, chaque solution améliorante leur est
+        publiée pendant la recherche (voir solution_streaming).
+        """
         logger.info("\n3. Lancement de la résolution...")
+        profil = (profil or charger_profil()).avec(max_time_seconds=max_time_seconds, nb_workers=nb_workers)
+        logger.info(f"   -> Profil solveur : {profil.description()}")
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = max_time_seconds
-        solver.parameters.num_search_workers = 8
-        status = solver.Solve(self.model)
+        profil.appliquer(solver)
+        if sinks:
+            callback = SolutionStreamingCallback(self.data, self._vars, self.registry, sinks)
+            try:
+                status = solver.Solve(self.model, callback)
+            finally:
+                callback.fermer()
+        else:
+            status = solver.Solve(self.model)
+        return self._resultat(status, solver, profil)
+
+    def solve_lexicographique(self, max_time_seconds: Optional[float] = None, nb_workers: Optional[int] = None,
+                              profil: Optional[SolverProfile] = None,
+                              ordre: Optional[Sequence[str]] = None,
+                              sinks: Optional[Sequence[ISolutionSink]] = None) -> Dict[str, Any]:
+        """
+        Résout les termes d'objectif un par un dans l'ordre de priorité (voir objectives)
+        au lieu de la somme pondérée. Le résultat contient en plus 'etapes' : temps,
+        statut et valeur de chaque étape. Les solutions de chaque étape sont publiées
+        vers les destinataires (sinks), fermés en fin de résolution.
+        """
+        logger.info("\n3. Lancement de la résolution lexicographique...")
+        profil = (profil or charger_profil()).avec(max_time_seconds=max_time_seconds, nb_workers=nb_workers)
+        logger.info(f"   -> Profil solveur : {profil.description()}")
+        lexico = LexicographicSolver(self.model, self.objectifs, ordre)
+        logger.info(f"   -> Ordre des objectifs : {', '.join(lexico.ordre) or 'aucun'}")
+        callback = SolutionStreamingCallback(self.data, self._vars, self.registry, sinks) if sinks else None
+        try:
+            status, solver = lexico.resoudre(profil, callback)
+        finally:
+            if callback is not None:
+                callback.fermer()
+        resultat = self._resultat(status, solver, profil)
+        resultat["etapes"] = [etape.to_dict() for etape in lexico.etapes]
+        return resultat
+
+    def _resultat(self, status: int, solver: cp_model.CpSolver, profil: SolverProfile) -> Dict[str, Any]:
         logger.info(f"   -> Résolution terminée avec le statut : {solver.StatusName(status)}")
+        trouve = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        taux = self.taux_indications_conservees(solver) if trouve and self._indications else None
+        if taux is not None:
+            logger.info(f"   -> Indications conservées : {taux:.1f} % ({len(self._indications)} indiquées)")
         return {"status": status, "solver": solver,
-                "vars": self._vars if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None}
+                "vars": self._vars if trouve else None,
+                "registry": self.registry if trouve else None,
+                "indications_conservees": taux,
+                "profil": profil.nom}
+
+    def appliquer_indications(self, indications: Dict[str, tuple]) -> int:
+        """
+        Ajoute des indications de départ (AddHint) à partir de {cid: (créneau, salle, professeur)}.
+        Chaque élément connu fixe la suggestion de toutes les variables correspondantes du cours
+        (1 pour la valeur indiquée, 0 pour les autres) ; une valeur absente du domaine est ignorée.
+
+        Returns:
+            Nombre de variables indiquées au total.
+        """
+        reg = self.registry
+        for cid, (creneau, salle, prof) in indications.items():
+            if not reg.contient(cid):
+                continue
+            i = reg.index(cid)
+            for famille, valeur in (('start', creneau), ('y_salle', salle), ('z_prof', prof)):
+                variables = reg.variables(famille, i)
+                if valeur is None or valeur not in variables:
+                    continue
+                for cle, var in variables.items():
+                    self._indications[var.Index()] = (var, int(cle == valeur))
+            if creneau is not None and creneau in reg.starts(i) and reg.debut(i) is not None:
+                self._indications[reg.debut(i).Index()] = (reg.debut(i), creneau)
+        self.model.ClearHints()
+        for var, valeur in self._indications.values():
+            self.model.AddHint(var, valeur)
+        logger.info(f"   -> {len(self._indications)} variables indiquées (AddHint).")
+        return len(self._indications)
+
+    def taux_indications_conservees(self, solver: cp_model.CpSolver) -> float:
+        """Pourcentage des variables indiquées dont la valeur est identique dans la solution."""
+        conservees = sum(1 for var, valeur in self._indications.values() if solver.Value(var) == valeur)
+        return 100.0 * conservees / len(self._indications)
+
+    def _enregistrer(self, famille: str, cid: str, cle: int, var):
+        """Enregistre une variable dans le registre indexé et dans la vue _vars (clé (cid, cle))."""
+        self.registry.ajouter(famille, self.registry.index(cid), cle, var)
+        self._vars[famille][cid, cle] = var
+
+    def _start(self, cid: str, s: int):
+        """Variable de début du cours au créneau s (None si ce départ est impossible)."""
+        return self.registry.starts(self.registry.index(cid)).get(s)
+
+    def _salle(self, cid: str, r_idx: int):
+        """Variable d'affectation du cours à la salle d'indice r_idx."""
+        return self.registry.salles(self.registry.index(cid)).get(r_idx)
+
+    def _prof(self, cid: str, p_idx: int):
+        """Variable d'affectation du cours au professeur d'indice p_idx."""
+        return self.registry.profs(self.registry.index(cid)).get(p_idx)
 
     def _create_decision_variables(self):
         d = self.data
         self._vars.update({'start': {}, 'occupe': {}, 'y_salle': {}, 'z_prof': {}})
+        # Précalcul unique des départs autorisés (midi, fin de journée, disponibilités, horaires obligatoires)
+        self.domaines = StartDomainEngine(d, relachees=self._familles_relachees())
+        self.temps_utiles = self.domaines.temps_utiles()
+        # Salles candidates (compatibilité, capacité, disponibilité) ; débordement si aucune ne convient
+        self.salles_candidates = RoomCandidateSelector(d, self.domaines).calculer()
         for c in d['cours']:
             cid, duration = c['id'], d['duree_cours'][c['id']]#[cid]
-            for s, (day, offset) in enumerate(d['slots']):
-                chevauche_midi = any(offset + i in d['fenetre_midi'] for i in range(duration))
-                if offset + duration <= d['creneaux_par_jour'] and not chevauche_midi:
-                    self._vars['start'][cid, s] = self.model.NewBoolVar(f"start_{cid}_{s}")
-                else:
-                    self._vars['start'][cid, s] = None
-            for t in range(d['nb_slots']): self._vars['occupe'][cid, t] = self.model.NewBoolVar(f"occupe_{cid}_{t}")
-            for r in range(len(d['salles'])): self._vars['y_salle'][cid, r] = self.model.NewBoolVar(f"y_salle_{cid}_{r}")
-            for p in range(len(d['profs'])): self._vars['z_prof'][cid, p] = self.model.NewBoolVar(f"z_prof_{cid}_{p}")
+            self.registry.ajouter_cours(cid)
+            departs = self.domaines.departs_autorises(c)
+            if cid in self._figes:
+                departs = self._figer_cours(cid, departs)
+            for s in departs:
+                self._enregistrer('start', cid, s, self.model.NewBoolVar(f"start_{cid}_{s}"))
+            self._create_start_variable(cid)
+            if self.mode == MODE_BOOLEEN:
+                # Seuls les créneaux couverts par au moins un départ autorisé reçoivent une variable
+                couverts = sorted({s + k for s in departs for k in range(duration)})
+                for t in couverts: self._enregistrer('occupe', cid, t, self.model.NewBoolVar(f"occupe_{cid}_{t}"))
+            for r in self.salles_candidates[cid][0]: self._enregistrer('y_salle', cid, r, self.model.NewBoolVar(f"y_salle_{cid}_{r}"))
+            self._create_teacher_variables(c)
+        if self.mode == MODE_INTERVALLES:
+            self._create_interval_variables()
+
+    def _figer_cours(self, cid: str, departs: List[int]) -> List[int]:
+        """Restreint un cours figé (réparation) à son créneau et à sa salle actuels."""
+        creneau, salle, _ = self._figes[cid]
+        candidates, debordement = self.salles_candidates[cid]
+        if salle in candidates:
+            self.salles_candidates[cid] = ([salle], debordement)
+        return [s for s in departs if s == creneau] or departs
+
+    def _create_start_variable(self, cid: str):
+        """Crée le début entier du cours, de domaine égal à ses créneaux de départ valides."""
+        i = self.registry.index(cid)
+        departs = sorted(self.registry.starts(i))
+        debut = self.model.NewIntVarFromDomain(cp_model.Domain.FromValues(departs), f"debut_{cid}")
+        self.registry.definir('debut', i, debut)
+        self._vars.setdefault('debut', {})[cid] = debut
+
+    def _create_teacher_variables(self, c: Dict[str, Any]):
+        """
+        Crée les variables z_prof uniquement pour les professeurs autorisés.
+        Un cours à professeur unique n'a aucune variable : le professeur est une constante.
+        """
+        cid = c['id']
+        allowed = c.get("allowed_prof_indices", list(range(len(self.data['profs']))))
+        prof_fige = self._figes.get(cid, (None, None, None))[2]
+        if prof_fige is not None and prof_fige in allowed:
+            allowed = [prof_fige]
+        if len(allowed) == 1:
+            self.registry.definir('prof_fixe', self.registry.index(cid), allowed[0])
+            return
+        for p in allowed:
+            self._enregistrer('z_prof', cid, p, self.model.NewBoolVar(f"z_prof_{cid}_{p}"))
+
+    def _create_interval_variables(self):
+        """
+        Crée, pour chaque cours, un intervalle obligatoire sur l'axe global des créneaux
+        ainsi qu'un intervalle optionnel par salle et par professeur candidat.
+        Les intervalles optionnels partagent le début du cours ; leur présence est y_salle / z_prof.
+        """
+        d = self.data
+        reg = self.registry
+        self._vars.update({'intervalle': {}, 'intervalle_salle': {}, 'intervalle_prof': {}})
+        for c in d['cours']:
+            cid, duration = c['id'], d['duree_cours'][c['id']]
+            i = reg.index(cid)
+            debut = reg.debut(i)
+            intervalle = self.model.NewFixedSizeIntervalVar(debut, duration, f"itv_{cid}")
+            reg.definir('intervalle', i, intervalle)
+            self._vars['intervalle'][cid] = intervalle
+            for r, y in reg.salles(i).items():
+                self._enregistrer('intervalle_salle', cid, r, self.model.NewOptionalFixedSizeIntervalVar(
+                    debut, duration, y, f"itv_salle_{cid}_{r}"))
+            if reg.prof_fixe(i) is not None:
+                # Professeur imposé : l'intervalle obligatoire du cours lui est attribué
+                self._enregistrer('intervalle_prof', cid, reg.prof_fixe(i), intervalle)
+                continue
+            for p, z in reg.profs(i).items():
+                self._enregistrer('intervalle_prof', cid, p, self.model.NewOptionalFixedSizeIntervalVar(
+                    debut, duration, z, f"itv_prof_{cid}_{p}"))
 
     def _add_linking_constraints(self):
         d = self.data
+        reg = self.registry
         for c in d['cours']:
             cid = c['id']
-            valid_starts = [v for v in self._vars['start'].values() if v is not None and v.Name().startswith(f"start_{cid}")]
-            self.model.Add(sum(valid_starts) == 1)
-            self.model.Add(sum(self._vars['y_salle'][cid, r] for r in range(len(d['salles']))) == 1)
-            #self.model.Add(sum(self._vars['z_prof'][cid, p] for p in range(len(d['profs']))) == 1)
-            allowed = c.get("allowed_prof_indices", list(range(len(d['profs']))))
-            if allowed:
-                self.model.Add(sum(self._vars['z_prof'][cid, p] for p in allowed) == 1)
-                for p in range(len(d['profs'])):
-                    if p not in allowed:
-                        self.model.Add(self._vars['z_prof'][cid, p] == 0)
-            for t, (day_t, offset_t) in enumerate(d['slots']):
-                covering_starts = [self._vars['start'][cid, s] for s, (day_s, offset_s) in enumerate(d['slots']) if
-                                   self._vars['start'][cid, s] is not None and day_s == day_t and offset_s <= offset_t < offset_s +
-                                   d['duree_cours'][cid]]
+            i = reg.index(cid)
+            starts = reg.starts(i)
+            profs = reg.profs(i)
+            self.model.Add(sum(starts.values()) == 1)
+            self.model.Add(sum(reg.salles(i).values()) == 1)
+            # Seuls les professeurs autorisés ont une variable (aucune si le professeur est imposé)
+            if profs:
+                self.model.Add(sum(profs.values()) == 1)
+            # Le début entier vaut l'indice du créneau dont le booléen start est vrai
+            self.model.Add(reg.debut(i) == cp_model.LinearExpr.WeightedSum(list(starts.values()), list(starts)))
+            if self.mode == MODE_INTERVALLES:
+                continue
+            # Un créneau t est couvert par les départs s ∈ [t - durée + 1, t] (un départ valide
+            # ne déborde jamais sur le jour suivant, la condition de jour est donc implicite)
+            duration = d['duree_cours'][cid]
+            for t, occupe in reg.occupations(i).items():
+                covering_starts = [starts[s] for s in range(t - duration + 1, t + 1) if s in starts]
                 if covering_starts:
-                    self.model.Add(sum(covering_starts) == self._vars['occupe'][cid, t])
+                    self.model.Add(sum(covering_starts) == occupe)
                 else:
-                    self.model.Add(self._vars['occupe'][cid, t] == 0)
+                    self.model.Add(occupe == 0)
 
     def _add_structural_constraints(self):
         d = self.data
         # 1. Contraintes salles
-        self.contrainte_salle(d)
+        with self._bloc('salle'):
+            if self._actif('salles'):
+                self.contrainte_salle(d)
         # 2. Contraintes professeurs
-        self.contrainte_professeurs(d)
-
-        # 3. CONTRAINTE ÉTUDIANT
-        self.contrainte_etudiant(d)
-        # =================================================================
-        # 4. CONTRAINTE HIÉRARCHIQUE : les sous-groupes bloquent leur groupe parent
-        # =================================================================
-        self.contrainte_hierarchique(d)
-        self.contrainte_disponibilites_professeurs(d)
-        self.contrainte_disponibilites_groupes(d)
-        self.contrainte_disponibilites_salles_generalisee(d)
+        with self._bloc('professeurs'):
+            if self._actif('profs'):
+                self.contrainte_professeurs(d)
+
+        # 3. CONTRAINTE ÉTUDIANT : une contrainte par public feuille, étendue à ses ancêtres
+        #    (couvre aussi la hiérarchie promotion → groupe → sous-groupe)
+        with self._bloc('etudiant'):
+            if self._actif('etudiant'):
+                self.contrainte_etudiant(d)
+        with self._bloc('disponibilites_professeurs'):
+            if self._actif('prof disponibles'):
+                self.contrainte_disponibilites_professeurs(d)
+        with self._bloc('disponibilites_groupes'):
+            self.contrainte_disponibilites_groupes(d)
+        with self._bloc('disponibilites_salles'):
+            if self._actif('salles dispo'):
+                self.contrainte_disponibilites_salles_generalisee(d)
         #self.contrainte_disponibilites_amphi_c(d)
         #test
-        self.contrainte_ordre_cm_td_tp(d)
-        self.appliquer_ordre_cm_td_tp()
-        self.penaliser_fin_tardive(d, cout_penalite=500, limite_offset_fin=20)
-        self.contrainte_disponibilites_cour_heure(d)
-
-
-    def contrainte_hierarchique(self, d: dict[str, Any]):
-        logger.info("   -> Ajout des contraintes hiérarchiques (sous-groupes ↔ groupe parent)")
-
-        # Définit la relation : sous-groupe → groupe parent
-        hierarchie = {
-            "G1A": "G1",
-            "G1B": "G1",
-            "G2A": "G2",
-            "G2B": "G2",
-            "G3A": "G3",
-            "G3B": "G3",
-            "G4A": "G4",
-            "G4B": "G4",
-            "G5A": "G5",
-            "G5B": "G5",
-            "G7A": "G7",
-            "G7B": "G7",
-            "G8A": "G8",
-        }
-
-        for sous_groupe, groupe_parent in hierarchie.items():
-            if sous_groupe not in d['map_groupe_cours'] or groupe_parent not in d['map_groupe_cours']:
-                continue
-
-            logger.info(f"      → {sous_groupe} bloque {groupe_parent} (et vice versa)")
-
-            for t in range(d['nb_slots']):
-                # Tous les cours du sous-groupe
-                cours_sous = [self._vars['occupe'][cid, t]
-                              for cid in d['map_groupe_cours'][sous_groupe]
-                              if (cid, t) in self._vars['occupe']]
-                # Tous les cours du groupe parent
-                cours_parent = [self._vars['occupe'][cid, t]
-                                for cid in d['map_groupe_cours'][groupe_parent]
-                                if (cid, t) in self._vars['occupe']]
-
-                # On retire les cours du sous-groupe pour éviter double comptage
-                cours_parent_clean = [v for v in cours_parent
-                                      if not any(
-                        v.Name().startswith(f"occupe_{cid}") for cid in d['map_groupe_cours'][sous_groupe])]
+        with self._bloc('ordre_cm_td_tp_paires'):
+            self.contrainte_ordre_cm_td_tp(d)
+        with self._bloc('penalites_fin_tardive'):
+            self.penaliser_fin_tardive(d, cout_penalite=500, limite_offset_fin=20)
+        with self._bloc('disponibilites_cour_heure'):
+            self.contrainte_disponibilites_cour_heure(d)
 
-                all_concerned = cours_sous + cours_parent_clean
-                if all_concerned:
-                    self.model.Add(sum(all_concerned) <= 1)
 
     def contrainte_etudiant(self, d: dict[str, Any]):
-        for group_name, course_list in d['map_groupe_cours'].items():
-            if len(course_list) > 1:  # seulement si risque de chevauchement
+        """
+        Un public feuille (sous-groupe, ou groupe sans sous-groupe planifié) ne suit qu'un cours
+        à la fois parmi les siens et ceux de ses ancêtres dans l'arbre des groupes : une seule
+        contrainte par feuille et par créneau. Les feuilles dont les cours sont inclus dans ceux
+        d'une autre n'en ont pas. Bloc 'hierarchies' désactivé : chaque groupe est pris seul.
+        """
+        reg = self.registry
+        audiences = self.arbre_groupes.cours_par_feuille(d['map_groupe_cours'],
+                                                         fermeture=self._actif('hierarchies'))
+        logger.info(f"   -> Contraintes étudiants : {len(audiences)} publics feuilles "
+                    f"({len(d['map_groupe_cours'])} groupes planifiés)")
+        if self.mode == MODE_INTERVALLES:
+            for course_list in audiences.values():
+                if len(course_list) > 1:
+                    self.model.AddNoOverlap([reg.intervalle(reg.index(cid)) for cid in course_list])
+            return
+        for feuille, course_list in audiences.items():
+            if len(course_list) < 2:  # seulement si risque de chevauchement
+                continue
+            occupations = [reg.occupations(reg.index(cid)) for cid in course_list]
+            with self._garde('etudiant', feuille):
                 for t in range(d['nb_slots']):
-                    active = [self._vars['occupe'][cid, t]
-                              for cid in course_list
-                              if (cid, t) in self._vars['occupe']]
-                    if active:
+                    active = [occ[t] for occ in occupations if t in occ]
+                    if len(active) > 1:
                         self.model.Add(sum(active) <= 1)
 
     def contrainte_professeurs(self, d: dict[str, Any]):
-        for t in range(d['nb_slots']):
+        reg = self.registry
+        if self.mode == MODE_INTERVALLES:
+            par_prof = {}
+            for i in range(len(reg)):
+                for p, itv in reg.variables('intervalle_prof', i).items():
+                    par_prof.setdefault(p, []).append(itv)
+            for intervalles in par_prof.values():
+                if len(intervalles) > 1:
+                    self.model.AddNoOverlap(intervalles)
+            return
+        for t in self.temps_utiles:
+            presents = [(c['id'], reg.index(c['id'])) for c in d['cours'] if t in reg.occupations(reg.index(c['id']))]
+            if len(presents) < 2:
+                continue
             for p_idx in range(len(d['profs'])):
-                p_vars = []
-                for c in d['cours']:
-                    cid = c['id']
+                # Professeur imposé : l'occupation suffit ; sinon produit occupation × affectation
+                fixes = [reg.occupations(i)[t] for cid, i in presents if reg.prof_fixe(i) == p_idx]
+                variables = [(cid, i) for cid, i in presents if p_idx in reg.profs(i)]
+                if len(fixes) + len(variables) < 2:
+                    continue
+                p_vars = list(fixes)
+                for cid, i in variables:
                     z = self.model.NewBoolVar(f"zact_c{cid}_t{t}_p{p_idx}")
                     self.model.AddMultiplicationEquality(z, [
-                        self._vars['occupe'][cid, t],
-                        self._vars['z_prof'][cid, p_idx]
+                        reg.occupations(i)[t],
+                        reg.profs(i)[p_idx]
                     ])
                     p_vars.append(z)
-                self.model.Add(sum(p_vars) <= 1)
+                with self._garde('profs', d['profs'][p_idx]):
+                    self.model.Add(sum(p_vars) <= 1)
 
     def contrainte_salle(self, d: dict[str, Any]):
-        for t in range(d['nb_slots']):
+        reg = self.registry
+        if self.mode == MODE_INTERVALLES:
             for r_idx in range(len(d['salles'])):
+                intervalles = [reg.variables('intervalle_salle', i)[r_idx] for i in range(len(reg))
+                               if r_idx in reg.variables('intervalle_salle', i)]
+                if len(intervalles) > 1:
+                    self.model.AddNoOverlap(intervalles)
+            return
+        salle_ids = list(d['salles'])
+        for t in self.temps_utiles:
+            presents = [(c['id'], reg.index(c['id'])) for c in d['cours'] if t in reg.occupations(reg.index(c['id']))]
+            if len(presents) < 2:
+                continue
+            for r_idx in range(len(d['salles'])):
+                candidats = [(cid, i) for cid, i in presents if r_idx in reg.salles(i)]
+                if len(candidats) < 2:
+                    continue
                 q_vars = []
-                for c in d['cours']:
-                    cid = c['id']
+                for cid, i in candidats:
                     q = self.model.NewBoolVar(f"q_c{cid}_t{t}_r{r_idx}")
                     self.model.AddMultiplicationEquality(q, [
-                        self._vars['occupe'][cid, t],
-                        self._vars['y_salle'][cid, r_idx]
+                        reg.occupations(i)[t],
+                        reg.salles(i)[r_idx]
                     ])
                     q_vars.append(q)
-                self.model.Add(sum(q_vars) <= 1)
+                with self._garde('salles', salle_ids[r_idx]):
+                    self.model.Add(sum(q_vars) <= 1)
 
     def contrainte_disponibilites_professeurs(self, d):
+        """
+        Interdit le couple (départ, professeur) lorsque le professeur est indisponible.
+        Les départs où aucun professeur autorisé n'est disponible sont déjà exclus des domaines.
+        """
         logger.info("   -> Application des disponibilités horaires des professeurs")
-        dispos = d.get('disponibilites_profs', {})
-        prof_to_teacher_id = d.get("prof_to_teacher_id", {})
+        reg = self.registry
 
         for c in d['cours']:
             cid = c['id']
@@ -194,28 +529,21 @@ class TimetableModel:
             allowed_indices = c.get('allowed_prof_indices', [])
             if not allowed_indices:
                 continue
+            i = reg.index(cid)
 
-            for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None or offset + duration > d['creneaux_par_jour']:
+            if reg.prof_fixe(i) is not None:
+                # Professeur imposé : ses indisponibilités retirent simplement des départs
+                with self._garde('prof disponibles', d['profs'][reg.prof_fixe(i)]):
+                    self._interdire_departs_hors_masque(cid, self.domaines.masque_prof(reg.prof_fixe(i), duration))
+                continue
+            for p_idx in allowed_indices:
+                z = reg.profs(i).get(p_idx)
+                if z is None:
                     continue
-
-                for p_idx in allowed_indices:
-                    prof_name = d['profs'][p_idx]
-                    teacher_id = prof_to_teacher_id.get(prof_name)
-                    if not teacher_id or teacher_id not in dispos:
-                        continue
-
-                    plages = dispos[teacher_id].get(day_idx, [])
-                    if not plages:
-                        z = self._vars['z_prof'].get((cid, p_idx))
-                        if z is not None:
-                            self.model.AddBoolOr([start_var.Not(), z.Not()])
-                        continue
-
-                    if not any(debut <= offset and offset + duration <= fin for debut, fin in plages):
-                        z = self._vars['z_prof'].get((cid, p_idx))
-                        if z is not None:
+                masque = self.domaines.masque_prof(p_idx, duration)
+                with self._garde('prof disponibles', d['profs'][p_idx]):
+                    for s, start_var in reg.starts(i).items():
+                        if not masque[s]:
                             self.model.AddBoolOr([start_var.Not(), z.Not()])
 
     def contrainte_disponibilites_salles(self, d):
@@ -233,7 +561,7 @@ class TimetableModel:
             duration = d['duree_cours'][cid]
 
             for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
+                start_var = self._start(cid, s)
                 if start_var is None or offset + duration > d['creneaux_par_jour']:
                     continue
 
@@ -252,7 +580,7 @@ class TimetableModel:
                     plages = dispos[salle_name].get(day_idx, [])
 
                     # p_idx est l'indice physique (0, 1, 2...) et correspond à l'indexation de y_salle
-                    z = self._vars['y_salle'].get((cid, p_idx))
+                    z = self._salle(cid, p_idx)
 
                     # Si la salle est indisponible (plages vide ou plage non couverte)
                     indisponible = (not plages) or \
@@ -272,52 +600,20 @@ class TimetableModel:
 
         Un cours ne peut démarrer à un créneau (s) si l'un de ses groupes associés
         n'est pas disponible pendant toute la durée du cours à ce créneau.
+        Ces départs sont normalement déjà absents du domaine précalculé ; seuls
+        les départs restants encore incompatibles sont interdits ici.
         """
         logger.info("   -> Application des disponibilités horaires des groupes")
-        # Structure de 'disponibilites_groupes' :
-        # { 'GROUPE_ID': { jour_idx: [(debut_creneau, fin_creneau), ...] } }
-        dispos = d.get('disponibilites_groupes', {})
-
         for c in d['cours']:
             cid = c['id']
-            duration = d['duree_cours'][cid]
-            # map_cours_groupes: { cid: [GROUPE_ID_1, GROUPE_ID_2, ...] }
-            groupes_cours = d.get('map_cours_groupes', {}).get(cid, [])
-
-            if not groupes_cours:
-                # Si le cours n'a pas de groupe associé, on ne peut pas appliquer cette contrainte
-                continue
-
-            for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None or offset + duration > d['creneaux_par_jour']:
-                    continue
-
-                # Vérifier l'indisponibilité pour CHAQUE groupe associé au cours
-                for groupe_id in groupes_cours:
-
-                    # On ne peut imposer de contrainte que si la disponibilité est définie
-                    if groupe_id not in dispos:
-                        continue
+            masque = self.domaines.masque_groupes(cid, d['duree_cours'][cid])
+            self._interdire_departs_hors_masque(cid, masque)
 
-                    # Récupérer les plages horaires disponibles pour ce groupe ce jour-là
-                    plages = dispos[groupe_id].get(day_idx, [])
-
-                    # Conditions d'indisponibilité :
-                    # 1. Aucune plage n'est définie pour ce jour (plages est vide)
-                    # 2. OU aucune des plages définies ne couvre entièrement le cours
-                    is_indisponible = (not plages) or \
-                                      (not any(debut <= offset and offset + duration <= fin
-                                               for debut, fin in plages))
-
-                    if is_indisponible:
-                        # Si le groupe est indisponible à ce créneau, le cours NE PEUT PAS y démarrer.
-                        # On désactive la variable start(c, s).
-                        # 'start' est une variable booléenne qui vaut 1 si le cours c démarre au slot s.
-                        self.model.Add(start_var == False)
-                        # Note : Add(start_var.Not()) est équivalent à Add(start_var == False)
-                        # logger.info(f"BLOQUÉ: Cours {cid} ne peut pas démarrer à {s} (Jour {day_idx}, Offset {offset}) car Groupe {groupe_id} est indisponible.")
-                        break  # Un seul groupe indisponible suffit pour bloquer le cours au slot s
+    def _interdire_departs_hors_masque(self, cid: str, masque):
+        """Fixe à faux les variables de départ du cours absentes du masque."""
+        for s, start_var in self.registry.starts(self.registry.index(cid)).items():
+            if not masque[s]:
+                self.model.Add(start_var == False)
 
     def contrainte_disponibilites_salles_generalisee(self, d):
         logger.info("   -> Application générale des disponibilités horaires des salles (Robuste)")
@@ -328,17 +624,11 @@ class TimetableModel:
             logger.info("      → Aucune disponibilité spécifique trouvée, skipping.")
             return
 
-        # 1. Créer le MAPPING ID_SALLE -> INDICE_PHYSIQUE
-        # Ceci est la clé pour lier l'ID de 'dispos' à l'indexation de 'y_salle'
+        # MAPPING ID_SALLE -> INDICE_PHYSIQUE (indexation de y_salle)
         salle_id_to_idx = {name: i for i, name in enumerate(d['salles'].keys())}
-        # Note : Si d['salles'] est une simple liste [ID1, ID2, ...], utilisez:
-        # salle_id_to_idx = {name: i for i, name in enumerate(d['salles'])}
+        reg = self.registry
 
-        # 2. Itérer sur TOUTES les salles qui ont des contraintes spécifiques
-        # On boucle sur l'ID de la salle (la clé du dictionnaire 'dispos')
-        for salle_id, contraintes_par_jour in dispos.items():
-
-            # 3. Récupérer l'indice physique (p_idx) pour cette salle
+        for salle_id in dispos:
             salle_idx = salle_id_to_idx.get(salle_id)
 
             if salle_idx is None:
@@ -346,95 +636,29 @@ class TimetableModel:
                 logger.info(f"      → Avertissement : Salle ID {salle_id} dans 'dispos' non trouvée. Ignorée.")
                 continue
 
-            # 4. Itérer sur tous les cours et créneaux (S, jour, offset)
             for c in d['cours']:
-                cid = c['id']
-                duration = d['duree_cours'][cid]
-
-                for s, (day_idx, offset) in enumerate(d['slots']):
-                    start_var = self._vars['start'].get((cid, s))
-                    if start_var is None or offset + duration > d['creneaux_par_jour']:
-                        continue
-
-                    # y_salle[cid, salle_idx] est la variable booléenne qui nous intéresse
-                    z_salle = self._vars['y_salle'].get((cid, salle_idx))
-                    if z_salle is None:
-                        continue
-
-                        # 5. Appliquer la logique de contrainte
-                    plages_jour = contraintes_par_jour.get(day_idx, [])
-                    if not plages_jour:
-                        self.model.AddBoolOr([start_var.Not(), z_salle.Not()])
-                        continue
-                    # Vérifier si le cours rentre dans l'une des plages disponibles
-                    rentre_dans_plage = False
-                    for debut, fin in plages_jour:
-                        if debut <= offset and offset + duration <= fin:
-                            rentre_dans_plage = True
-                            break
-
-                    # La salle est indisponible si :
-                    # a) il n'y a pas de plages pour ce jour (plages_jour est vide)
-                    # b) ou si aucune plage existante ne couvre l'intégralité du cours
-                    if not rentre_dans_plage:
-                        # Contrainte d'élimination : (start(C, S) est faux) OU (y_salle(C, R) est faux)
-                        self.model.AddBoolOr([start_var.Not(), z_salle.Not()])
-                        # logger.info(f"BLOQUÉ: Cours {cid} ne peut pas démarrer à {s} ET utiliser salle ID {salle_id}")
+                i = reg.index(c['id'])
+                z_salle = reg.salles(i).get(salle_idx)
+                if z_salle is None:
+                    continue
+                masque = self.domaines.masque_salle(salle_idx, d['duree_cours'][c['id']])
+                with self._garde('salles dispo', salle_id):
+                    for s, start_var in reg.starts(i).items():
+                        if not masque[s]:
+                            # Contrainte d'élimination : (start(C, S) est faux) OU (y_salle(C, R) est faux)
+                            self.model.AddBoolOr([start_var.Not(), z_salle.Not()])
 
     def contrainte_disponibilites_cour_heure(self, d):
         logger.info("   -> Application des horaires obligatoires pour les slots/salles")
-        # On utilise 'obligations_slots' pour clarifier l'intention
-        obligations = d.get('obligations_slots', {})
-
-        if not obligations:
+        if not d.get('obligations_slots', {}):
             logger.info("      → Aucune contrainte d'horaire obligatoire spécifique trouvée, skipping.")
             return
 
-        # 1. Itérer sur TOUS les SLOTS/SALLES qui ont des contraintes d'horaire obligatoires
-        for slot_id, contraintes_par_jour in obligations.items():  # Le slot_id est la clé du dictionnaire (e.g., 23000000)
-            # 2. Itérer sur tous les cours
-            for c in d['cours']:
-                cid = c['id']
-                id_slot_cour = recup_id_slot_from_str_to_int(cid)  # La fonction qui associe le cours à son slot/salle
-                # --- MODIFICATION CLÉ 1 : Cibler UNIQUEMENT les cours associés à ce slot ---
-                # Si le cours n'est pas censé utiliser ce slot/salle, on passe au suivant.
-                if id_slot_cour != slot_id:
-                    continue
-
-                duration = d['duree_cours'][cid]
-
-                # 3. Itérer sur tous les créneaux de temps (S, jour, offset)
-                for s, (day_idx, offset) in enumerate(d['slots']):
-                    start_var = self._vars['start'].get((cid, s))
-                    if start_var is None or offset + duration > d['creneaux_par_jour']:
-                        continue
-                    # 4. Déterminer si cet horaire (jour, offset) est OBLIGATOIRE
-                    creneaux_obligatoires_jour = contraintes_par_jour.get(day_idx, [])
-                    # Le cours DOIT commencer à cette heure s'il est affecté à ce slot.
-                    # Dans le cas où un jour n'a aucune obligation, le cours n'est PAS autorisé ce jour-là.
-                    # C'est une interprétation stricte de "obligatoire".
-
-                    est_horaire_obligatoire = False
-                    for debut, fin in creneaux_obligatoires_jour:
-                        # Vérifier si le cours (offset, offset + duration) est PARFAITEMENT ÉGAL
-                        # à l'un des créneaux obligatoires (debut, fin).
-                        # Pour être "obligatoire", on peut exiger une correspondance exacte.
-                        # Si c'est juste "doit commencer dans la plage", utiliser :
-                        # if debut <= offset and offset + duration <= fin:
-
-                        # Pour l'horaire OBLIGATOIRE, je recommande une correspondance stricte:
-                        if debut == offset and fin == offset + duration:
-                            est_horaire_obligatoire = True
-                            break
-
-                    # --- MODIFICATION CLÉ 2 : Logique Inversée ---
-                    # Si le cours est affecté à ce slot (déjà vérifié par 'id_slot_cour == slot_id')
-                    # MAIS que l'horaire (s) N'EST PAS l'un des horaires obligatoires
-                    if not est_horaire_obligatoire:
-                        # Nous BLOQUONS le démarrage du cours à ce slot/créneau.
-                        # Contrainte : start(C, S) est faux
-                        self.model.AddBoolOr([start_var.Not()])
-                        # logger.info(f"BLOQUÉ: Cours {cid} DOIT utiliser slot {slot_id} mais l'horaire {s} n'est pas obligatoire.")
+        # Un cours associé à un slot ayant des horaires obligatoires ne peut démarrer qu'à l'un d'eux
+        for c in d['cours']:
+            cid = c['id']
+            masque = self.domaines.masque_obligations(cid, d['duree_cours'][cid])
+            self._interdire_departs_hors_masque(cid, masque)
 
     def contrainte_disponibilites_amphi_c(self, d):
         logger.info("   -> Application des disponibilités de l'Amphi C (version ROBUSTE)")
@@ -456,13 +680,13 @@ class TimetableModel:
             duration = d['duree_cours'][cid]
 
             for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
+                start_var = self._start(cid, s)
                 if start_var is None:
                     continue
                 if offset + duration > d['creneaux_par_jour']:
                     continue
 
-                y_amphi = self._vars['y_salle'][(cid, amphi_c_idx)]
+                y_amphi = self._salle(cid, amphi_c_idx)
 
                 # Récupérer les plages autorisées ce jour
                 plages_jour = liste_amphi_c[day_idx].get(day_idx, [])
@@ -483,37 +707,30 @@ class TimetableModel:
                     self.model.AddBoolOr([start_var.Not(), y_amphi.Not()])
 
     def contrainte_ordre_cm_td_tp(self, d):
-        logger.info("   → FORÇAGE ORDRE CM → TD → TP : VERSION QUI MARCHE VRAIMENT")
+        logger.info("   → FORÇAGE ORDRE CM → TD → TP (par matière et par promotion)")
 
-        # On va extraire proprement le nom de la matière (tout entre le type et le _sXXXXX final)
+        # Clé (matière, promotion) : une même matière enseignée à BUT1 et BUT2 forme deux chaînes distinctes
         cours_par_matiere = {}
 
         for c in d['cours']:
             cid = c['id']
 
-            # On enlève le dernier élément (_s12345) et on reconstruit la clé matière + groupe
-            # Ex: "Sensibilisation à la programmation multimédia BUT3"
+            # Le nom de la matière est extrait de l'identifiant (TYPE_matière_groupe_sXXXXX)
             typ,matiere = recup_cours(cid)
-            if matiere not in cours_par_matiere:
-                cours_par_matiere[matiere] = {"CM": [], "TD": [], "TP": []}
-            if typ == "CM":
-                cours_par_matiere[matiere]["CM"] = cid
-            elif typ == "TD":
-                cours_par_matiere[matiere]["TD"].append(cid)
-            elif typ == "TP":
-                cours_par_matiere[matiere]["TP"].append(cid)
+            cle = (matiere, c.get('promotion'))
+            if cle not in cours_par_matiere:
+                cours_par_matiere[cle] = {"CM": [], "TD": [], "TP": []}
+            if typ in cours_par_matiere[cle]:
+                cours_par_matiere[cle][typ].append(cid)
 
         # Stocke pour application plus tard
         ordres = []
         for key, cours in cours_par_matiere.items():
-            cm = cours["CM"]
+            for cm in cours["CM"]:
+                for suivant in cours["TD"] + cours["TP"]:
+                    ordres.append((cm, suivant))
             for td in cours["TD"]:
-                if cm:
-                    ordres.append((cm, td))
-            for tp in cours["TP"]:
-                if cm:
-                    ordres.append((cm, tp))
-                for td in cours["TD"]:
+                for tp in cours["TP"]:
                     ordres.append((td, tp))
         self._ordres_a_forcer = ordres
         logger.info(f"      → {len(ordres)} relations d'ordre détectées et prêtes (CM→TD→TP)")
@@ -524,22 +741,93 @@ class TimetableModel:
             logger.info("      → Aucune contrainte d'ordre à appliquer")
             return
         logger.info(f"   → APPLICATION DES {len(self._ordres_a_forcer)} CONTRAINTES D'ORDRE (CM avant TD avant TP)")
-        total_ajoutees = 0
+        reg = self.registry
 
+        # Une seule inégalité linéaire par paire sur les débuts entiers : début(avant) < début(après)
         for cid_avant, cid_apres in self._ordres_a_forcer:
-            # Récupère tous les starts valides pour chaque cours
-            starts_avant = [(s, var) for (c, s), var in self._vars['start'].items() if
-                            c == cid_avant and var is not None]
-            starts_apres = [(s, var) for (c, s), var in self._vars['start'].items() if
-                            c == cid_apres and var is not None]
+            with self._garde('ordre_cm_td_tp', f"{cid_avant} < {cid_apres}"):
+                self.model.Add(reg.debut(reg.index(cid_avant)) + 1 <= reg.debut(reg.index(cid_apres)))
 
-            for s1, v1 in starts_avant:
-                for s2, v2 in starts_apres:
-                    if s1 >= s2:
-                        self.model.AddBoolOr([v1.Not(), v2.Not()])
-                        total_ajoutees += 1
+        logger.info(f"      → {len(self._ordres_a_forcer)} inégalités de précédence ajoutées")
 
-        logger.info(f"      → {total_ajoutees} contraintes d'interdiction ajoutées → ORDRE FORCÉ À 100%")
+    def preparer_reparation(self, affectations: Dict[str, tuple], figes: Dict[str, tuple]):
+        """
+        Active le mode réparation (à appeler avant `build_model`).
+
+        Args:
+            affectations: affectations actuelles {cid: (créneau, salle, prof)} (edt_slot)
+            figes: sous-ensemble des affectations à conserver à l'identique ; les autres
+                cours sont rouverts et chaque séance déplacée est pénalisée.
+        """
+        self._affectations_actuelles = dict(affectations)
+        self._figes = dict(figes)
+
+    def _objectif_reparation(self):
+        """Terme 'deplacements' : séances rouvertes dont le créneau ou la salle change."""
+        reg = self.registry
+        deplacements = []
+        for cid, (creneau, salle, _) in self._affectations_actuelles.items():
+            if cid in self._figes or not reg.contient(cid):
+                continue
+            i = reg.index(cid)
+            deplace = self.model.NewBoolVar(f"deplace_{cid}")
+            start, y = reg.starts(i).get(creneau), reg.salles(i).get(salle)
+            if start is None or y is None:
+                self.model.Add(deplace == 1)
+            else:
+                # Séance déplacée dès que le créneau ou la salle actuels ne sont plus choisis
+                self.model.AddBoolOr([start, deplace])
+                self.model.AddBoolOr([y, deplace])
+            deplacements.append(deplace)
+        self._vars['deplacements'] = deplacements
+        self.objectifs.definir('deplacements', [(v, 1) for v in deplacements])
+        logger.info(f"   -> Réparation : {len(deplacements)} séances rouvertes, {len(self._figes)} figées.")
+
+    def casser_symetries(self) -> Dict[str, int]:
+        """
+        Étape optionnelle : ordonne les cours et les salles interchangeables.
+
+        - Cours identiques : la séance k se termine avant le début de la séance k+1.
+        - Salles identiques : le k-ième cours (ordre du registre) candidat à une classe
+          de salles ne peut utiliser que ses k+1 premières salles.
+
+        Returns:
+            Rapport {classes_cours, cours_symetriques, classes_salles, salles_symetriques}
+        """
+        d = self.data
+        reg = self.registry
+        detecteur = SymmetryDetector(d, self.domaines, self.salles_candidates)
+        classes_cours = detecteur.classes_cours()
+        classes_salles = detecteur.classes_salles()
+
+        for classe in classes_cours:
+            for cid_a, cid_b in zip(classe, classe[1:]):
+                self.model.Add(reg.debut(reg.index(cid_a)) + d['duree_cours'][cid_a] <= reg.debut(reg.index(cid_b)))
+
+        for classe in classes_salles:
+            k = 0
+            for i in range(len(reg)):
+                salles = reg.salles(i)
+                if classe[0] not in salles:
+                    continue
+                for r_idx in classe[k + 1:]:
+                    if r_idx in salles:
+                        self.model.Add(salles[r_idx] == 0)
+                k += 1
+                if k >= len(classe) - 1:
+                    break
+
+        self.rapport_symetries = {
+            'classes_cours': len(classes_cours),
+            'cours_symetriques': sum(len(c) for c in classes_cours),
+            'classes_salles': len(classes_salles),
+            'salles_symetriques': sum(len(c) for c in classes_salles),
+        }
+        logger.info(f"   -> Symétries : {self.rapport_symetries['classes_cours']} classes de cours "
+                    f"({self.rapport_symetries['cours_symetriques']} cours), "
+                    f"{self.rapport_symetries['classes_salles']} classes de salles "
+                    f"({self.rapport_symetries['salles_symetriques']} salles).")
+        return self.rapport_symetries
 
     def penaliser_fin_tardive(self, d, cout_penalite: int = 500, limite_offset_fin: int = 20):
         """
@@ -551,6 +839,7 @@ class TimetableModel:
             f"   -> Application de la préférence : Pénaliser les fins après le slot {limite_offset_fin} (Coût: {cout_penalite})")
 
         self.penalites_fin_tardive = []  # Liste pour stocker les variables de pénalité
+        self.objectifs.definir('fin_tardive', [])
 
         for c in d['cours']:
             cid = c['id']
@@ -558,7 +847,7 @@ class TimetableModel:
 
             for s, (day_idx, offset) in enumerate(d['slots']):
 
-                start_var = self._vars['start'].get((cid, s))
+                start_var = self._start(cid, s)
                 if start_var is None:
                     continue
 
@@ -577,62 +866,118 @@ class TimetableModel:
 
                     # Stocker la pénalité. On stocke le terme (variable * poids)
                     self.penalites_fin_tardive.append(b_late_end * cout_penalite)
+                    self.objectifs.ajouter('fin_tardive', b_late_end, cout_penalite)
 
         logger.info(f"      → {len(self.penalites_fin_tardive)} départs de cours tardifs potentiels détectés.")
+    def penaliser_trous(self, d):
+        """
+        Pénalise les trous des journées de chaque groupe et de chaque professeur.
+
+        Pour chaque (entité, jour), deux entiers `premier` et `dernier` encadrent les
+        séances de l'entité ce jour-là ; le trou vaut amplitude - charge, moins la pause
+        midi si la journée a des séances le matin et l'après-midi. Le coût est linéaire
+        en (entité × jour) et ne dépend pas du carré du nombre de créneaux.
+        """
+        reg = self.registry
+        self._cours_du_jour: Dict[tuple, Any] = {}
+        self._durees = [d['duree_cours'][cid] for cid in reg.course_ids()]
+        cours_par_groupe = self.arbre_groupes.cours_par_feuille(d['map_groupe_cours'])
+        logger.info(f"   -> Pénalisation des trous : {len(cours_par_groupe)} groupes, {len(d['profs'])} professeurs.")
+        self.objectifs.definir('trous_groupes', [])
+        self.objectifs.definir('trous_profs', [])
+
+        for g, cids in cours_par_groupe.items():
+            for j in range(d['jours']):
+                presences = [(i, lit) for i, lit in ((reg.index(cid), self._jour_cours(reg.index(cid), j))
+                                                     for cid in cids) if lit is not None]
+                trou = self._trou_journee(f"g_{g}_{j}", j, presences)
+                if trou is not None:
+                    self.objectifs.ajouter('trous_groupes', trou)
+
+        for p in range(len(d['profs'])):
+            candidats = [i for i in range(len(reg)) if reg.prof_fixe(i) == p or p in reg.profs(i)]
+            for j in range(d['jours']):
+                presences = []
+                for i in candidats:
+                    jour = self._jour_cours(i, j)
+                    if jour is None:
+                        continue
+                    if reg.prof_fixe(i) == p:
+                        presences.append((i, jour))
+                        continue
+                    present = self.model.NewBoolVar(f"prof_jour_c{i}_p{p}_j{j}")
+                    self.model.AddMultiplicationEquality(present, [jour, reg.profs(i)[p]])
+                    presences.append((i, present))
+                trou = self._trou_journee(f"p_{p}_{j}", j, presences)
+                if trou is not None:
+                    self.objectifs.ajouter('trous_profs', trou)
+        logger.info(f"      → {len(self.objectifs.termes('trous_groupes'))} journées de groupes et "
+                    f"{len(self.objectifs.termes('trous_profs'))} journées de professeurs surveillées.")
+
+    def _jour_cours(self, i: int, j: int):
+        """Booléen « le cours i a lieu le jour j » (None si aucun départ possible ce jour-là)."""
+        if (i, j) not in self._cours_du_jour:
+            cpj = self.data['creneaux_par_jour']
+            departs = [v for s, v in self.registry.starts(i).items() if s // cpj == j]
+            jour = None
+            if departs:
+                jour = self.model.NewBoolVar(f"jour_c{i}_j{j}")
+                self.model.Add(sum(departs) == jour)
+            self._cours_du_jour[i, j] = jour
+        return self._cours_du_jour[i, j]
+
+    def _trou_journee(self, nom: str, j: int, presences: List[tuple]):
+        """
+        Variable de trou d'une journée à partir des (cours, littéral de présence) de l'entité.
+        Retourne None si moins de deux séances sont possibles (aucun trou possible).
+        """
+        if len(presences) < 2:
+            return None
+        d, reg = self.data, self.registry
+        cpj = d['creneaux_par_jour']
+        base = j * cpj
+        premier = self.model.NewIntVar(base, base + cpj, f"premier_{nom}")
+        dernier = self.model.NewIntVar(base, base + cpj, f"dernier_{nom}")
+        charge = []
+        for i, present in presences:
+            duree = self._durees[i]
+            self.model.Add(premier <= reg.debut(i)).OnlyEnforceIf(present)
+            self.model.Add(dernier >= reg.debut(i) + duree).OnlyEnforceIf(present)
+            charge.append(present * duree)
+        amplitude = dernier - premier - sum(charge)
+        midi = sorted(d.get('fenetre_midi', []))
+        if midi:
+            # Séances avant et après la pause : la pause midi n'est pas un trou
+            coupure = self.model.NewBoolVar(f"coupure_{nom}")
+            self.model.Add(premier < base + midi[0]).OnlyEnforceIf(coupure)
+            self.model.Add(dernier > base + midi[-1] + 1).OnlyEnforceIf(coupure)
+            amplitude -= len(midi) * coupure
+        trou = self.model.NewIntVar(0, cpj, f"trou_{nom}")
+        self.model.Add(trou >= amplitude)
+        return trou
+
     def _define_objective_function(self):
         """Définit les contraintes souples et l'objectif de minimisation."""
         d = self.data
         penalites_capacite = []
 
-        # TRANSFORMATION DE LA CONTRAINTE DE CAPACITÉ EN CONTRAINTE SOUPLE
+        # CONTRAINTE DE CAPACITÉ SOUPLE : seuls les cours sans salle candidate suffisante
+        # (débordement) peuvent utiliser une salle trop petite ; y_salle sert alors de pénalité.
         logger.info("   -> Application de la contrainte de capacité en mode 'souple'.")
+        capacites = d.get('capacites', list(d['salles'].values()))
         for c in d['cours']:
             cid, group_name = c['id'], c['groups'][0]
+            if not self.salles_candidates[cid][1]:
+                continue
             taille_groupe = d['taille_groupes'].get(group_name, 0)
-
-            for r_idx, capacite_salle in enumerate(d['capacites']):
-                if taille_groupe > capacite_salle:
-                    # Ce cours ne devrait pas être dans cette salle.
-                    # On crée une variable de pénalité.
-                    penalite = self.model.NewBoolVar(f"penalite_capacite_{cid}_salle_{r_idx}")
-
-                    # Si le cours est assigné à cette salle (y_salle == 1), la pénalité doit être de 1.
-                    self.model.Add(self._vars['y_salle'][cid, r_idx] == 1).OnlyEnforceIf(penalite)
-                    self.model.Add(self._vars['y_salle'][cid, r_idx] == 0).OnlyEnforceIf(penalite.Not())
-
-                    penalites_capacite.append(penalite)
-
-        self._vars['penalites_capacite'] = penalites_capacite
-        logger.info(f"   -> Objectif : Minimiser {len(penalites_capacite)} violations de capacité potentielles.")
-        self.model.Minimize(sum(penalites_capacite))
-        #self.penaliser_trous_profs(self.data)  # ← nouvelle fonction
-
-        # Objectif final
-        obj = sum(penalites_capacite)
-        if hasattr(self, 'penalites_trous'):
-            obj += sum(self.penalites_trous) * 100  # plus important que la capacité
-        self.model.Minimize(obj)
+            for r_idx, y in self.registry.salles(self.registry.index(cid)).items():
+                if taille_groupe > capacites[r_idx]:
+                    penalites_capacite.append(y)
 
         self._vars['penalites_capacite'] = penalites_capacite
-
-        # --- NOUVEAU : Récupération des pénalités de fin tardive ---
-        penalites_tardives = getattr(self, 'penalites_fin_tardive', [])
-
-        # --- Calcul de l'objectif total (Minimisation) ---
-
-        # 1. Pénalités de capacité
-        obj_capacite = sum(penalites_capacite) * 1000000  # Multiplier par un poids si vous voulez que ce soit plus coûteux
-
-        # 2. Pénalités de fin tardive
-        # Les variables sont déjà multipliées par le cout_penalite (ex: 500)
-        obj_tardif = sum(penalites_tardives)
-
-        # 3. (Optionnel) Pénalités de trous (si vous l'ajoutez)
-        # obj_trous = sum(self.penalites_trous) * 100
-
-        # Objectif final : Minimiser la somme de tous les coûts
-        total_obj = obj_capacite + obj_tardif  # + obj_trous
-
-#        logger.info(
- #           f"   -> Objectif : Minimiser les coûts (Capacité: {len(penalites_capacite)}, Fin Tardive: {len(self.penalites_fin_tardive)} potentiels).")
-        self.model.Minimize(total_obj)
+        self.objectifs.definir('capacite', [(y, 1) for y in penalites_capacite])
+        logger.info(f"   -> Objectif : Minimiser {len(penalites_capacite)} violations de capacité potentielles "
+                    f"et {len(self.objectifs.termes('fin_tardive'))} fins tardives potentielles.")
+        if self._affectations_actuelles:
+            self._objectif_reparation()
+        self.model.Minimize(self.objectifs.somme_ponderee(self.poids_objectifs))
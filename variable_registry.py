@@ -0,0 +1,146 @@
+"""
+Registre des variables de décision du modèle d'emploi du temps.
+Respecte le principe Single Responsibility (SOLID).
+
+Chaque cours reçoit un indice entier à l'enregistrement ; toutes les variables
+d'un cours sont ensuite accessibles en O(1) par cet indice, sans parcourir
+l'ensemble des variables ni comparer des préfixes de noms.
+"""
+from typing import Any, Dict, List, Optional
+
+# Familles de variables indexées par (cours, clé) : créneau, salle ou professeur
+FAMILLES_INDEXEES = ('start', 'occupe', 'y_salle', 'z_prof', 'intervalle_salle', 'intervalle_prof')
+# Familles contenant une seule valeur par cours (prof_fixe : indice constant du professeur unique)
+FAMILLES_SCALAIRES = ('debut', 'intervalle', 'prof_fixe')
+
+
+class VariableRegistry:
+    """Stocke les variables de décision par indice de cours."""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._indexees: Dict[str, List[Dict[int, Any]]] = {f: [] for f in FAMILLES_INDEXEES}
+        self._scalaires: Dict[str, List[Optional[Any]]] = {f: [] for f in FAMILLES_SCALAIRES}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def ajouter_cours(self, course_id: str) -> int:
+        """Enregistre un cours et retourne son indice (idempotent)."""
+        if course_id in self._index:
+            return self._index[course_id]
+        i = len(self._ids)
+        self._index[course_id] = i
+        self._ids.append(course_id)
+        for familles in self._indexees.values():
+            familles.append({})
+        for familles in self._scalaires.values():
+            familles.append(None)
+        return i
+
+    def index(self, course_id: str) -> int:
+        """Retourne l'indice entier d'un cours (KeyError si inconnu)."""
+        return self._index[course_id]
+
+    def contient(self, course_id: str) -> bool:
+        return course_id in self._index
+
+    def course_id(self, i: int) -> str:
+        """Retourne l'identifiant du cours d'indice i."""
+        return self._ids[i]
+
+    def course_ids(self) -> List[str]:
+        return list(self._ids)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def ajouter(self, famille: str, i: int, cle: int, var: Any) -> None:
+        """Enregistre la variable `var` du cours i pour la clé (créneau, salle ou prof)."""
+        self._indexees[famille][i][cle] = var
+
+    def definir(self, famille: str, i: int, var: Any) -> None:
+        """Enregistre la variable unique du cours i pour une famille scalaire."""
+        self._scalaires[famille][i] = var
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def variables(self, famille: str, i: int) -> Dict[int, Any]:
+        """Retourne {clé: variable} pour le cours i dans la famille demandée."""
+        return self._indexees[famille][i]
+
+    def scalaire(self, famille: str, i: int) -> Optional[Any]:
+        return self._scalaires[famille][i]
+
+    def starts(self, i: int) -> Dict[int, Any]:
+        """Variables de début valides du cours i : {créneau: BoolVar}."""
+        return self._indexees['start'][i]
+
+    def occupations(self, i: int) -> Dict[int, Any]:
+        """Variables d'occupation du cours i : {créneau: BoolVar}."""
+        return self._indexees['occupe'][i]
+
+    def salles(self, i: int) -> Dict[int, Any]:
+        """Variables d'affectation de salle du cours i : {indice salle: BoolVar}."""
+        return self._indexees['y_salle'][i]
+
+    def profs(self, i: int) -> Dict[int, Any]:
+        """Variables d'affectation de professeur du cours i : {indice prof: BoolVar}."""
+        return self._indexees['z_prof'][i]
+
+    def debut(self, i: int) -> Optional[Any]:
+        """Début entier du cours i (tous modes : précédences, symétries, indications)."""
+        return self._scalaires['debut'][i]
+
+    def intervalle(self, i: int) -> Optional[Any]:
+        """Intervalle obligatoire du cours i (mode intervalles)."""
+        return self._scalaires['intervalle'][i]
+
+    def prof_fixe(self, i: int) -> Optional[int]:
+        """Indice du professeur imposé au cours i (aucune variable z_prof dans ce cas)."""
+        return self._scalaires['prof_fixe'][i]
+
+    # ------------------------------------------------------------------
+    # Export / import (cache de modèles)
+    # ------------------------------------------------------------------
+    def exporter_indices(self) -> Dict[str, Any]:
+        """
+        Retourne les indices proto de toutes les variables, sans objet OR-Tools,
+        pour reconstruire le registre sur un modèle rechargé.
+        """
+        def indice(var):
+            return None if var is None else var.Index()
+
+        return {
+            'ids': list(self._ids),
+            'indexees': {f: [{cle: indice(v) for cle, v in par_cours.items()} for par_cours in listes]
+                         for f, listes in self._indexees.items()},
+            'scalaires': {f: [v if f == 'prof_fixe' else indice(v) for v in listes]
+                          for f, listes in self._scalaires.items()},
+        }
+
+    @classmethod
+    def depuis_indices(cls, model, indices: Dict[str, Any]) -> 'VariableRegistry':
+        """Reconstruit un registre à partir de `exporter_indices` et du modèle rechargé."""
+        def variable(famille, index):
+            if index is None:
+                return None
+            if famille.startswith('intervalle'):
+                return model.GetIntervalVarFromProtoIndex(index)
+            if famille == 'debut':
+                return model.GetIntVarFromProtoIndex(index)
+            return model.GetBoolVarFromProtoIndex(index)
+
+        registre = cls()
+        for cid in indices['ids']:
+            registre.ajouter_cours(cid)
+        for famille, listes in indices['indexees'].items():
+            for i, par_cours in enumerate(listes):
+                for cle, index in par_cours.items():
+                    registre.ajouter(famille, i, cle, variable(famille, index))
+        for famille, listes in indices['scalaires'].items():
+            for i, valeur in enumerate(listes):
+                registre.definir(famille, i, valeur if famille == 'prof_fixe' else variable(famille, valeur))
+        return registre
@@ -0,0 +1,82 @@
+"""
+Association des affectations d'une semaine de référence aux cours à planifier.
+Respecte le principe Single Responsibility (SOLID).
+
+Les affectations enregistrées (edt_slot) d'une semaine de référence sont
+associées aux cours de la semaine courante par (enseignement, type, groupe).
+Le résultat sert d'indications de départ (AddHint) pour le solveur.
+Pour la semaine elle-même (réparation), chaque ligne est associée exactement
+au cours de même slot_id.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from function import recup_id_slot_from_str_to_int
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+# (créneau de départ global, indice de salle, indice de professeur) ; None si inconnu
+Indication = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+class ReferenceWeekMatcher:
+    """Associe chaque cours à une affectation de la semaine de référence."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._indice_salle = {salle_id: r for r, salle_id in enumerate(data['salles'].keys())}
+        self._indice_prof = {nom: p for p, nom in enumerate(data['profs'])}
+
+    @staticmethod
+    def _cle(teaching_id, type_id, groupe) -> Tuple:
+        return teaching_id, type_id, groupe
+
+    def associer(self, references: List[Dict[str, Any]]) -> Dict[str, Indication]:
+        """
+        Retourne {cid: (créneau, salle, professeur)} pour les cours associés.
+
+        À clé égale, les séances de même durée sont associées en priorité, puis
+        dans l'ordre chronologique de la semaine de référence.
+        """
+        d = self.data
+        disponibles: Dict[Tuple, List[Dict[str, Any]]] = {}
+        for ref in sorted(references, key=lambda r: (r['jour'], r['decalage'])):
+            disponibles.setdefault(self._cle(ref['teaching_id'], ref['type_id'], ref['groupe']), []).append(ref)
+
+        indications: Dict[str, Indication] = {}
+        for cours in d['cours']:
+            cle = self._cle(cours.get('teaching_id'), cours.get('type_id'), cours['groups'][0])
+            candidates = disponibles.get(cle)
+            if not candidates:
+                continue
+            duree = d['duree_cours'][cours['id']]
+            ref = next((r for r in candidates if r['duree'] == duree), candidates[0])
+            candidates.remove(ref)
+            indications[cours['id']] = self._indication(cours, ref)
+
+        logger.info(f"   -> Semaine de référence : {len(indications)}/{len(d['cours'])} cours associés.")
+        return indications
+
+    def associer_par_slot(self, references: List[Dict[str, Any]]) -> Dict[str, Indication]:
+        """
+        Affectations enregistrées de la semaine elle-même : chaque ligne est associée au cours
+        de même slot_id (suffixe s{id} de l'identifiant), sans rapprochement par enseignement.
+        """
+        par_slot = {ref['slot_id']: ref for ref in references}
+        indications: Dict[str, Indication] = {}
+        for cours in self.data['cours']:
+            ref = par_slot.get(recup_id_slot_from_str_to_int(cours['id']))
+            if ref is not None:
+                indications[cours['id']] = self._indication(cours, ref)
+        logger.info(f"   -> Affectations actuelles : {len(indications)}/{len(self.data['cours'])} cours associés.")
+        return indications
+
+    def _indication(self, cours: Dict[str, Any], ref: Dict[str, Any]) -> Indication:
+        d = self.data
+        creneau = None
+        if 0 <= ref['decalage'] < d['creneaux_par_jour'] and 0 <= ref['jour'] < d['jours']:
+            creneau = ref['jour'] * d['creneaux_par_jour'] + ref['decalage']
+        salle = self._indice_salle.get(ref['room_id'])
+        autorises = cours.get('allowed_prof_indices', [])
+        profs = [self._indice_prof[n] for n in ref['profs'] if self._indice_prof.get(n) in autorises]
+        return creneau, salle, profs[0] if profs else None